@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+# Microbenchmark for Job memory and accessor cost.
+# memory:   bytes held per queued job, with job record parsed from json
+#           per job as received over REST.
+# accessor: ns per call of accessors used on transfer path.
+#
+# Usage: python3 job_benchmark.py [count]
+
+import json
+import sys
+import time
+import tracemalloc
+from s3replicationcommon.job import Job
+from s3replicationcommon.templates import replication_job_template
+
+
+def job_json(index):
+    job_dict = replication_job_template()
+    job_dict["replication-id"] = "replication-id-{}".format(index)
+    attributes = job_dict["source"]["operation"]["attributes"]
+    attributes["Object-Name"] = "object-{}".format(index)
+    attributes["Content-Length"] = 1024
+    return json.dumps(job_dict)
+
+
+def measure_memory(count):
+    job_json_list = [job_json(index) for index in range(count)]
+    tracemalloc.start()
+    start_size = tracemalloc.get_traced_memory()[0]
+    jobs = [Job(json.loads(record)) for record in job_json_list]
+    size = tracemalloc.get_traced_memory()[0] - start_size
+    tracemalloc.stop()
+    print("{:24s}: {:10.0f} bytes/job".format("memory", size / len(jobs)))
+
+
+def measure_accessor(label, accessor, count):
+    job = Job(json.loads(job_json(0)))
+    start_time = time.perf_counter()
+    for _ in range(count):
+        accessor(job)
+    elapsed = time.perf_counter() - start_time
+    print("{:24s}: {:10.0f} ns/call".format(label, elapsed * 1e9 / count))
+
+
+if __name__ == '__main__':
+    count = 100000
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+
+    measure_memory(count)
+    measure_accessor("get_source_object_name",
+                     Job.get_source_object_name, count)
+    measure_accessor("get_source_object_size",
+                     Job.get_source_object_size, count)
+    measure_accessor("get_source_s3_site", Job.get_source_s3_site, count)
+    measure_accessor("get_target_s3_site", Job.get_target_s3_site, count)
+    measure_accessor("source netloc",
+                     lambda job: job.get_source_s3_site().get_netloc(), count)
@@ -92,7 +92,8 @@ class KafkaMain:
     async def sendJob(self, data, topic, partition, offset):
         print("Sending Jobs...")
         fdmi_dict = literal_eval(data)
-        job_record = PrepareReplicationJob.from_fdmi(fdmi_dict)
+        job_record = PrepareReplicationJob.from_fdmi(
+            fdmi_dict, self._app['site_registry'])
 
         if job_record is None:
             print("BadRequest")
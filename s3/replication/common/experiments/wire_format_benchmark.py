@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+# Benchmark of job batch encoding sent from manager to replicator.
+# For each content type and encoding available here, reports time to
+# encode (manager) and decode (replicator) a batch, and size on the wire.
+# "legacy" is json.dumps with JobJsonEncoder, as used before.
+#
+# Usage: python3 wire_format_benchmark.py [count ...]
+
+import json
+import sys
+import time
+from s3replicationcommon import wire_format
+from s3replicationcommon.job import Job
+from s3replicationcommon.job import JobJsonEncoder
+from s3replicationcommon.site_table import SITE_FIELDS
+from s3replicationcommon.templates import replication_job_template
+
+MAX_SIZE = 1024 * 1024 * 1024
+
+
+def make_jobs(count):
+    jobs = []
+    for index in range(count):
+        job_dict = replication_job_template()
+        job_dict["replication-id"] = "replication-id-{}".format(index)
+        for field in SITE_FIELDS:
+            job_dict["source"].pop(field, None)
+            job_dict["target"].pop(field, None)
+        job_dict["source"]["site_id"] = "cortxs3-0123456789ab"
+        job_dict["target"]["site_id"] = "awss3-0123456789ab"
+        attributes = job_dict["source"]["operation"]["attributes"]
+        attributes["Object-Name"] = "object-{}".format(index)
+        attributes["Content-Length"] = 1024 * index
+        jobs.append(Job(job_dict))
+    return jobs
+
+
+def timed(func, *args):
+    start_time = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start_time) * 1000
+
+
+def report(label, count, encode_ms, decode_ms, size):
+    print("{:8d} {:24s} encode {:9.1f} ms  decode {:9.1f} ms  "
+          "{:7.0f} bytes/job".format(
+              count, label, encode_ms, decode_ms, size / count))
+
+
+def legacy(jobs):
+    return json.dumps(jobs, cls=JobJsonEncoder).encode()
+
+
+def encode(jobs, content_type, content_encoding):
+    return wire_format.compress(
+        wire_format.encode_jobs(jobs, content_type), content_encoding)
+
+
+def decode(data, content_type, content_encoding):
+    return wire_format.decode(
+        wire_format.decompress(data, content_encoding, MAX_SIZE),
+        content_type)
+
+
+def run(count):
+    jobs = make_jobs(count)
+
+    data, encode_ms = timed(legacy, jobs)
+    _, decode_ms = timed(json.loads, data)
+    report("legacy", count, encode_ms, decode_ms, len(data))
+
+    for content_type in wire_format.supported_content_types():
+        for content_encoding in wire_format.supported_content_encodings():
+            data, encode_ms = timed(
+                encode, jobs, content_type, content_encoding)
+            records, decode_ms = timed(
+                decode, data, content_type, content_encoding)
+            assert len(records) == count
+            label = "{} {}".format(content_type.split("/")[1],
+                                   content_encoding)
+            report(label, count, encode_ms, decode_ms, len(data))
+
+
+if __name__ == '__main__':
+    counts = [1000, 10000, 100000]
+    if len(sys.argv) > 1:
+        counts = [int(count) for count in sys.argv[1:]]
+
+    for count in counts:
+        run(count)
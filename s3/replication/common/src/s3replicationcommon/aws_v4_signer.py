@@ -20,12 +20,29 @@
 
 import hmac
 import hashlib
-import urllib
-import datetime
+import time
+import urllib.parse
+
+ALGORITHM = 'AWS4-HMAC-SHA256'
+# Headers signed by prepare_signed_header, in sorted order.
+SIGNED_HEADERS = 'host;x-amz-content-sha256;x-amz-date'
+
+# aws-chunked payload signing, each chunk signed in sequence.
+STREAMING_PAYLOAD = 'STREAMING-AWS4-HMAC-SHA256-PAYLOAD'
+STREAMING_SIGNED_HEADERS = \
+    'host;x-amz-content-sha256;x-amz-date;x-amz-decoded-content-length'
+CHUNK_ALGORITHM = 'AWS4-HMAC-SHA256-PAYLOAD'
+EMPTY_SHA256_HEX = hashlib.sha256(b'').hexdigest()
 
 
 class AWSV4Signer(object):
-    """Generate Authentication headers to validate requests."""
+    """Generate Authentication headers to validate requests.
+
+    Signer keeps derived signing key (per day), parsed host and formatted
+    timestamp (per second) cached, so a signer reused across requests,
+    see S3Session.get_signer(), avoids recomputing them on each request.
+    Requests share the signer, so it holds no state of a single request.
+    """
 
     def __init__(self, endpoint, service_name, region, access_key, secret_key):
         """Initialise config."""
@@ -35,42 +52,19 @@ class AWSV4Signer(object):
         self._access_key = access_key
         self._secret_key = secret_key
 
-    # Helper method.
-    def _get_headers(host, epoch_t, body_256hash):
-        headers = {
-            'host': host,
-            'x-amz-content-sha256': body_256hash,
-            'x-amz-date': AWSV4Signer._get_amz_timestamp(epoch_t)
-        }
-        return headers
+        # Endpoint does not change for a signer, parse it once.
+        self._host = urllib.parse.urlparse(self._endpoint).netloc
+        self._scope_suffix = '/' + region + '/' + service_name + \
+            '/aws4_request'
 
-    def _create_canonical_request(
-            self,
-            method,
-            canonical_uri,
-            canonical_query_string,
-            body,
-            epoch_t,
-            host):
-        """Create canonical request based on uri and query string."""
-        body_256sha_hex = 'UNSIGNED-PAYLOAD'
-        if body:
-            # body has some content.
-            body_256sha_hex = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        # Signing key changes only with date, region and service.
+        # {(date, region, service): key}, holds entries of latest date.
+        self._signing_keys = {}
+        self._signing_key_date = None
 
-        self._body_hash_hex = body_256sha_hex
-        headers = AWSV4Signer._get_headers(host, epoch_t, body_256sha_hex)
-        sorted_headers = sorted([k for k in headers])
-        canonical_headers = ""
-        for key in sorted_headers:
-            canonical_headers += "{}:{}\n".format(
-                key.lower(), headers[key].strip())
-
-        signed_headers = "{}".format(";".join(sorted_headers))
-        canonical_request = method + '\n' + canonical_uri + '\n' + \
-            canonical_query_string + '\n' + canonical_headers + '\n' + \
-            signed_headers + '\n' + body_256sha_hex
-        return canonical_request
+        # Timestamp of last signed request (epoch second, amz timestamp).
+        self._timestamp_second = None
+        self._amz_timestamp = None
 
     # Helper method.
     def _sign(key, msg):
@@ -90,39 +84,28 @@ class AWSV4Signer(object):
         kSigning = AWSV4Signer._sign(kService, 'aws4_request')
         return kSigning
 
-    def _create_string_to_sign_v4(
-            self,
-            method='',
-            canonical_uri='',
-            canonical_query_string='',
-            body='',
-            epoch_t='',
-            algorithm='',
-            host='',
-            service='',
-            region=''):
-        """Generates string_to_sign for authorization key generation."""
-        canonical_request = self._create_canonical_request(
-            method, canonical_uri, canonical_query_string, body, epoch_t, host)
-        credential_scope = AWSV4Signer._get_date(epoch_t) + '/' + \
-            region + '/' + service + '/' + 'aws4_request'
-
-        string_to_sign = algorithm + '\n' + \
-            AWSV4Signer._get_amz_timestamp(epoch_t) + '\n' + \
-            credential_scope + '\n' + \
-            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
-
-        return string_to_sign
-
-    # Helper method.
-    def _get_date(epoch_t):
-        """Return date in Ymd format."""
-        return epoch_t.strftime('%Y%m%d')
-
-    # Helper method.
-    def _get_amz_timestamp(epoch_t):
-        """Return timestamp in YMDTHMSZ format."""
-        return epoch_t.strftime('%Y%m%dT%H%M%SZ')
+    def _get_signing_key(self, date_stamp, region, service):
+        """Returns signing key, derived once per day."""
+        if date_stamp != self._signing_key_date:
+            # Day rollover, drop keys of previous day.
+            self._signing_keys = {}
+            self._signing_key_date = date_stamp
+        key_id = (date_stamp, region, service)
+        signing_key = self._signing_keys.get(key_id, None)
+        if signing_key is None:
+            signing_key = AWSV4Signer._getV4SignatureKey(
+                self._secret_key, date_stamp, region, service)
+            self._signing_keys[key_id] = signing_key
+        return signing_key
+
+    def _get_current_amz_timestamp(self):
+        """Returns current time in YMDTHMSZ format, formatted once/sec."""
+        now = int(time.time())
+        if now != self._timestamp_second:
+            self._timestamp_second = now
+            self._amz_timestamp = time.strftime(
+                '%Y%m%dT%H%M%SZ', time.gmtime(now))
+        return self._amz_timestamp
 
     # Helper Helper method for generating request_uri for v4 signing.
     def fmt_s3_request_uri(bucket_name, object_name=None):
@@ -140,55 +123,6 @@ class AWSV4Signer(object):
                 urllib.parse.quote(object_name, safe='')
         return request_uri
 
-    # generating AWS v4 Authorization signature
-    def sign_request_v4(
-            self,
-            method=None,
-            canonical_uri='/',
-            canonical_query_string='',
-            body='',
-            epoch_t='',
-            host='',
-            service='',
-            region=''):
-        """Generate authorization signature."""
-        if method is None:
-            print("method can not be null")
-            return None
-        credential_scope = AWSV4Signer._get_date(epoch_t) + '/' + region + \
-            '/' + service + '/' + 'aws4_request'
-
-        headers = AWSV4Signer._get_headers(host, epoch_t, body)
-        sorted_headers = sorted([k for k in headers])
-        signed_headers = "{}".format(";".join(sorted_headers))
-
-        algorithm = 'AWS4-HMAC-SHA256'
-
-        string_to_sign = self._create_string_to_sign_v4(
-            method,
-            canonical_uri,
-            canonical_query_string,
-            body,
-            epoch_t,
-            algorithm,
-            host,
-            service,
-            region)
-
-        signing_key = AWSV4Signer._getV4SignatureKey(
-            self._secret_key, AWSV4Signer._get_date(epoch_t), region, service)
-
-        signature = hmac.new(
-            signing_key,
-            (string_to_sign).encode('utf-8'),
-            hashlib.sha256).hexdigest()
-
-        authorization_header = algorithm + ' ' + 'Credential=' + \
-            self._access_key + '/' + credential_scope + ', ' + \
-            'SignedHeaders=' + signed_headers + \
-            ', ' + 'Signature=' + signature
-        return authorization_header
-
     # generating AWS v4 signature header
     def prepare_signed_header(
             self,
@@ -196,7 +130,8 @@ class AWSV4Signer(object):
             request_uri,
             query_params,
             body,
-            read_range=None):
+            read_range=None,
+            amz_headers=None):
         """Generate headers used for authorization requests.
 
         Parameters:
@@ -209,6 +144,8 @@ class AWSV4Signer(object):
         body - content
         Range - range of bytes string,
                 example : total_read_bytes = range_start - range_end
+        amz_headers - dict of additional x-amz-* headers to sign and send,
+                      with lowercase names
 
         Returns:
             headers dictionary with following header keys: Authorization,
@@ -219,8 +156,8 @@ class AWSV4Signer(object):
                         access_key, secret_key).prepare_signed_header(
                                 'PUT', request_uri, query_params, body)
         """
-        url_parse_result = urllib.parse.urlparse(self._endpoint)
-        epoch_t = datetime.datetime.utcnow()
+        amz_timestamp = self._get_current_amz_timestamp()
+        date_stamp = amz_timestamp[:8]
         headers = {'content-type': 'application/x-www-form-urlencoded',
                    'Accept': 'text/plain'}
 
@@ -228,19 +165,133 @@ class AWSV4Signer(object):
         if read_range is not None:
             headers['Range'] = read_range
 
-        # Generate the signature and setup Authorization header.
-        headers['Authorization'] = self.sign_request_v4(
+        body_256sha_hex = 'UNSIGNED-PAYLOAD'
+        if body:
+            # body has some content.
+            body_256sha_hex = hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+        # Signed headers are host, x-amz-content-sha256, x-amz-date and
+        # amz_headers, in sorted order.
+        canonical_headers = {
+            'host': self._host,
+            'x-amz-content-sha256': body_256sha_hex,
+            'x-amz-date': amz_timestamp}
+        signed_headers = SIGNED_HEADERS
+        if amz_headers:
+            canonical_headers.update(
+                {name: str(value).strip()
+                 for name, value in amz_headers.items()})
+            signed_headers = ';'.join(sorted(canonical_headers))
+            headers.update(amz_headers)
+
+        # Canonical request from preformatted parts.
+        canonical_request = http_request + '\n' + request_uri + '\n' + \
+            query_params + '\n' + \
+            ''.join(name + ':' + canonical_headers[name] + '\n'
+                    for name in sorted(canonical_headers)) + '\n' + \
+            signed_headers + '\n' + body_256sha_hex
+
+        credential_scope = date_stamp + self._scope_suffix
+        string_to_sign = ALGORITHM + '\n' + amz_timestamp + '\n' + \
+            credential_scope + '\n' + \
+            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+
+        signing_key = self._get_signing_key(
+            date_stamp, self._region, self._service_name)
+        signature = hmac.new(
+            signing_key,
+            string_to_sign.encode('utf-8'),
+            hashlib.sha256).hexdigest()
+
+        # Setup Authorization header.
+        headers['Authorization'] = ALGORITHM + ' ' + 'Credential=' + \
+            self._access_key + '/' + credential_scope + ', ' + \
+            'SignedHeaders=' + signed_headers + \
+            ', ' + 'Signature=' + signature
+
+        # Setup std headers
+        headers['x-amz-date'] = amz_timestamp
+        headers['x-amz-content-sha256'] = body_256sha_hex
+        return headers
+
+    # generating AWS v4 signature header for aws-chunked payload
+    def prepare_streaming_signed_header(
+            self,
             http_request,
             request_uri,
             query_params,
-            body,
-            epoch_t,
-            url_parse_result.netloc,
-            self._service_name,
-            self._region)
+            decoded_content_length):
+        """Generate headers for request with aws-chunked signed payload.
 
-        # Setup std headers
-        headers['x-amz-date'] = AWSV4Signer._get_amz_timestamp(epoch_t)
-        # generated in _create_canonical_request()
-        headers['x-amz-content-sha256'] = self._body_hash_hex
-        return headers
+        Seed signature of these headers signs first chunk, see
+        AWSV4ChunkSigner. Caller sets Content-Length to encoded length.
+
+        Returns:
+            tuple (headers dictionary, AWSV4ChunkSigner for the payload).
+        """
+        amz_timestamp = self._get_current_amz_timestamp()
+        date_stamp = amz_timestamp[:8]
+        headers = {'content-type': 'application/x-www-form-urlencoded',
+                   'Accept': 'text/plain',
+                   'Content-Encoding': 'aws-chunked'}
+
+        canonical_request = http_request + '\n' + request_uri + '\n' + \
+            query_params + '\n' + \
+            'host:' + self._host + '\n' + \
+            'x-amz-content-sha256:' + STREAMING_PAYLOAD + '\n' + \
+            'x-amz-date:' + amz_timestamp + '\n' + \
+            'x-amz-decoded-content-length:' + \
+            str(decoded_content_length) + '\n' + '\n' + \
+            STREAMING_SIGNED_HEADERS + '\n' + STREAMING_PAYLOAD
+
+        credential_scope = date_stamp + self._scope_suffix
+        string_to_sign = ALGORITHM + '\n' + amz_timestamp + '\n' + \
+            credential_scope + '\n' + \
+            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+
+        signing_key = self._get_signing_key(
+            date_stamp, self._region, self._service_name)
+        seed_signature = hmac.new(
+            signing_key,
+            string_to_sign.encode('utf-8'),
+            hashlib.sha256).hexdigest()
+
+        headers['Authorization'] = ALGORITHM + ' ' + 'Credential=' + \
+            self._access_key + '/' + credential_scope + ', ' + \
+            'SignedHeaders=' + STREAMING_SIGNED_HEADERS + \
+            ', ' + 'Signature=' + seed_signature
+
+        headers['x-amz-date'] = amz_timestamp
+        headers['x-amz-content-sha256'] = STREAMING_PAYLOAD
+        headers['x-amz-decoded-content-length'] = str(decoded_content_length)
+
+        chunk_signer = AWSV4ChunkSigner(
+            signing_key, amz_timestamp, credential_scope, seed_signature)
+        return headers, chunk_signer
+
+
+class AWSV4ChunkSigner(object):
+    """Signs chunks of aws-chunked payload of one request.
+
+    Each chunk signature covers the chunk data and previous signature,
+    starting with seed signature of request headers.
+    """
+
+    def __init__(self, signing_key, amz_timestamp, credential_scope,
+                 seed_signature):
+        """Initialise."""
+        self._signing_key = signing_key
+        self._string_to_sign_prefix = CHUNK_ALGORITHM + '\n' + \
+            amz_timestamp + '\n' + credential_scope + '\n'
+        self._previous_signature = seed_signature
+
+    def sign_chunk(self, data):
+        """Returns signature for next chunk (empty for final chunk)."""
+        string_to_sign = self._string_to_sign_prefix + \
+            self._previous_signature + '\n' + EMPTY_SHA256_HEX + '\n' + \
+            hashlib.sha256(data).hexdigest()
+        self._previous_signature = hmac.new(
+            self._signing_key,
+            string_to_sign.encode('utf-8'),
+            hashlib.sha256).hexdigest()
+        return self._previous_signature
@@ -0,0 +1,102 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import asyncio
+
+
+class BufferPool:
+    """Bounds data in flight to buffer_count chunks of buffer_size.
+
+    Each chunk read from source takes a buffer slot till consumer asks for
+    next chunk, so memory used for data in flight stays flat irrespective
+    of object sizes. When all slots are taken, acquire waits for one to be
+    released. Chunks are aiohttp's own bytes, no memory is preallocated.
+    """
+
+    def __init__(self, buffer_size, buffer_count):
+        """Initialise."""
+        self._buffer_size = buffer_size
+        self._buffer_count = buffer_count
+
+        self._free_slots = asyncio.Semaphore(buffer_count)
+
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._acquire_count = 0
+        self._acquire_waits = 0
+
+    def get_buffer_size(self):
+        """Returns size of each buffer in bytes."""
+        return self._buffer_size
+
+    async def acquire(self):
+        """Takes a buffer slot, waits if none is free."""
+        self._acquire_count += 1
+        if self._free_slots.locked():
+            self._acquire_waits += 1
+        await self._free_slots.acquire()
+        self._in_use += 1
+        self._peak_in_use = max(self._peak_in_use, self._in_use)
+
+    def release(self):
+        """Returns buffer slot to the pool."""
+        self._in_use -= 1
+        self._free_slots.release()
+
+    def get_metrics(self):
+        """Returns pool occupancy metrics.
+
+        Returns
+        -------
+            dict: buffer size/count, buffers in use and waits on acquire.
+        """
+        return {
+            "buffer_size": self._buffer_size,
+            "buffer_count": self._buffer_count,
+            "max_bytes_in_flight": self._buffer_size * self._buffer_count,
+            "in_use": self._in_use,
+            "peak_in_use": self._peak_in_use,
+            "acquire_count": self._acquire_count,
+            "acquire_waits": self._acquire_waits
+        }
+
+
+async def read_pooled(stream_reader, buffer_pool, chunk_size):
+    """Reads stream a chunk at a time within buffer pool bound.
+
+    A buffer slot is taken before each chunk is read and released when next
+    chunk is requested, i.e. once consumer is done with the chunk. Chunks
+    are bytes returned by stream reader, passed on without copying.
+
+    Args
+    -----
+        stream_reader: aiohttp StreamReader of response body.
+        buffer_pool (BufferPool): Pool to take buffer slots from.
+        chunk_size (int): Max bytes per yielded chunk, capped at buffer size.
+    """
+    chunk_size = min(chunk_size, buffer_pool.get_buffer_size())
+    while True:
+        await buffer_pool.acquire()
+        try:
+            data = await stream_reader.read(chunk_size)
+            if not data:
+                break
+            yield data
+        finally:
+            buffer_pool.release()
@@ -0,0 +1,200 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# fair_queue.py
+#
+# Queue of replication ids with priority levels, and deficit round robin
+# between sub-queues (e.g. per bucket) within a level.
+
+from collections import OrderedDict
+
+# Bytes of credit a sub-queue gets per round.
+DRR_QUANTUM = 64 * 1024 * 1024
+# Cost of a job is its object size, within [JOB_MIN_COST, DRR_QUANTUM], so
+# tiny objects still account for per-job overhead and a sub-queue is always
+# served at least one job per round.
+JOB_MIN_COST = 1024 * 1024
+
+
+class _SubQueue:
+    __slots__ = ("entries", "deficit")
+
+    def __init__(self):
+        """Initialise."""
+        # replication_id: cost in FIFO order.
+        self.entries = OrderedDict()
+        self.deficit = 0
+
+
+class _Level:
+    __slots__ = ("sub_queues", "in_turn")
+
+    def __init__(self):
+        """Initialise."""
+        # key: _SubQueue, first one has current turn.
+        self.sub_queues = OrderedDict()
+        # True once first sub-queue got quantum for current turn.
+        self.in_turn = False
+
+
+class FairQueue:
+    """Queue of replication ids served by priority, then fairly by key.
+
+    Higher priority levels are always served first. Within a level each
+    key (e.g. bucket) has a FIFO sub-queue, and sub-queues are served by
+    deficit round robin with job cost based on object size, so a key with
+    many or large objects cannot hold back other keys.
+
+    Add, remove and membership are O(1), serving count entries is
+    O(count).
+    """
+
+    def __init__(self, quantum=DRR_QUANTUM, min_cost=JOB_MIN_COST):
+        """Initialise."""
+        self._quantum = quantum
+        self._min_cost = min_cost
+        # priority: _Level
+        self._levels = {}
+        # Priorities with entries, highest first.
+        self._priorities = []
+        # replication_id: (priority, key)
+        self._index = {}
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, replication_id):
+        return replication_id in self._index
+
+    def __iter__(self):
+        """Iterates by priority, sub-queues in FIFO order."""
+        for priority in self._priorities:
+            for sub_queue in self._levels[priority].sub_queues.values():
+                for replication_id in sub_queue.entries:
+                    yield replication_id
+
+    def clear(self):
+        self._levels.clear()
+        self._priorities = []
+        self._index.clear()
+
+    def _cost(self, object_size):
+        try:
+            cost = int(object_size)
+        except (TypeError, ValueError):
+            cost = 0
+        return min(max(cost, self._min_cost), self._quantum)
+
+    def add(self, replication_id, key, priority, object_size):
+        """Appends replication_id to sub-queue of key at priority level."""
+        level = self._levels.get(priority)
+        if level is None:
+            level = _Level()
+            self._levels[priority] = level
+            self._priorities = sorted(self._levels, reverse=True)
+        sub_queue = level.sub_queues.get(key)
+        if sub_queue is None:
+            # New sub-queue waits for its turn at end of round.
+            sub_queue = _SubQueue()
+            level.sub_queues[key] = sub_queue
+        sub_queue.entries[replication_id] = self._cost(object_size)
+        self._index[replication_id] = (priority, key)
+
+    def remove(self, replication_id):
+        """Removes replication_id, returns False if it was not queued."""
+        location = self._index.pop(replication_id, None)
+        if location is None:
+            return False
+        priority, key = location
+        level = self._levels[priority]
+        sub_queue = level.sub_queues[key]
+        del sub_queue.entries[replication_id]
+        if not sub_queue.entries:
+            if next(iter(level.sub_queues)) == key:
+                level.in_turn = False
+            del level.sub_queues[key]
+            if not level.sub_queues:
+                del self._levels[priority]
+                self._priorities.remove(priority)
+        return True
+
+    def _serve_level(self, level, count, served):
+        """Appends up to count entries of level to served, in DRR order.
+
+        Each turn serves at least one entry or exhausts a sub-queue, and
+        exhausted sub-queues leave the rotation till level is served, so
+        turns taken are O(count).
+        """
+        # key: [iterator over entries, entry not yet served]
+        cursors = {}
+        # (key, sub-queue) with no more entries to serve, in turn order.
+        exhausted = []
+        while len(served) < count and level.sub_queues:
+            key, sub_queue = next(iter(level.sub_queues.items()))
+            if not level.in_turn:
+                sub_queue.deficit += self._quantum
+                level.in_turn = True
+            cursor = cursors.get(key)
+            if cursor is None:
+                cursor = [iter(sub_queue.entries.items()), None]
+                cursors[key] = cursor
+
+            turn_over = False
+            while len(served) < count:
+                if cursor[1] is None:
+                    cursor[1] = next(cursor[0], None)
+                    if cursor[1] is None:
+                        # Sub-queue has no more entries to serve.
+                        exhausted.append((key, sub_queue))
+                        sub_queue.deficit = 0
+                        turn_over = True
+                        break
+                replication_id, cost = cursor[1]
+                if cost > sub_queue.deficit:
+                    turn_over = True
+                    break
+                sub_queue.deficit -= cost
+                served.append(replication_id)
+                cursor[1] = None
+
+            if not turn_over:
+                # Served count, sub-queue continues its turn next time.
+                break
+            if exhausted and exhausted[-1][0] == key:
+                del level.sub_queues[key]
+            else:
+                level.sub_queues.move_to_end(key)
+            level.in_turn = False
+
+        # Exhausted sub-queues had their turn, back at end of round.
+        for key, sub_queue in exhausted:
+            level.sub_queues[key] = sub_queue
+
+    def serve(self, count):
+        """Returns next count replication ids to dispatch.
+
+        Entries stay queued till removed, but are accounted as served for
+        fairness, so caller is expected to dispatch and remove them.
+        """
+        served = []
+        for priority in self._priorities:
+            if len(served) >= count:
+                break
+            self._serve_level(self._levels[priority], count, served)
+        return served
@@ -18,10 +18,10 @@
 #
 
 import json
+import sys
 import uuid
 from enum import Enum
-from urllib.parse import urlparse
-from .s3_site import S3Site
+from .site_table import SiteTable
 
 # operation type
 
@@ -60,6 +60,60 @@ class JobEvents(Enum):
     FAILED = 6
     ABORTED = 7  # explicitly aborted
 
+
+def _get_path(obj, keys):
+    """Returns value at nested keys of obj, None if missing."""
+    try:
+        for key in keys:
+            obj = obj[key]
+    except (KeyError, TypeError):
+        return None
+    return obj
+
+
+def _intern(value):
+    """Interns strings repeated across many jobs."""
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def _get_priority(obj):
+    """Returns integer priority of job record, 0 if missing or invalid."""
+    try:
+        return int(obj.get("priority", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+# Sites inlined in job records are shared by many jobs, keep single
+# instance of each, for most recently used MAX_INLINE_SITES sites.
+MAX_INLINE_SITES = 1024
+_inline_sites = SiteTable(max_inline_sites=MAX_INLINE_SITES)
+
+# Encodes single json value, skips json.dumps argument handling.
+_encode_json_value = json.JSONEncoder().encode
+
+
+def _resolve_site(site_dict, site_table):
+    """Returns (site_id, Site) for source/target of job record.
+
+    Site is None when site_id is not in site_table or inlined site is
+    incomplete.
+    """
+    if not isinstance(site_dict, dict):
+        return None, None
+    site_id = site_dict.get("site_id")
+    if site_id is not None:
+        if site_table is None:
+            return site_id, None
+        return site_id, site_table.get_site(site_id)
+    try:
+        return None, _inline_sites.get_inline_site(site_dict)
+    except (KeyError, TypeError, AttributeError):
+        return None, None
+
+
 # Job model to be used across both replication manager and replicator
 
 
@@ -69,30 +123,88 @@ class Job:
     Provides methods to serialise/deserialise as json. Maintains S3
     replication source and target details, operation type etc. For Job json
     format see sample in templates/replication_job_template.json.
+
+    Fields used on the replication path are held in slots, with sites and
+    credentials shared across jobs. Rest of job record is kept as compact
+    json and job dict is built from it only when job is serialised.
+
+    Source and target site are either inlined in job record, or referred
+    by "site_id" and resolved from site table.
     """
 
-    def __init__(self, obj):
-        """Initialise Job."""
-        if obj is not None:
-            self._obj = obj
-        else:
-            self._obj = {}
+    __slots__ = (
+        "_id", "_remote_job_id", "_subscriber_id", "_state", "_replicator",
+        "_part_layout", "_record_json", "_replication_id", "_priority",
+        "_operation_type", "_source_bucket_name", "_source_object_name",
+        "_source_object_size", "_source_owner_account_id", "_source_site_id",
+        "_source_site", "_target_bucket_name", "_target_site_id",
+        "_target_site", "_failure_count", "_object_tagset")
+
+    def __init__(self, obj, job_id=None, site_table=None):
+        """Initialise Job.
+
+        Args
+        -----
+            obj (dict): Job record.
+            job_id (str, optional): Use given job_id instead of generating
+            one, e.g. when restoring a persisted job.
+            site_table (SiteTable, optional): Resolves site_id of source
+            and target.
+        """
+        if obj is None:
+            obj = {}
 
         # There are 2 identifiers, job_id which is generated
         # and replication id that is sent by job creator.
-        self._id = str(uuid.uuid4())
+        if job_id is None:
+            job_id = str(uuid.uuid4())
+        self._id = job_id
 
-        self._remote_job_id = None
-        if self._obj.get('job_id', None) is not None:
-            self._remote_job_id = self._obj['job_id']
-        self._obj['job_id'] = self._id
+        self._remote_job_id = obj.get('job_id', None)
 
         # Set when job is sent from manager to replicator(subscriber)
-        self._obj["subscriber_id"] = None
+        self._subscriber_id = None
 
         self._replicator = None
+        # Part lengths of multipart source object, once discovered.
+        self._part_layout = None
+        # Times job failed, so failed jobs are retried a bounded number of
+        # times.
+        self._failure_count = 0
+        self._load(obj, site_table)
         self._update_state(JobState.INITIAL)
 
+    def _load(self, obj, site_table):
+        """Extracts fields held in slots and compacts rest of record."""
+        # Held in slots, added back when dict is built.
+        record = {key: value for key, value in obj.items()
+                  if key not in ("job_id", "subscriber_id", "state")}
+        self._record_json = json.dumps(record, separators=(',', ':'))
+        # Parsed from record on first use.
+        self._object_tagset = None
+
+        source = obj.get("source", {})
+        attributes = _get_path(source, ["operation", "attributes"])
+        target = obj.get("target", {})
+
+        self._replication_id = obj.get("replication-id")
+        self._priority = _get_priority(obj)
+        self._operation_type = _get_path(source, ["operation", "type"])
+        self._source_bucket_name = _intern(
+            _get_path(attributes, ["Bucket-Name"]))
+        self._source_object_name = _get_path(attributes, ["Object-Name"])
+        self._source_object_size = _get_path(attributes, ["Content-Length"])
+        self._source_owner_account_id = _intern(
+            _get_path(attributes, ["Owner-Account-id"]))
+
+        self._source_site_id, self._source_site = _resolve_site(
+            source, site_table)
+
+        self._target_bucket_name = _intern(
+            _get_path(target, ["Bucket-Name"]))
+        self._target_site_id, self._target_site = _resolve_site(
+            target, site_table)
+
     def set_replicator(self, replicator):
         """
         Sets a reference to replicator for future signals (pause/abort).
@@ -103,6 +215,22 @@ class Job:
         """
         self._replicator = replicator
 
+    def set_part_layout(self, part_layout):
+        """
+        Caches part layout of source object.
+
+        Args:
+            part_layout (list[int]): Length of each part of multipart source
+            object, in part number order.
+        """
+        self._part_layout = part_layout
+
+    def get_part_layout(self):
+        """
+        Returns cached part layout of source object, None if not discovered.
+        """
+        return self._part_layout
+
     def get_state(self):
         """Get job state."""
         return self._state
@@ -134,8 +262,8 @@ class Job:
 
             assert self.get_target_access_key() is not None
             assert self.get_target_secret_key() is not None
-        except (KeyError, AssertionError):
-            # Missing required field in job.
+        except (KeyError, AttributeError, AssertionError):
+            # Missing required field or unknown site in job.
             return False
 
         return True
@@ -143,7 +271,6 @@ class Job:
     def _update_state(self, state):
         """Updates the state to given state."""
         self._state = state
-        self._obj['state'] = str(self._state)
 
     def mark_started(self):
         """
@@ -161,8 +288,15 @@ class Job:
         """
         Mark job as failed.
         """
+        self._failure_count += 1
         self._update_state(JobState.FAILED)
 
+    def get_failure_count(self):
+        """
+        Returns times job was marked failed.
+        """
+        return self._failure_count
+
     def mark_aborted(self):
         """
         Mark job as aborted.
@@ -187,36 +321,60 @@ class Job:
         """
         Request replicator to abort.
         """
-        self._replicator.abort()
+        # No replicator yet for job waiting to start.
+        if self._replicator is not None:
+            self._replicator.abort()
         self._update_state(JobState.ABORTED)
 
     def get_dict(self):
-        return self._obj
+        """
+        Returns job record as new dict, changes to it are not retained.
+        """
+        obj = json.loads(self._record_json)
+        obj['job_id'] = self._id
+        obj['subscriber_id'] = self._subscriber_id
+        obj['state'] = str(self._state)
+        return obj
 
-    def from_json(self, json_string):
+    def from_json(self, json_string, site_table=None):
         """
-        Loads Job attributes from json.
+        Loads Job attributes from json, job_id is retained.
         """
-        self._obj = json.loads(json_string)
-        if self.obj["job_id"] is None:
-            # job_id is not present in generated string then use existing
-            self._obj["job_id"] = self._id
-        else:
-            # json_string already have job_id
-            self._obj = self._obj["job_id"]
-        self._replication_id = self._obj["replication-id"]
+        self._load(json.loads(json_string), site_table)
 
     def to_json(self):
         """
         Converts Job to json.
         """
-        return json.dumps(self._obj)
+        # Splice fields in slots into compact record, same as
+        # json.dumps(self.get_dict()) without building the dict.
+        fields = '"job_id":{},"subscriber_id":{},"state":{}'.format(
+            _encode_json_value(self._id),
+            _encode_json_value(self._subscriber_id),
+            _encode_json_value(self._state.name))
+        if self._record_json == '{}':
+            return '{' + fields + '}'
+        return self._record_json[:-1] + ',' + fields + '}'
+
+    def get_record_json(self):
+        """
+        Returns job record as compact json, without job_id, subscriber_id
+        and state. Returned string is never modified, so it can be used
+        off event loop.
+        """
+        return self._record_json
 
     def get_replication_id(self):
         """
         Returns replication id.
         """
-        return self._obj["replication-id"]
+        return self._replication_id
+
+    def get_priority(self):
+        """
+        Returns replication priority, higher is replicated first.
+        """
+        return self._priority
 
     def get_job_id(self):
         """
@@ -234,69 +392,77 @@ class Job:
         """
         Get replication type.
         """
-        return self._obj["source"]["operation"]["type"]
+        return self._operation_type
 
     # Source attribute accessors
     def get_object_tagset(self):
         """
         Get object tagset
         """
-        return self._obj["User-Defined-Tags"]
+        if self._object_tagset is None:
+            self._object_tagset = json.loads(
+                self._record_json)["User-Defined-Tags"]
+        return self._object_tagset
 
     def get_source_endpoint_netloc(self):
         """
         Returns the netloc within source S3 endpoint.
         """
-        return urlparse(self._obj["source"]["endpoint"]).netloc
+        return self._source_site.s3_site.get_netloc()
+
+    def get_source_site_id(self):
+        """
+        Returns id of source site, None if site is inlined in job record.
+        """
+        return self._source_site_id
 
     def get_source_s3_site(self):
         """
         Returns S3 site instance.
         """
-        return S3Site(self.get_source_endpoint(),
-                      self.get_source_s3_service_name(),
-                      self.get_source_s3_region(),
-                      self.get_source_admin_endpoint())
+        return self._source_site.s3_site
+
+    def get_source_session_key(self):
+        """
+        Returns key identifying S3 session for source site and credentials.
+        """
+        return self._source_site.session_key
 
     def get_source_bucket_name(self):
         """
         Returns source bucket name.
         """
-        return self._obj["source"]["operation"]["attributes"]["Bucket-Name"]
+        return self._source_bucket_name
 
     def get_source_object_name(self):
         """
         Returns source object name.
         """
-        return self._obj["source"]["operation"]["attributes"]["Object-Name"]
+        return self._source_object_name
 
     def get_source_object_size(self):
-        return self._obj["source"]["operation"]["attributes"]["Content-Length"]
+        return self._source_object_size
 
     def get_source_owner_account_id(self):
-        return self._obj["source"]["operation"][
-            "attributes"]["Owner-Account-id"]
+        return self._source_owner_account_id
 
     def get_source_endpoint(self):
-        return self._obj["source"]["endpoint"]
+        return self._source_site.s3_site.endpoint
 
     def get_source_admin_endpoint(self):
-        try:
-            return self._obj["source"]["admin_endpoint"]
-        except KeyError:
-            return None
+        return self._source_site.s3_site.admin_endpoint
 
     def get_source_s3_service_name(self):
-        return self._obj["source"]["service_name"]
+        return self._source_site.s3_site.service_name
 
     def get_source_s3_region(self):
-        return self._obj["source"]["region"]
+        return self._source_site.s3_site.region
 
     def get_source_access_key(self):
-        return self._obj["source"]["access_key"]
+        return self._source_site.access_key
 
     def get_source_secret_key(self):
-        return self._obj["source"]["secret_key"]
+        return self._source_site.secret_key
 
     # Target attribute accessors
 
@@ -304,46 +470,56 @@ class Job:
         """
         Returns the netloc within target S3 endpoint.
         """
-        return urlparse(self._obj["target"]["endpoint"]).netloc
+        return self._target_site.s3_site.get_netloc()
+
+    def get_target_site_id(self):
+        """
+        Returns id of target site, None if site is inlined in job record.
+        """
+        return self._target_site_id
 
     def get_target_s3_site(self):
         """
         Returns S3 site instance.
         """
-        return S3Site(self.get_target_endpoint(),
-                      self.get_target_s3_service_name(),
-                      self.get_target_s3_region())
+        return self._target_site.s3_site
+
+    def get_target_session_key(self):
+        """
+        Returns key identifying S3 session for target site and credentials.
+        """
+        return self._target_site.session_key
 
     def get_target_bucket_name(self):
         """
         Returns target bucket name.
         """
-        return self._obj["target"]["Bucket-Name"]
+        return self._target_bucket_name
 
     def get_target_endpoint(self):
-        return self._obj["target"]["endpoint"]
+        return self._target_site.s3_site.endpoint
 
     def get_target_s3_service_name(self):
-        return self._obj["target"]["service_name"]
+        return self._target_site.s3_site.service_name
 
     def get_target_s3_region(self):
-        return self._obj["target"]["region"]
+        return self._target_site.s3_site.region
 
     def get_target_access_key(self):
-        return self._obj["target"]["access_key"]
+        return self._target_site.access_key
 
     def get_target_secret_key(self):
-        return self._obj["target"]["secret_key"]
+        return self._target_site.secret_key
 
     def set_subscriber_id(self, sub_id):
-        self._obj["subscriber_id"] = sub_id
+        self._subscriber_id = sub_id
 
     def get_subscriber_id(self):
-        return self._obj["subscriber_id"]
+        return self._subscriber_id
 
 
 class JobJsonEncoder(json.JSONEncoder):
     def default(self, o):  # pylint: disable=E0202
         if isinstance(o, Job):
-            return o._obj
+            return o.get_dict()
         return super().default(o)
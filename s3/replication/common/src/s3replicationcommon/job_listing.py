@@ -0,0 +1,123 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# job_listing.py
+#
+# Streams job lists for GET /jobs, one page at a time with limit and after
+# query parameters.
+
+import asyncio
+import json
+from aiohttp import web
+
+# Jobs encoded per write, and jobs scanned for a page between yields to
+# event loop, other requests are served in between.
+LIST_CHUNK_SIZE = 256
+
+# Response header with cursor to pass as after for next page.
+NEXT_AFTER_HEADER = "X-Next-After"
+
+_encode_json_value = json.JSONEncoder().encode
+
+
+def _get_int(query, name, minimum):
+    """Returns int value of query parameter, None if absent.
+
+    Raises ValueError for value which is not an int >= minimum.
+    """
+    values = query.get(name)
+    if not values:
+        return None
+    value = int(values[0])
+    if value < minimum:
+        raise ValueError("{} must be >= {}".format(name, minimum))
+    return value
+
+
+def parse_page_query(query):
+    """Returns (after, limit) from parsed query, None for absent ones.
+
+    Args
+    -----
+        query (dict): Query as parsed by parse_qs.
+
+    Raises ValueError for invalid values.
+    """
+    return _get_int(query, "after", 0), _get_int(query, "limit", 1)
+
+
+async def stream_jobs(request, jobs, query, state=None, as_dict=False):
+    """Responds with json list of jobs in order they were added, or entered
+    state when listing jobs in a state.
+
+    Args
+    -----
+        request (web.Request): Request being served.
+        jobs (Jobs): Jobs to list.
+        query (dict): Query as parsed by parse_qs, with optional limit and
+        after.
+        state (str, optional): Lists jobs in this state only, see
+        Jobs.iter_jobs_after.
+        as_dict (bool, optional): Respond with {replication-id: job}.
+
+    Returns
+    -------
+        web.StreamResponse: With NEXT_AFTER_HEADER when page has limit
+        jobs, 400 response for invalid limit/after.
+    """
+    try:
+        after, limit = parse_page_query(query)
+    except ValueError:
+        return web.json_response(
+            {'ErrorResponse': 'Invalid limit/after!'}, status=400)
+
+    page = []
+    cursor = None
+    scanned = 0
+    for cursor, job in jobs.iter_jobs_after(state, after):
+        if job is not None:
+            page.append(job)
+            if len(page) == limit:
+                break
+        scanned += 1
+        if scanned % LIST_CHUNK_SIZE == 0:
+            await asyncio.sleep(0)
+
+    response = web.StreamResponse(status=200)
+    response.content_type = 'application/json'
+    if limit is not None and len(page) == limit:
+        response.headers[NEXT_AFTER_HEADER] = str(cursor)
+    await response.prepare(request)
+
+    separator = ''
+    await response.write(b'{' if as_dict else b'[')
+    for start in range(0, len(page), LIST_CHUNK_SIZE):
+        chunk = page[start:start + LIST_CHUNK_SIZE]
+        if as_dict:
+            entries = [_encode_json_value(str(job.get_replication_id())) +
+                       ':' + job.to_json() for job in chunk]
+        else:
+            entries = [job.to_json() for job in chunk]
+        await response.write((separator + ','.join(entries)).encode())
+        separator = ','
+        # Dont starve other requests while listing many jobs.
+        await asyncio.sleep(0)
+    await response.write(b'}' if as_dict else b']')
+    await response.write_eof()
+    return response
@@ -18,13 +18,24 @@
 #
 
 import asyncio
-from collections import OrderedDict
+import bisect
+import time
+from collections import OrderedDict, deque
 from .job import Job
-from .job import JobState
 from .job import JobJsonEncoder
+from .fair_queue import FairQueue
 from .s3_common import move_across_sets
 import json
 
+# Expired entries are removed in batches, at most this many secs late.
+EXPIRY_SWEEP_GRANULARITY = 1
+
+# Keys by which queued jobs share replication bandwidth fairly.
+FAIRNESS_KEYS = {
+    "bucket": lambda job: job.get_source_bucket_name(),
+    "account": lambda job: job.get_source_owner_account_id()
+}
+
 
 class Jobs:
     @staticmethod
@@ -36,15 +47,23 @@ class Jobs:
     def list_dumps(obj):
         return json.dumps(obj, cls=JobJsonEncoder)
 
-    def __init__(self, logger, label, timeout=None):
+    def __init__(self, logger, label, timeout=None, max_count=None,
+                 fairness_key="bucket"):
         """
         Initialises collection with given label used for logging. Entries in
         Collection will be retained for given timeout. When timeout is
         not specified, entries will remain until explicitly removed.
+        When max_count is specified, least recently used entries are evicted
+        to hold at most max_count entries, meant for caches.
+        Queued jobs are handed out by priority, and within a priority
+        fairly across source buckets or accounts as per fairness_key.
         Args:
             logger (logger): For debug logging.
             label (str): Identifies the collection in logs.
             timeout (int, optional): Specified in secs. Defaults to None.
+            max_count (int, optional): Max entries. Defaults to None.
+            fairness_key (str, optional): bucket or account, see
+            FAIRNESS_KEYS. Defaults to bucket.
         """
         # Dictionary holding replication_id and replication record.
         # e.g. : jobs = {"replication-id": Job({"attribute-1": "foo"})}
@@ -52,18 +71,62 @@ class Jobs:
         self._logger = logger
         self._label = label
         self._timeout = timeout
+        self._max_count = max_count
+        self._fairness_key = FAIRNESS_KEYS[fairness_key]
+
+        # (expiry time, job_id) in insertion order, which is also expiry
+        # order as timeout is same for all. Single sweeper task expires
+        # entries, and exits when there is nothing to expire.
+        self._expiry_queue = deque()
+        self._expiry_sweeper = None
+
+        # replication-id in least to most recently used order.
+        self._lru = None
+        if max_count is not None:
+            self._lru = OrderedDict()
 
         # Additionally store job_id and replication_id mapping.
         self._job_id_to_replication_id_map = {}
 
+        # Jobs in order added, for listing from a cursor. Each job gets
+        # increasing sequence number, entries of removed jobs are dropped
+        # in batches.
+        self._next_seq = 0
+        self._job_seq = {}
+        self._order_seqs = []
+        self._order_ids = []
+        # Jobs of each state in order they entered it, for listing a state
+        # from a cursor. Each entry gets next sequence number, entries of
+        # jobs which left the state are dropped in batches.
+        self._state_seq = {}
+        self._state_orders = {state: [[], []] for state in
+                              ("queued", "inprogress", "paused", "completed")}
+
         # Set of replication-id per Job state.
         # For faster lookups as per state.
         # _jobs = _jobs_queued + _jobs_inprogress + _jobs_completed
-        self._jobs_queued = OrderedDict()
+        self._jobs_queued = FairQueue()
         self._jobs_inprogress = set()
         self._jobs_paused = set()
         self._jobs_completed = set()
 
+        # Called when a new job is queued, so consumers need not poll.
+        self._queued_listener = None
+        # Persists state transitions when set.
+        self._journal = None
+
+    def set_queued_listener(self, listener):
+        """Register callable invoked with no args when a job is queued."""
+        self._queued_listener = listener
+
+    def set_journal(self, journal):
+        """Register journal that records every add, move and remove."""
+        self._journal = journal
+
+    def _journal_move(self, replication_id, to_state):
+        if self._journal is not None:
+            self._journal.record_move(self.get_job(replication_id), to_state)
+
     def get_keys(self):
         """Returns all jobs."""
         return self._jobs.keys()
@@ -75,6 +138,16 @@ class Jobs:
         self._jobs_inprogress.clear()
         self._jobs_paused.clear()
         self._jobs_completed.clear()
+        self._job_id_to_replication_id_map.clear()
+        self._job_seq.clear()
+        self._order_seqs = []
+        self._order_ids = []
+        self._state_seq.clear()
+        for state_order in self._state_orders.values():
+            state_order[:] = [[], []]
+        self._expiry_queue.clear()
+        if self._lru is not None:
+            self._lru.clear()
 
     def get_queued(self, count=None):
         """Get list of queued jobs.
@@ -87,39 +160,92 @@ class Jobs:
         -------
             list[Job]: List of jobs in queued state.
         """
-        # Creates array reference, use cautiously w.r.t performance.
-        queued_list = []
         if count is None:
-            # Return all.
-            count = len(self._jobs_queued)
+            # Return all, highest priority first.
+            return [self._jobs[replication_id]
+                    for replication_id in self._jobs_queued]
 
-        # Only return first 'count' number of entries.
-        for replication_id in self._jobs_queued.keys():
-            if count == 0:
-                break
-            count -= 1
-            queued_list.append(
-                self.get_job(replication_id))
-
-        return queued_list
+        # Next jobs to dispatch, counted as dispatched for fairness across
+        # buckets/accounts, O(count).
+        return [self._jobs[replication_id]
+                for replication_id in self._jobs_queued.serve(count)]
 
     def get_inprogress(self):
         """Get list of inprogress jobs."""
-        # Creates new dictionary reference, use cautiously w.r.t performance.
-        in_progress_list = [self._jobs for key in self._jobs_inprogress]
-        return in_progress_list
+        return [self._jobs[key] for key in self._jobs_inprogress]
 
     def get_paused(self):
         """Get list of paused jobs."""
-        # Creates new dictionary reference, use cautiously w.r.t performance.
-        paused_list = [self._jobs for key in self._jobs_paused]
-        return paused_list
+        return [self._jobs[key] for key in self._jobs_paused]
 
     def get_completed(self):
         """Get list of completed jobs."""
-        # Creates new dictionary reference, use cautiously w.r.t performance.
-        completed_list = [self._jobs for key in self._jobs_completed]
-        return completed_list
+        return [self._jobs[key] for key in self._jobs_completed]
+
+    def _get_state_members(self, state):
+        return {"queued": self._jobs_queued,
+                "inprogress": self._jobs_inprogress,
+                "paused": self._jobs_paused,
+                "completed": self._jobs_completed}[state]
+
+    def _enter_state(self, replication_id, state):
+        """Appends job to listing order of state it moved to."""
+        state_order = self._state_orders[state]
+        state_order[0].append(self._next_seq)
+        state_order[1].append(replication_id)
+        self._state_seq[replication_id] = self._next_seq
+        self._next_seq += 1
+        if len(state_order[1]) > \
+                2 * len(self._get_state_members(state)) + 1024:
+            self._compact_state_order(state)
+
+    def iter_jobs_after(self, state=None, after=None):
+        """Yields (cursor, job) in order jobs were added, or entered state.
+
+        Entries skipped as their job was removed or left state are yielded
+        with job None, so callers can bound work between awaits. Safe to
+        use across awaits, jobs added meanwhile may be included.
+
+        Args:
+            state (str, optional): queued, inprogress, paused or completed.
+            Defaults to None, for all jobs.
+            after (int, optional): Cursor of job to continue after.
+            Defaults to None, from first job.
+        """
+        if state is None:
+            members = self._jobs
+            entry_seq = self._job_seq
+            # Compaction replaces the lists, so hold on to current ones.
+            order_seqs = self._order_seqs
+            order_ids = self._order_ids
+        else:
+            members = self._get_state_members(state)
+            entry_seq = self._state_seq
+            order_seqs, order_ids = self._state_orders[state]
+        index = 0
+        if after is not None:
+            index = bisect.bisect_right(order_seqs, after)
+        while index < len(order_ids):
+            seq = order_seqs[index]
+            replication_id = order_ids[index]
+            index += 1
+            if entry_seq.get(replication_id) == seq and \
+                    replication_id in members:
+                yield seq, self._jobs[replication_id]
+            else:
+                yield seq, None
+
+    def iter_jobs_by_state(self):
+        """Yields (state, job) for all jobs, queued jobs in queue order.
+
+        state is one of queued, inprogress, paused or completed.
+        """
+        for label, replication_ids in [("queued", self._jobs_queued),
+                                       ("inprogress", self._jobs_inprogress),
+                                       ("paused", self._jobs_paused),
+                                       ("completed", self._jobs_completed)]:
+            for replication_id in replication_ids:
+                yield label, self._jobs[replication_id]
 
     def move_to_inprogress(self, replication_id):
         """Move job to in-progress list."""
@@ -128,14 +254,18 @@ class Jobs:
                 "State change [Queued to Inprogress] for replication-id {},".
                 format(replication_id))
 
-            self._jobs_queued.pop(replication_id)
+            self._jobs_queued.remove(replication_id)
             self._jobs_inprogress.add(replication_id)
+            self._enter_state(replication_id, "inprogress")
+            self._journal_move(replication_id, "inprogress")
         elif replication_id in self._jobs_paused:
             self._logger.debug(
                 "State change [Paused to Inprogress] for replication-id {},".
                 format(replication_id))
             move_across_sets(self._jobs_paused, self._jobs_inprogress,
                              replication_id)
+            self._enter_state(replication_id, "inprogress")
+            self._journal_move(replication_id, "inprogress")
         else:
             # If was not in queued/paused, then invalid state.
             assert False, "Bug: Invalid state transition for job {}".format(
@@ -150,6 +280,8 @@ class Jobs:
                 format(replication_id))
             move_across_sets(self._jobs_inprogress, self._jobs_paused,
                              replication_id)
+            self._enter_state(replication_id, "paused")
+            self._journal_move(replication_id, "paused")
         else:
             # If was not in inprogress, then invalid state.
             assert False, "Bug: Invalid state transition for job {}".format(
@@ -162,8 +294,10 @@ class Jobs:
             self._logger.debug(
                 "State change [Inprogress to Queued] for replication-id {},".
                 format(replication_id))
-            self._jobs_queued[replication_id] = None
+            self._enqueue(self._jobs[replication_id])
             self._jobs_inprogress.remove(replication_id)
+            self._enter_state(replication_id, "queued")
+            self._journal_move(replication_id, "queued")
         else:
             # If was not in inprogress, then invalid state.
             assert False, "Bug: Invalid state transition for job {}".format(
@@ -178,6 +312,8 @@ class Jobs:
                 " for replication-id {},".format(replication_id))
             move_across_sets(self._jobs_inprogress, self._jobs_completed,
                              replication_id)
+            self._enter_state(replication_id, "completed")
+            self._journal_move(replication_id, "completed")
         else:
             # If was not in inprogress, then invalid state.
             assert False, "Bug: Invalid state transition for job {}".format(
@@ -231,6 +367,15 @@ class Jobs:
             return True
         return False
 
+    def is_job_inprogress(self, replication_id):
+        """
+        Checks if job with given replication id is in progress.
+
+        Args:
+            replication_id (str): Replication identifier.
+        """
+        return replication_id in self._jobs_inprogress
+
     def add_job_using_json(self, job_json):
         """
         Validate json, create and add job to job list.
@@ -264,6 +409,12 @@ class Jobs:
         self._jobs[job.get_replication_id()] = job
         self._job_id_to_replication_id_map[job.get_job_id()] = \
             job.get_replication_id()
+        self._job_seq[job.get_replication_id()] = self._next_seq
+        self._order_seqs.append(self._next_seq)
+        self._order_ids.append(job.get_replication_id())
+        self._next_seq += 1
+        if self._journal is not None:
+            self._journal.record_add(job)
 
         if self._label == "completed-jobs":
             # If calling object is having label of "completed-jobs" type,
@@ -271,18 +422,32 @@ class Jobs:
             self._logger.debug("Jobs[{}]: Adding job with job_id {} into jobs_completed".
                                format(self._label, job.get_job_id()))
             self._jobs_completed.add(job.get_replication_id())
+            self._enter_state(job.get_replication_id(), "completed")
         else:
             # Initial state is queued for "all-jobs" type object.
             self._logger.debug("Jobs[{}]: Adding job with job_id {} into jobs_queued".
                                format(self._label, job.get_job_id()))
-            self._jobs_queued[job.get_replication_id()] = None
+            self._enqueue(job)
+            self._enter_state(job.get_replication_id(), "queued")
+            if self._queued_listener is not None:
+                self._queued_listener()
+
+        if self._lru is not None:
+            self._lru[job.get_replication_id()] = None
+            while len(self._jobs) > self._max_count:
+                self._evict_lru()
 
         if self._timeout is not None:
-            asyncio.ensure_future(
-                self.schedule_clear_cache(job.get_job_id())
-            )
+            self._schedule_expiry(job.get_job_id())
         return True
 
+    def _enqueue(self, job):
+        """Appends job to queue of its priority and bucket/account."""
+        self._jobs_queued.add(job.get_replication_id(),
+                              self._fairness_key(job),
+                              job.get_priority(),
+                              job.get_source_object_size())
+
     def get_job(self, replication_id):
         """
         Search jobs list and return job with replication_id.
@@ -307,6 +472,8 @@ class Jobs:
         replication_id = self._job_id_to_replication_id_map.get(job_id)
         if replication_id is None:
             return None
+        if self._lru is not None:
+            self._lru.move_to_end(replication_id)
         return self.get_job(replication_id)
 
     def _remove_job(self, replication_id):
@@ -322,18 +489,40 @@ class Jobs:
         """
         job = self._jobs.pop(replication_id, None)
         if job is not None:
-            state = job.get_state()
-            if state == JobState.INITIAL:
-                self._jobs_queued.pop(replication_id)
-            elif state == JobState.RUNNING:
-                self._jobs_inprogress.remove(replication_id)
-            elif state == JobState.PAUSED:
-                self._jobs_paused.remove(replication_id)
-            else:
-                # COMPLETED/ABORTED/FAILED.
-                self._jobs_completed.remove(replication_id)
+            if self._lru is not None:
+                self._lru.pop(replication_id, None)
+            del self._job_seq[replication_id]
+            self._state_seq.pop(replication_id, None)
+            if len(self._order_ids) > 2 * len(self._jobs) + 1024:
+                self._compact_order()
+            # Job state is not updated by move_to_* of manager, so remove
+            # from whichever set holds it.
+            if not self._jobs_queued.remove(replication_id):
+                self._jobs_inprogress.discard(replication_id)
+                self._jobs_paused.discard(replication_id)
+                self._jobs_completed.discard(replication_id)
         return job
 
+    def _compact_order(self):
+        """Drops entries of removed jobs from add order."""
+        order = [(seq, replication_id) for seq, replication_id in
+                 zip(self._order_seqs, self._order_ids)
+                 if self._job_seq.get(replication_id) == seq]
+        self._order_seqs = [seq for seq, _ in order]
+        self._order_ids = [replication_id for _, replication_id in order]
+
+    def _compact_state_order(self, state):
+        """Drops entries of jobs which left state from its listing order."""
+        members = self._get_state_members(state)
+        order = [(seq, replication_id) for seq, replication_id in
+                 zip(*self._state_orders[state])
+                 if self._state_seq.get(replication_id) == seq and
+                 replication_id in members]
+        # New lists, iterators hold on to the ones they started with.
+        self._state_orders[state] = [
+            [seq for seq, _ in order],
+            [replication_id for _, replication_id in order]]
+
     def remove_job_by_job_id(self, job_id):
         """
         Remove a job for given job id.
@@ -346,22 +535,46 @@ class Jobs:
             return None
         self._logger.debug("Jobs[{}]: Removing job with job_id {}.".
                            format(self._label, job_id))
+        if self._journal is not None:
+            self._journal.record_remove(job_id)
         return self._remove_job(replication_id)
 
-    async def schedule_clear_cache(self, job_id):
-        """
-        Clear entry from collection after given timeout.
-
-        Args:
-            job_id (str): Job to clear.
-            timeout (int): 0 Dont clear, else clear after timeout secs.
-        """
-        if self._timeout is not None:
-            self._logger.debug(
-                "Jobs[{}]: Schedule job_id [{}] to be expired after {} secs".
-                format(self._label, job_id, self._timeout))
-            await asyncio.sleep(self._timeout)
-            self._logger.debug(
-                "Jobs[{}]: job_id [{}] entry expired.".
-                format(self._label, job_id))
-            self.remove_job_by_job_id(job_id)
+    def _evict_lru(self):
+        """Removes least recently used job."""
+        replication_id = next(iter(self._lru))
+        job_id = self._jobs[replication_id].get_job_id()
+        self._logger.debug(
+            "Jobs[{}]: Evicting least recently used job_id [{}].".
+            format(self._label, job_id))
+        self.remove_job_by_job_id(job_id)
+
+    def _schedule_expiry(self, job_id):
+        """Schedules job to be removed after timeout."""
+        self._expiry_queue.append((time.monotonic() + self._timeout, job_id))
+        if self._expiry_sweeper is None:
+            self._expiry_sweeper = asyncio.ensure_future(
+                self._sweep_expired())
+        elif len(self._expiry_queue) > 2 * len(self._jobs) + 1024:
+            # Mostly entries of jobs already removed, drop those.
+            self._expiry_queue = deque(
+                entry for entry in self._expiry_queue
+                if entry[1] in self._job_id_to_replication_id_map)
+
+    async def _sweep_expired(self):
+        """Removes expired jobs till none is left to expire."""
+        try:
+            while self._expiry_queue:
+                delay = self._expiry_queue[0][0] - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay + EXPIRY_SWEEP_GRANULARITY)
+                now = time.monotonic()
+                expired_count = 0
+                while self._expiry_queue and self._expiry_queue[0][0] <= now:
+                    _, job_id = self._expiry_queue.popleft()
+                    # Job may be removed already.
+                    if self.remove_job_by_job_id(job_id) is not None:
+                        expired_count += 1
+                self._logger.debug("Jobs[{}]: {} entries expired.".format(
+                    self._label, expired_count))
+        finally:
+            self._expiry_sweeper = None
@@ -0,0 +1,119 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# S3 requires every chunk but the last to be at least 8KB.
+MIN_AWS_CHUNK_SIZE = 8 * 1024
+
+CHUNK_SIGNATURE_EXT = b';chunk-signature='
+CRLF = b'\r\n'
+# Signature is hex of sha256.
+SIGNATURE_LENGTH = 64
+
+
+def _chunk_overhead(data_length):
+    """Returns bytes added around chunk of given data length."""
+    return len('{:x}'.format(data_length)) + len(CHUNK_SIGNATURE_EXT) + \
+        SIGNATURE_LENGTH + len(CRLF) + len(CRLF)
+
+
+def aws_chunked_content_length(decoded_content_length, chunk_size):
+    """Returns Content-Length of aws-chunked encoded payload.
+
+    Args
+    -----
+        decoded_content_length (int): Length of payload data.
+        chunk_size (int): Data bytes per chunk, last chunk may be smaller.
+    """
+    full_chunks, last_chunk = divmod(decoded_content_length, chunk_size)
+    length = full_chunks * (chunk_size + _chunk_overhead(chunk_size))
+    if last_chunk > 0:
+        length += last_chunk + _chunk_overhead(last_chunk)
+    # Final zero length chunk.
+    return length + _chunk_overhead(0)
+
+
+class S3AwsChunkedReader:
+    """Wraps a data reader, encoding its data as signed aws-chunked payload.
+
+    Data from wrapped reader is re-chunked into chunk_size chunks, so
+    encoded length is known upfront, and each chunk is signed as it
+    streams. At most one chunk is held in memory.
+    """
+
+    def __init__(self, data_reader, chunk_signer, decoded_content_length,
+                 chunk_size):
+        """Initialise.
+
+        Args
+        -----
+            data_reader: Object with fetch method that can yield data.
+            chunk_signer (AWSV4ChunkSigner): Signer seeded with signature of
+            request headers.
+            decoded_content_length (int): Length of data from data_reader.
+            chunk_size (int): Data bytes per chunk, at least 8KB.
+        """
+        self._data_reader = data_reader
+        self._chunk_signer = chunk_signer
+        self._decoded_content_length = decoded_content_length
+        self._chunk_size = max(chunk_size, MIN_AWS_CHUNK_SIZE)
+
+    def get_content_length(self):
+        """Returns length of encoded payload."""
+        return aws_chunked_content_length(
+            self._decoded_content_length, self._chunk_size)
+
+    def get_state(self):
+        """Returns state of wrapped reader."""
+        return self._data_reader.get_state()
+
+    def get_etag(self):
+        """Returns ETag reported by wrapped reader."""
+        return self._data_reader.get_etag()
+
+    def _encode_chunk(self, data):
+        signature = self._chunk_signer.sign_chunk(data)
+        return b''.join((
+            '{:x}'.format(len(data)).encode(), CHUNK_SIGNATURE_EXT,
+            signature.encode(), CRLF, data, CRLF))
+
+    # yields encoded chunks, transfer_size is read size from data_reader
+    async def fetch(self, transfer_size):
+        chunk = bytearray()
+        async for data in self._data_reader.fetch(transfer_size):
+            view = memoryview(data)
+            while len(view) > 0:
+                take = min(len(view), self._chunk_size - len(chunk))
+                chunk += view[:take]
+                view = view[take:]
+                if len(chunk) == self._chunk_size:
+                    yield self._encode_chunk(chunk)
+                    chunk = bytearray()
+        if len(chunk) > 0:
+            yield self._encode_chunk(chunk)
+        # Final zero length chunk.
+        yield self._encode_chunk(b'')
+
+    def pause(self):
+        self._data_reader.pause()
+
+    def resume(self):
+        self._data_reader.resume()
+
+    def abort(self):
+        self._data_reader.abort()
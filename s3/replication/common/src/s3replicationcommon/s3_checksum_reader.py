@@ -0,0 +1,91 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import hashlib
+
+
+def composite_md5(part_md5_list):
+    """Returns S3 multipart ETag for given part MD5 digests.
+
+    Args
+    -----
+        part_md5_list (list[bytes]): Binary MD5 digest of each part,
+        in part number order.
+
+    Returns
+    -------
+        str: ETag in "<md5 of md5s>-<part count>" form, without quotes.
+    """
+    digest = hashlib.md5(b"".join(part_md5_list)).hexdigest()
+    return "{}-{}".format(digest, len(part_md5_list))
+
+
+class S3ChecksumReader:
+    """Wraps a data reader, computing MD5 of chunks as they stream.
+
+    Used as data_reader for S3AsyncPutObject/S3AsyncUploadPart, so data
+    is verified without reading source or target object again.
+    """
+
+    def __init__(self, data_reader):
+        """Initialise.
+
+        Args
+        -----
+            data_reader: Object with fetch method that can yield data.
+        """
+        self._data_reader = data_reader
+        self._size = 0
+        self._md5 = hashlib.md5()
+
+    def get_state(self):
+        """Returns state of wrapped reader."""
+        return self._data_reader.get_state()
+
+    def get_etag(self):
+        """Returns ETag reported by wrapped reader."""
+        return self._data_reader.get_etag()
+
+    def get_size(self):
+        """Returns bytes read so far."""
+        return self._size
+
+    def get_md5(self):
+        """Returns hex MD5 of bytes read so far."""
+        return self._md5.hexdigest()
+
+    def get_md5_digest(self):
+        """Returns binary MD5 of bytes read so far."""
+        return self._md5.digest()
+
+    # yields data chunk for given size
+    async def fetch(self, chunk_size):
+        async for data_chunk in self._data_reader.fetch(chunk_size):
+            self._md5.update(data_chunk)
+            self._size += len(data_chunk)
+            yield data_chunk
+
+    def pause(self):
+        self._data_reader.pause()
+
+    def resume(self):
+        self._data_reader.resume()
+
+    def abort(self):
+        self._data_reader.abort()
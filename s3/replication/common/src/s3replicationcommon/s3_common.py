@@ -19,6 +19,19 @@
 
 from enum import Enum
 
+# User metadata with ETag of source object, set on target objects whose
+# ETag differs from source ETag.
+REPLICATION_SOURCE_ETAG_META = "replication-source-etag"
+
+# S3 rejects multipart uploads with parts (other than last) below 5MB.
+MIN_PART_SIZE_BYTES = 5 * 1024 * 1024
+# S3 limit on size of a part.
+MAX_PART_SIZE_BYTES = 5 * 1024 * 1024 * 1024
+# S3 limit on parts per multipart upload.
+MAX_PART_COUNT = 10000
+# S3 limit on bytes copied by one CopyObject or UploadPartCopy.
+MAX_COPY_SIZE_BYTES = 5 * 1024 * 1024 * 1024
+
 
 class S3RequestState(Enum):
     INITIALISED = 1
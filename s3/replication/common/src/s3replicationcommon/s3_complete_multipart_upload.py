@@ -76,19 +76,15 @@ class S3AsyncCompleteMultipartUpload:
         query_params = urllib.parse.urlencode({'uploadId': self._upload_id})
         body = ""
 
-        # Prepare xml format
+        # Prepare xml format, parts must be listed in ascending order.
         etag_str = "<CompleteMultipartUpload>"
-        for part, etag in self._etag_dict.items():
+        for part in sorted(self._etag_dict):
             etag_str += "<Part><ETag>" + \
-                str(etag) + "</ETag><PartNumber>" + str(part) + "</PartNumber></Part>"
+                str(self._etag_dict[part]) + "</ETag><PartNumber>" + \
+                str(part) + "</PartNumber></Part>"
         etag_str += "</CompleteMultipartUpload>"
 
-        headers = AWSV4Signer(
-            self._session.endpoint,
-            self._session.service_name,
-            self._session.region,
-            self._session.access_key,
-            self._session.secret_key).prepare_signed_header(
+        headers = self._session.get_signer().prepare_signed_header(
             'POST',
             request_uri,
             query_params,
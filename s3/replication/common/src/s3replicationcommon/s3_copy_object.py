@@ -0,0 +1,144 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import aiohttp
+import re
+import sys
+from defusedxml.ElementTree import fromstring
+from s3replicationcommon.aws_v4_signer import AWSV4Signer
+from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.timer import Timer
+
+
+def parse_copy_result(resp_body):
+    """Returns ETag from CopyObjectResult/CopyPartResult body, None when
+    body is an error.
+
+    S3 may respond 200 and report failure of a long running copy in the
+    body, so the body must be checked.
+    """
+    # Remove the namespace from response body elements
+    resp_body = re.sub('xmlns="[^"]+"', '', resp_body)
+    xml_dict = fromstring(resp_body)
+    etag = xml_dict.find('ETag')
+    if xml_dict.tag == 'Error' or etag is None:
+        return None
+    return etag.text
+
+
+class S3AsyncCopyObject:
+    """Copies object within an S3 endpoint, data does not leave S3."""
+
+    def __init__(self, session, request_id,
+                 source_bucket_name, source_object_name,
+                 bucket_name, object_name):
+        """Initialise."""
+        self._session = session
+        # Request id for better logging.
+        self._request_id = request_id
+        self._logger = session.logger
+
+        self._source_bucket_name = source_bucket_name
+        self._source_object_name = source_object_name
+        self._bucket_name = bucket_name
+        self._object_name = object_name
+
+        self.remote_down = False
+        self._http_status = None
+        self._etag = None
+
+        self._timer = Timer()
+        self._state = S3RequestState.INITIALISED
+
+    def get_state(self):
+        """Returns current request state."""
+        return self._state
+
+    def get_http_status(self):
+        """Returns http status of copy response."""
+        return self._http_status
+
+    def get_execution_time(self):
+        """Return total time for Copy Object operation."""
+        return self._timer.elapsed_time_ms()
+
+    def get_etag(self):
+        """Returns ETag of copied object."""
+        if self._etag is None:
+            return None
+        return self._etag.strip("\"")
+
+    async def copy(self):
+        self._state = S3RequestState.RUNNING
+        request_uri = AWSV4Signer.fmt_s3_request_uri(
+            self._bucket_name, self._object_name)
+        query_params = ""
+        body = ""
+
+        # Metadata and tags are copied from source object.
+        copy_source = AWSV4Signer.fmt_s3_request_uri(
+            self._source_bucket_name, self._source_object_name)
+        headers = self._session.get_signer().prepare_signed_header(
+            'PUT',
+            request_uri,
+            query_params,
+            body,
+            amz_headers={'x-amz-copy-source': copy_source})
+
+        if (headers['Authorization'] is None):
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to generate v4 signature")
+            sys.exit(-1)
+
+        self._logger.info(fmt_reqid_log(self._request_id) +
+                          "PUT (copy from {}) on {}".format(
+                              copy_source,
+                              self._session.endpoint + request_uri))
+        self._logger.debug(fmt_reqid_log(self._request_id) +
+                           "PUT with headers {}".format(headers))
+
+        self._timer.start()
+        try:
+            async with self._session.get_client_session().put(
+                    self._session.endpoint + request_uri,
+                    headers=headers) as resp:
+                self._http_status = resp.status
+                resp_body = await resp.text()
+                self._logger.info(
+                    fmt_reqid_log(self._request_id) +
+                    'Copy Object completed with http status: {}'.format(
+                        resp.status))
+
+                if resp.status == 200:
+                    self._etag = parse_copy_result(resp_body)
+                if self._etag is not None:
+                    self._state = S3RequestState.COMPLETED
+                else:
+                    self._logger.error(
+                        fmt_reqid_log(self._request_id) +
+                        'Error Response: {}'.format(resp_body))
+                    self._state = S3RequestState.FAILED
+        except aiohttp.client_exceptions.ClientConnectorError as e:
+            self.remote_down = True
+            self._state = S3RequestState.FAILED
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to connect to S3: " + str(e))
+        self._timer.stop()
+        return
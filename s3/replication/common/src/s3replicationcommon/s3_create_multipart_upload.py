@@ -28,8 +28,12 @@ from s3replicationcommon.timer import Timer
 
 class S3AsyncCreateMultipartUpload:
     def __init__(self, session, request_id,
-                 bucket_name, object_name):
-        """Initialise."""
+                 bucket_name, object_name, metadata=None):
+        """Initialise.
+
+        metadata - dict of user metadata to set on object, keyed by name
+                   without x-amz-meta- prefix.
+        """
         self._session = session
         # Request id for better logging.
         self._request_id = request_id
@@ -37,6 +41,7 @@ class S3AsyncCreateMultipartUpload:
 
         self._bucket_name = bucket_name
         self._object_name = object_name
+        self._metadata = metadata
 
         self._remote_down = False
         self._http_status = None
@@ -64,16 +69,17 @@ class S3AsyncCreateMultipartUpload:
         query_params = urllib.parse.urlencode({'uploads': ''})
         body = ""
 
-        headers = AWSV4Signer(
-            self._session.endpoint,
-            self._session.service_name,
-            self._session.region,
-            self._session.access_key,
-            self._session.secret_key).prepare_signed_header(
+        amz_headers = None
+        if self._metadata:
+            amz_headers = {"x-amz-meta-" + name.lower(): value
+                           for name, value in self._metadata.items()}
+
+        headers = self._session.get_signer().prepare_signed_header(
             'POST',
             request_uri,
             query_params,
-            body)
+            body,
+            amz_headers=amz_headers)
 
         if (headers['Authorization'] is None):
             self._logger.error(fmt_reqid_log(self._request_id) +
@@ -106,6 +112,7 @@ class S3AsyncCreateMultipartUpload:
                         self._response_headers))
                     self._upload_id = self._response_headers.get(
                         "UploadId", None)
+                    self._state = S3RequestState.COMPLETED
 
                 else:
                     self._state = S3RequestState.FAILED
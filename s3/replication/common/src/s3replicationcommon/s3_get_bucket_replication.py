@@ -153,12 +153,7 @@ class S3AsyncGetBucketReplication():
         query_params = urllib.parse.urlencode({'replication': None})
         body = ""
 
-        headers = AWSV4Signer(
-            self._session.endpoint,
-            self._session.service_name,
-            self._session.region,
-            self._session.access_key,
-            self._session.secret_key).prepare_signed_header(
+        headers = self._session.get_signer().prepare_signed_header(
             'GET',
             request_uri,
             query_params,
@@ -20,6 +20,7 @@
 import aiohttp
 import sys
 from s3replicationcommon.aws_v4_signer import AWSV4Signer
+from s3replicationcommon.buffer_pool import read_pooled
 from s3replicationcommon.log import fmt_reqid_log
 from s3replicationcommon.s3_common import S3RequestState
 from s3replicationcommon.timer import Timer
@@ -29,7 +30,7 @@ class S3AsyncGetObject:
     def __init__(self, session, request_id,
                  bucket_name, object_name,
                  object_size, offset,
-                 length):
+                 length, buffer_pool=None):
         """Initialise."""
         self._session = session
         # Request id for better logging.
@@ -41,6 +42,9 @@ class S3AsyncGetObject:
         self._object_size = object_size
         self._range_read_offset = offset
         self._range_read_length = length
+        # When set, data is read into pooled buffers instead of new bytes
+        # object per chunk.
+        self._buffer_pool = buffer_pool
 
         self.remote_down = False
         self._http_status = None
@@ -80,21 +84,17 @@ class S3AsyncGetObject:
         # check for range read request
         if self._range_read_length >= 0:
             # get object range read function
+            # Range end is inclusive, so read exactly range_read_length.
             start_bytes = self._range_read_offset
-            end_bytes = self._range_read_offset + self._range_read_length
+            end_bytes = self._range_read_offset + self._range_read_length - 1
             object_range = "bytes=" + str(start_bytes) + "-" + str(end_bytes)
-            total_to_fetch = (end_bytes - start_bytes) + 1
+            total_to_fetch = self._range_read_length
         else:
             # get object
             object_range = None
             total_to_fetch = self._object_size
 
-        headers = AWSV4Signer(
-            self._session.endpoint,
-            self._session.service_name,
-            self._session.region,
-            self._session.access_key,
-            self._session.secret_key).prepare_signed_header(
+        headers = self._session.get_signer().prepare_signed_header(
             'GET',
             request_uri,
             query_params,
@@ -154,41 +154,56 @@ class S3AsyncGetObject:
                         return
 
                 self._state = S3RequestState.RUNNING
-                while True:
-                    # If abort requested, stop the loop and return.
-                    if self._state == S3RequestState.ABORTED:
+                pooled_reader = None
+                if self._buffer_pool is not None:
+                    pooled_reader = read_pooled(
+                        resp.content, self._buffer_pool, chunk_size)
+                try:
+                    while True:
+                        # If abort requested, stop the loop and return.
+                        if self._state == S3RequestState.ABORTED:
+                            self._logger.debug(
+                                fmt_reqid_log(self._request_id) +
+                                "Aborted after reading %d bytes"
+                                "for object size of %d",
+                                (self._object_size - total_to_fetch,
+                                 self._object_size))
+                            break
+
+                        if pooled_reader is None:
+                            data_chunk = await resp.content.read(chunk_size)
+                        else:
+                            try:
+                                data_chunk = await pooled_reader.__anext__()
+                            except StopAsyncIteration:
+                                data_chunk = b""
+                        self._object_range = len(data_chunk)
+                        if not data_chunk:
+                            break
                         self._logger.debug(
                             fmt_reqid_log(self._request_id) +
-                            "Aborted after reading %d bytes"
-                            "for object size of %d",
-                            (self._object_size - total_to_fetch,
-                             self._object_size))
-                        break
-
-                    data_chunk = await resp.content.read(chunk_size)
-                    self._object_range = len(data_chunk)
-                    if not data_chunk:
-                        break
-                    self._logger.debug(
-                        fmt_reqid_log(self._request_id) +
-                        "Received data_chunk of size {} bytes.".format(
-                            len(data_chunk)))
-                    yield data_chunk
-
-                    total_to_fetch = total_to_fetch - len(data_chunk)
-                    if total_to_fetch == 0:
-                        # Completed reading all expected data.
-                        self._state = S3RequestState.COMPLETED
-                        break
-                    elif total_to_fetch < 0:
-                        self._state = S3RequestState.FAILED
-                        self._logger.error(
-                            fmt_reqid_log(self._request_id) +
-                            "Received %d more bytes than"
-                            "expected object size of %d",
-                            (total_to_fetch * -1,
-                             self._object_size))
-                # end of While True
+                            "Received data_chunk of size {} bytes.".format(
+                                len(data_chunk)))
+                        yield data_chunk
+
+                        total_to_fetch = total_to_fetch - len(data_chunk)
+                        if total_to_fetch == 0:
+                            # Completed reading all expected data.
+                            self._state = S3RequestState.COMPLETED
+                            break
+                        elif total_to_fetch < 0:
+                            self._state = S3RequestState.FAILED
+                            self._logger.error(
+                                fmt_reqid_log(self._request_id) +
+                                "Received %d more bytes than"
+                                "expected object size of %d",
+                                (total_to_fetch * -1,
+                                 self._object_size))
+                    # end of While True
+                finally:
+                    # Release buffer slot.
+                    if pooled_reader is not None:
+                        await pooled_reader.aclose()
 
                 if self._state != S3RequestState.ABORTED:
                     if total_to_fetch > 0:
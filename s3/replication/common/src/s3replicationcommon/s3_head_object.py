@@ -397,6 +397,19 @@ class S3AsyncHeadObject:
             "x-amz-website-redirect-location", None)
         return self._resp_redirectlocation
 
+    def get_x_amz_meta(self, name):
+        """Get user metadata of object.
+
+        Args
+        -----
+            name (str): Metadata name without x-amz-meta- prefix.
+
+        Returns
+        -------
+            [str]: metadata value, None if not set.
+        """
+        return self._response_headers.get("x-amz-meta-" + name, None)
+
     def get_state(self):
         """Returns current request state."""
         return self._state
@@ -411,15 +424,15 @@ class S3AsyncHeadObject:
 
         self._part_number = part_number
 
-        query_params = urllib.parse.urlencode(
-            {'partNumber': self._part_number, 'versionId': self._version_id})
+        # Only send query params which are set.
+        params = {}
+        if self._part_number is not None:
+            params['partNumber'] = self._part_number
+        if self._version_id is not None:
+            params['versionId'] = self._version_id
+        query_params = urllib.parse.urlencode(params)
         body = ""
-        headers = AWSV4Signer(
-            self._session.endpoint,
-            self._session.service_name,
-            self._session.region,
-            self._session.access_key,
-            self._session.secret_key).prepare_signed_header(
+        headers = self._session.get_signer().prepare_signed_header(
             'HEAD',
             request_uri,
             query_params,
@@ -443,8 +456,10 @@ class S3AsyncHeadObject:
                     self._session.endpoint + request_uri,
                     params=query_params, headers=headers) as resp:
 
-                if resp.status == 200:
-                    self._response_headers = dict(resp.headers)
+                self._http_status = resp.status
+                # HEAD with partNumber returns 206 Partial Content.
+                if resp.status == 200 or resp.status == 206:
+                    self._response_headers = resp.headers
                     self._logger.info(fmt_reqid_log(self._request_id)
                                       + 'HEAD Object response received with'
                                       + ' status code: {}'.format(resp.status))
@@ -462,7 +477,7 @@ class S3AsyncHeadObject:
                         ' Error Response: {}'.format(error_msg))
                     return
 
-                self._state = S3RequestState.RUNNING
+                self._state = S3RequestState.COMPLETED
 
         except aiohttp.client_exceptions.ClientConnectorError as e:
             self.remote_down = True
@@ -0,0 +1,153 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import aiohttp
+import re
+import sys
+import urllib
+from defusedxml.ElementTree import fromstring
+from s3replicationcommon.aws_v4_signer import AWSV4Signer
+from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.timer import Timer
+
+
+class S3AsyncListParts:
+    def __init__(self, session, request_id,
+                 bucket_name, object_name, upload_id):
+        """Initialise."""
+        self._session = session
+        # Request id for better logging.
+        self._request_id = request_id
+        self._logger = session.logger
+
+        self._bucket_name = bucket_name
+        self._object_name = object_name
+
+        self._upload_id = upload_id
+
+        self._remote_down = False
+        self._http_status = None
+        # part number to (ETag, size) of uploaded parts.
+        self._parts = {}
+
+        self._timer = Timer()
+        self._state = S3RequestState.INITIALISED
+
+    def get_state(self):
+        """Returns current request state."""
+        return self._state
+
+    def get_http_status(self):
+        """Returns http status of last response, 404 for unknown upload."""
+        return self._http_status
+
+    def get_execution_time(self):
+        """Return total time for GET operation."""
+        return self._timer.elapsed_time_ms()
+
+    def get_parts(self):
+        """Returns part number to (ETag, size) map of uploaded parts."""
+        return self._parts
+
+    def _parse_parts(self, resp_body):
+        """Adds parts listed in response body.
+
+        Returns
+        -------
+            str: Part number marker for next page, None for last page.
+        """
+        # Remove the namespace from response body elements
+        resp_body = re.sub('xmlns="[^"]+"', '', resp_body)
+        xml_dict = fromstring(resp_body)
+        for part in xml_dict.iter('Part'):
+            self._parts[int(part.find('PartNumber').text)] = (
+                part.find('ETag').text.strip("\""),
+                int(part.find('Size').text))
+
+        is_truncated = xml_dict.find('IsTruncated')
+        if is_truncated is None or is_truncated.text != 'true':
+            return None
+        return xml_dict.find('NextPartNumberMarker').text
+
+    async def list(self):
+        """List all parts of the upload, a page at a time."""
+        self._state = S3RequestState.RUNNING
+        request_uri = AWSV4Signer.fmt_s3_request_uri(
+            self._bucket_name, self._object_name)
+        body = ""
+
+        self._timer.start()
+        part_number_marker = None
+        try:
+            while True:
+                # Query params are in sorted order, as signed.
+                query = [('uploadId', self._upload_id)]
+                if part_number_marker is not None:
+                    query.insert(0, ('part-number-marker', part_number_marker))
+                query_params = urllib.parse.urlencode(query)
+
+                headers = self._session.get_signer().prepare_signed_header(
+                    'GET',
+                    request_uri,
+                    query_params,
+                    body)
+
+                if (headers['Authorization'] is None):
+                    self._logger.error(fmt_reqid_log(self._request_id) +
+                                       "Failed to generate v4 signature")
+                    sys.exit(-1)
+
+                self._logger.info(fmt_reqid_log(
+                    self._request_id) + 'GET parts on {}'.format(
+                    self._session.endpoint + request_uri))
+
+                async with self._session.get_client_session().get(
+                        self._session.endpoint + request_uri,
+                        params=query_params,
+                        headers=headers) as resp:
+
+                    self._http_status = resp.status
+                    resp_body = await resp.text()
+                    self._logger.info(
+                        fmt_reqid_log(self._request_id) +
+                        'GET parts response received with'
+                        + ' status code: {}'.format(resp.status))
+
+                    if resp.status != 200:
+                        self._state = S3RequestState.FAILED
+                        self._logger.error(
+                            fmt_reqid_log(self._request_id) +
+                            'GET parts failed with http status: {}'.
+                            format(resp.status) +
+                            ' Error Response: {}'.format(resp_body))
+                        break
+
+                    part_number_marker = self._parse_parts(resp_body)
+                    if part_number_marker is None:
+                        self._state = S3RequestState.COMPLETED
+                        break
+
+        except aiohttp.client_exceptions.ClientConnectorError as e:
+            self._remote_down = True
+            self._state = S3RequestState.FAILED
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to connect to S3: " + str(e))
+        self._timer.stop()
+        return
@@ -22,6 +22,7 @@ import sys
 
 from s3replicationcommon.aws_v4_signer import AWSV4Signer
 from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.s3_aws_chunked_reader import S3AwsChunkedReader
 from s3replicationcommon.s3_common import S3RequestState
 from s3replicationcommon.timer import Timer
 
@@ -74,23 +75,34 @@ class S3AsyncPutObject:
         query_params = ""
         body = ""
 
-        headers = AWSV4Signer(
-            self._session.endpoint,
-            self._session.service_name,
-            self._session.region,
-            self._session.access_key,
-            self._session.secret_key).prepare_signed_header(
-            'PUT',
-            request_uri,
-            query_params,
-            body)
+        payload_reader = data_reader
+        if self._session.signed_payload:
+            # Sign payload chunk by chunk as it streams.
+            headers, chunk_signer = \
+                self._session.get_signer().prepare_streaming_signed_header(
+                    'PUT',
+                    request_uri,
+                    query_params,
+                    self._object_size)
+            payload_reader = S3AwsChunkedReader(
+                data_reader, chunk_signer, self._object_size, transfer_size)
+        else:
+            headers = self._session.get_signer().prepare_signed_header(
+                'PUT',
+                request_uri,
+                query_params,
+                body)
 
         if (headers['Authorization'] is None):
             self._logger.error(fmt_reqid_log(self._request_id) +
                                "Failed to generate v4 signature")
             sys.exit(-1)
 
-        headers["Content-Length"] = str(self._object_size)
+        if self._session.signed_payload:
+            headers["Content-Length"] = str(
+                payload_reader.get_content_length())
+        else:
+            headers["Content-Length"] = str(self._object_size)
 
         self._logger.info(fmt_reqid_log(self._request_id) +
                           "PUT on {}".format(
@@ -103,7 +115,7 @@ class S3AsyncPutObject:
                     self._session.endpoint + request_uri,
                     headers=headers,
                     # Read all data from data_reader
-                    data=data_reader.fetch(transfer_size)) as resp:
+                    data=payload_reader.fetch(transfer_size)) as resp:
                 self._timer.stop()
 
                 if data_reader.get_state() != S3RequestState.ABORTED:
@@ -115,16 +127,16 @@ class S3AsyncPutObject:
                         'PUT Object completed with http status: {}'.format(
                             resp.status))
 
-                    # Validate if upload object etag matches.
-                    if self.get_etag() != data_reader.get_etag():
-                        self._state = S3RequestState.FAILED
-                        error_msg = "ETag mismatch."
-                        self._logger.error(
-                            fmt_reqid_log(self._request_id) +
-                            'Error Response: {}'.format(error_msg))
-
                     if resp.status == 200:
-                        self._state = S3RequestState.COMPLETED
+                        # Validate if upload object etag matches.
+                        if self.get_etag() != data_reader.get_etag():
+                            self._state = S3RequestState.FAILED
+                            error_msg = "ETag mismatch."
+                            self._logger.error(
+                                fmt_reqid_log(self._request_id) +
+                                'Error Response: {}'.format(error_msg))
+                        else:
+                            self._state = S3RequestState.COMPLETED
                     else:
                         error_msg = await resp.text()
                         self._logger.error(
@@ -71,12 +71,7 @@ class S3AsyncPutObjectTagging:
 
         tagset = tag_str1 + result + tag_str2
 
-        headers = AWSV4Signer(
-            self._session.endpoint,
-            self._session.service_name,
-            self._session.region,
-            self._session.access_key,
-            self._session.secret_key).prepare_signed_header(
+        headers = self._session.get_signer().prepare_signed_header(
             'PUT',
             request_uri,
             query_params,
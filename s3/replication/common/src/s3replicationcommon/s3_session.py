@@ -18,11 +18,12 @@
 #
 
 import aiohttp
+from s3replicationcommon.aws_v4_signer import AWSV4Signer
 
 
 class S3Session:
     def __init__(self, logger, s3_site, access_key, secret_key,
-                 number_of_connections=100):
+                 number_of_connections=100, signed_payload=False):
         """Initialise S3 session."""
         self.logger = logger
         self.endpoint = s3_site.endpoint
@@ -32,12 +33,34 @@ class S3Session:
 
         self.access_key = access_key
         self.secret_key = secret_key
+        # Send PUT/UploadPart payload as signed aws-chunked encoding.
+        self.signed_payload = signed_payload
 
         connector = aiohttp.TCPConnector(limit=number_of_connections)
         self._client_session = aiohttp.ClientSession(connector=connector)
 
+        # Signers reused for all requests of this session.
+        self._signer = None
+        self._admin_signer = None
+
     def get_client_session(self):
         return self._client_session
 
+    def get_signer(self):
+        """Returns request signer for S3 endpoint of this session."""
+        if self._signer is None:
+            self._signer = AWSV4Signer(
+                self.endpoint, self.service_name, self.region,
+                self.access_key, self.secret_key)
+        return self._signer
+
+    def get_admin_signer(self):
+        """Returns request signer for admin endpoint of this session."""
+        if self._admin_signer is None:
+            self._admin_signer = AWSV4Signer(
+                self.admin_endpoint, self.service_name, self.region,
+                self.access_key, self.secret_key)
+        return self._admin_signer
+
     async def close(self):
         await self._client_session.close()
@@ -27,6 +27,9 @@ class S3Site:
         self.service_name = service_name
         self.region = region
         self.admin_endpoint = admin_endpoint
+        self._netloc = None
 
     def get_netloc(self):
-        return urlparse(self.endpoint).netloc
+        if self._netloc is None:
+            self._netloc = urlparse(self.endpoint).netloc
+        return self._netloc
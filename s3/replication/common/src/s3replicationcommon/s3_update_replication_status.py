@@ -22,7 +22,6 @@ import json
 import urllib.parse
 import sys
 
-from s3replicationcommon.aws_v4_signer import AWSV4Signer
 from s3replicationcommon.log import fmt_reqid_log
 from s3replicationcommon.s3_common import S3RequestState
 from s3replicationcommon.timer import Timer
@@ -67,12 +66,7 @@ class S3AsyncUpdatereplicationStatus:
 
         query_params = ""
         body = value or ""
-        headers = AWSV4Signer(
-            self._session.admin_endpoint,
-            self._session.service_name,
-            self._session.region,
-            self._session.access_key,
-            self._session.secret_key).prepare_signed_header(
+        headers = self._session.get_admin_signer().prepare_signed_header(
             'GET' if value is None else 'PUT',
             canonical_uri,
             query_params,
@@ -22,6 +22,7 @@ import sys
 import urllib
 from s3replicationcommon.aws_v4_signer import AWSV4Signer
 from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.s3_aws_chunked_reader import S3AwsChunkedReader
 from s3replicationcommon.s3_common import S3RequestState
 from s3replicationcommon.timer import Timer
 
@@ -71,8 +72,13 @@ class S3AsyncUploadPart:
         return self._etag_dict
 
     # data_reader is object with fetch method that can yield data
-    async def upload(self, data_reader, part_no, chunk_size):
+    # chunk_size is the part length, transfer_chunk_size when specified is
+    # the size of each read from data_reader.
+    async def upload(self, data_reader, part_no, chunk_size,
+                     transfer_chunk_size=None):
         self._state = S3RequestState.RUNNING
+        if transfer_chunk_size is None:
+            transfer_chunk_size = chunk_size
         self._part_no = part_no
 
         request_uri = AWSV4Signer.fmt_s3_request_uri(
@@ -83,23 +89,34 @@ class S3AsyncUploadPart:
             {'partNumber': self._part_no, 'uploadId': self._upload_id})
         body = ""
 
-        headers = AWSV4Signer(
-            self._session.endpoint,
-            self._session.service_name,
-            self._session.region,
-            self._session.access_key,
-            self._session.secret_key).prepare_signed_header(
-            'PUT',
-            request_uri,
-            query_params,
-            body)
+        payload_reader = data_reader
+        if self._session.signed_payload:
+            # Sign payload chunk by chunk as it streams.
+            headers, chunk_signer = \
+                self._session.get_signer().prepare_streaming_signed_header(
+                    'PUT',
+                    request_uri,
+                    query_params,
+                    chunk_size)
+            payload_reader = S3AwsChunkedReader(
+                data_reader, chunk_signer, chunk_size, transfer_chunk_size)
+        else:
+            headers = self._session.get_signer().prepare_signed_header(
+                'PUT',
+                request_uri,
+                query_params,
+                body)
 
         if (headers['Authorization'] is None):
             self._logger.error(fmt_reqid_log(self._request_id) +
                                "Failed to generate v4 signature")
             sys.exit(-1)
 
-        headers["Content-Length"] = str(chunk_size)
+        if self._session.signed_payload:
+            headers["Content-Length"] = str(
+                payload_reader.get_content_length())
+        else:
+            headers["Content-Length"] = str(chunk_size)
 
         self._logger.info(fmt_reqid_log(self._request_id) +
                           "PUT on {}".format(
@@ -113,7 +130,7 @@ class S3AsyncUploadPart:
                     self._session.endpoint + request_uri,
                     headers=headers,
                     params=query_params,
-                    data=data_reader.fetch(chunk_size)) as resp:
+                    data=payload_reader.fetch(transfer_chunk_size)) as resp:
                 self._timer.stop()
 
                 self._http_status = resp.status
@@ -125,9 +142,9 @@ class S3AsyncUploadPart:
                     '\n header{}'.format(
                         resp.status, self._response_headers))
 
-                self._etag_dict[self._part_no] = self._response_headers["Etag"]
-
                 if resp.status == 200:
+                    self._etag_dict[self._part_no] = \
+                        self._response_headers["Etag"]
                     self._state = S3RequestState.COMPLETED
                 else:
                     error_msg = await resp.text()
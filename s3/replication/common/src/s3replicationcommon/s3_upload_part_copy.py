@@ -0,0 +1,131 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import aiohttp
+import sys
+import urllib
+from s3replicationcommon.aws_v4_signer import AWSV4Signer
+from s3replicationcommon.log import fmt_reqid_log
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_copy_object import parse_copy_result
+from s3replicationcommon.timer import Timer
+
+
+class S3AsyncUploadPartCopy:
+    """Uploads a part by copying byte range of an object within an S3
+    endpoint, data does not leave S3.
+    """
+
+    def __init__(self, session, request_id,
+                 source_bucket_name, source_object_name,
+                 bucket_name, object_name,
+                 upload_id):
+        """Initialise."""
+        self._session = session
+        # Request id for better logging.
+        self._request_id = request_id
+        self._logger = session.logger
+
+        self._source_bucket_name = source_bucket_name
+        self._source_object_name = source_object_name
+        self._bucket_name = bucket_name
+        self._object_name = object_name
+
+        self._upload_id = upload_id
+
+        self.remote_down = False
+        self._http_status = None
+        self._etag = None
+
+        self._timer = Timer()
+        self._state = S3RequestState.INITIALISED
+
+    def get_state(self):
+        """Returns current request state."""
+        return self._state
+
+    def get_execution_time(self):
+        """Return total time for Upload Part Copy operation."""
+        return self._timer.elapsed_time_ms()
+
+    def get_etag(self):
+        """Returns ETag of copied part, quoted as returned by S3."""
+        return self._etag
+
+    async def copy(self, part_no, offset, length):
+        """Copy length bytes at offset of source object as part part_no."""
+        self._state = S3RequestState.RUNNING
+        request_uri = AWSV4Signer.fmt_s3_request_uri(
+            self._bucket_name, self._object_name)
+        query_params = urllib.parse.urlencode(
+            {'partNumber': part_no, 'uploadId': self._upload_id})
+        body = ""
+
+        copy_source = AWSV4Signer.fmt_s3_request_uri(
+            self._source_bucket_name, self._source_object_name)
+        copy_source_range = 'bytes={}-{}'.format(offset, offset + length - 1)
+        headers = self._session.get_signer().prepare_signed_header(
+            'PUT',
+            request_uri,
+            query_params,
+            body,
+            amz_headers={'x-amz-copy-source': copy_source,
+                         'x-amz-copy-source-range': copy_source_range})
+
+        if (headers['Authorization'] is None):
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to generate v4 signature")
+            sys.exit(-1)
+
+        self._logger.info(fmt_reqid_log(self._request_id) +
+                          "PUT part {} (copy from {} {}) on {}".format(
+                              part_no, copy_source, copy_source_range,
+                              self._session.endpoint + request_uri))
+        self._logger.debug(fmt_reqid_log(self._request_id) +
+                           "PUT with headers {}".format(headers))
+
+        self._timer.start()
+        try:
+            async with self._session.get_client_session().put(
+                    self._session.endpoint + request_uri,
+                    headers=headers,
+                    params=query_params) as resp:
+                self._http_status = resp.status
+                resp_body = await resp.text()
+                self._logger.info(
+                    fmt_reqid_log(self._request_id) +
+                    'Upload Part Copy completed with http status: {}'.format(
+                        resp.status))
+
+                if resp.status == 200:
+                    self._etag = parse_copy_result(resp_body)
+                if self._etag is not None:
+                    self._state = S3RequestState.COMPLETED
+                else:
+                    self._logger.error(
+                        fmt_reqid_log(self._request_id) +
+                        'Error Response: {}'.format(resp_body))
+                    self._state = S3RequestState.FAILED
+        except aiohttp.client_exceptions.ClientConnectorError as e:
+            self.remote_down = True
+            self._state = S3RequestState.FAILED
+            self._logger.error(fmt_reqid_log(self._request_id) +
+                               "Failed to connect to S3: " + str(e))
+        self._timer.stop()
+        return
@@ -0,0 +1,124 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import hashlib
+import json
+from collections import OrderedDict
+from .s3_site import S3Site
+
+# Fields of a site in job record or site table.
+SITE_FIELDS = ("endpoint", "admin_endpoint", "service_name", "region",
+               "access_key", "secret_key")
+
+
+def make_site_id(name, site_dict):
+    """Returns id for site, which changes when any site field changes.
+
+    Args
+    -----
+        name (str): Site name e.g. cortxs3.
+        site_dict (dict): Site fields, see SITE_FIELDS.
+    """
+    site_fields = {field: site_dict.get(field) for field in SITE_FIELDS}
+    digest = hashlib.sha1(
+        json.dumps(site_fields, sort_keys=True).encode()).hexdigest()
+    return "{}-{}".format(name, digest[:12])
+
+
+class Site:
+    """S3 site with credentials, shared by all jobs referring to it."""
+
+    __slots__ = ("site_id", "s3_site", "access_key", "secret_key",
+                 "session_key")
+
+    def __init__(self, site_id, site_dict):
+        """Initialise.
+
+        Raises KeyError if any mandatory site field is missing.
+        """
+        self.site_id = site_id
+        self.s3_site = S3Site(site_dict["endpoint"],
+                              site_dict["service_name"],
+                              site_dict["region"],
+                              site_dict.get("admin_endpoint"))
+        self.access_key = site_dict["access_key"]
+        self.secret_key = site_dict["secret_key"]
+        # Identifies S3 session for an IAM account/user on endpoint.
+        self.session_key = self.s3_site.get_netloc() + "|" + self.access_key
+
+    def get_dict(self):
+        site_dict = {
+            "endpoint": self.s3_site.endpoint,
+            "service_name": self.s3_site.service_name,
+            "region": self.s3_site.region,
+            "access_key": self.access_key,
+            "secret_key": self.secret_key
+        }
+        if self.s3_site.admin_endpoint is not None:
+            site_dict["admin_endpoint"] = self.s3_site.admin_endpoint
+        return site_dict
+
+
+class SiteTable:
+    """Sites keyed by site id, so jobs carry only site id."""
+
+    def __init__(self, max_inline_sites=None):
+        """Initialise.
+
+        Args
+        -----
+            max_inline_sites (int, optional): Max inlined sites kept, least
+            recently used ones are dropped. No limit when None.
+        """
+        self._sites = {}
+        self._inline_sites = OrderedDict()
+        self._max_inline_sites = max_inline_sites
+
+    def add_site(self, site_id, site_dict):
+        """Adds or replaces site, raises KeyError for incomplete site."""
+        site = Site(site_id, site_dict)
+        self._sites[site_id] = site
+        return site
+
+    def get_site(self, site_id):
+        """Returns Site for site_id, None if not registered."""
+        return self._sites.get(site_id)
+
+    def get_inline_site(self, site_dict):
+        """Returns shared Site for site fields inlined in a job record.
+
+        Jobs keep Site they were given when it is dropped from table, later
+        jobs get a new instance.
+
+        Raises KeyError for incomplete site.
+        """
+        key = tuple(site_dict.get(field) for field in SITE_FIELDS)
+        site = self._inline_sites.get(key)
+        if site is None:
+            site = Site(None, site_dict)
+            self._inline_sites[key] = site
+            if self._max_inline_sites is not None and \
+                    len(self._inline_sites) > self._max_inline_sites:
+                self._inline_sites.popitem(last=False)
+        else:
+            self._inline_sites.move_to_end(key)
+        return site
+
+    def count(self):
+        return len(self._sites) + len(self._inline_sites)
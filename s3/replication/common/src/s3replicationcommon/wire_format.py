@@ -0,0 +1,198 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# wire_format.py
+#
+# Encoding of job batches sent from replication manager to replicators.
+# Replicator offers content types and encodings it can decode when it
+# subscribes, manager picks from them.
+
+import gzip
+import json
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+    _ZSTD_ERRORS = (zstandard.ZstdError,)
+except ImportError:
+    zstandard = None
+    _ZSTD_ERRORS = ()
+
+try:
+    # aiohttp versions with HAS_ZSTD decode zstd request bodies themselves
+    # and reject them without backports.zstd, older ones pass them as is.
+    from aiohttp.compression_utils import HAS_ZSTD as _AIOHTTP_HAS_ZSTD
+except ImportError:
+    _AIOHTTP_HAS_ZSTD = None
+
+# Content types.
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+# Content encodings.
+IDENTITY = "identity"
+GZIP = "gzip"
+ZSTD = "zstd"
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+_READ_SIZE = 64 * 1024
+
+
+def supported_content_types():
+    """Returns content types which can be encoded/decoded here.
+
+    In order of preference, msgpack needs optional msgpack module.
+    """
+    content_types = [JSON]
+    if msgpack is not None:
+        content_types.insert(0, MSGPACK)
+    return content_types
+
+
+def supported_content_encodings():
+    """Returns content encodings which can be decoded here.
+
+    zstd needs optional zstandard module.
+    """
+    content_encodings = [GZIP, IDENTITY]
+    if zstandard is not None:
+        content_encodings.insert(0, ZSTD)
+    return content_encodings
+
+
+def server_content_encodings():
+    """Returns content encodings of request bodies an aiohttp server here
+    can decode, either by itself or with decompress().
+    """
+    if _AIOHTTP_HAS_ZSTD is None:
+        return supported_content_encodings()
+    content_encodings = [GZIP, IDENTITY]
+    if _AIOHTTP_HAS_ZSTD:
+        content_encodings.insert(0, ZSTD)
+    return content_encodings
+
+
+def choose(preferred, offered):
+    """Returns first of preferred which is offered, None if none is."""
+    for value in preferred:
+        if value in offered:
+            return value
+    return None
+
+
+def encode_jobs(jobs, content_type):
+    """Returns list of jobs encoded as bytes of content_type.
+
+    Args
+    -----
+        jobs (list): Job instances.
+        content_type (str): One of supported_content_types().
+    """
+    if content_type == MSGPACK:
+        return msgpack.packb([job.get_dict() for job in jobs],
+                             use_bin_type=True)
+    # Job json is spliced, avoids building job dicts.
+    return ("[" + ",".join(job.to_json() for job in jobs) + "]").encode()
+
+
+def decode(data, content_type):
+    """Returns object decoded from bytes of content_type.
+
+    Raises ValueError for data which is not valid content_type.
+    """
+    if content_type == MSGPACK:
+        if msgpack is None:
+            raise ValueError("Unsupported content type {}".format(
+                content_type))
+        return msgpack.unpackb(data, raw=False)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def compress(data, content_encoding, level=None):
+    """Returns data compressed with content_encoding.
+
+    Args
+    -----
+        data (bytes): Data to compress.
+        content_encoding (str): One of supported_content_encodings().
+        level (int, optional): Compression level, fast level by default.
+    """
+    if content_encoding == GZIP:
+        return gzip.compress(data, compresslevel=level or 1)
+    if content_encoding == ZSTD:
+        return zstandard.ZstdCompressor(level=level or 1).compress(data)
+    return data
+
+
+def _read_bounded(reader, max_size):
+    chunks = []
+    size = 0
+    while True:
+        chunk = reader(_READ_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise ValueError("Decompressed data exceeds {} bytes".format(
+                max_size))
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def decompress(data, content_encoding, max_size):
+    """Returns data decompressed with content_encoding.
+
+    Data which is already decompressed, e.g. gzip by aiohttp server, is
+    returned as is.
+
+    Raises ValueError for invalid data or data larger than max_size once
+    decompressed.
+    """
+    try:
+        if content_encoding == GZIP and data.startswith(_GZIP_MAGIC):
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            result = decompressor.decompress(data, max_size + 1)
+            if len(result) > max_size:
+                raise ValueError(
+                    "Decompressed data exceeds {} bytes".format(max_size))
+            return result
+        if content_encoding == ZSTD and data.startswith(_ZSTD_MAGIC):
+            if zstandard is None:
+                raise ValueError("Unsupported content encoding {}".format(
+                    content_encoding))
+            reader = zstandard.ZstdDecompressor().stream_reader(data)
+            return _read_bounded(reader.read, max_size)
+    except zlib.error as e:
+        raise ValueError("Invalid gzip data: {}".format(e))
+    except _ZSTD_ERRORS as e:
+        raise ValueError("Invalid zstd data: {}".format(e))
+    return data
@@ -19,13 +19,16 @@
 from aiohttp import web
 import asyncio
 import logging
+import signal
 import sys
 from .config import Config
 from .distributor import JobDistributor
 from s3replicationcommon.log import setup_logger
 from .job_routes import routes as job_routes
 from .subscriber_routes import routes as subscriber_routes
-from s3replicationcommon.jobs import Jobs
+from s3replicationcommon.jobs import FAIRNESS_KEYS, Jobs
+from .job_journal import FileJournalBackend, JobJournal
+from .site_registry import SiteRegistry
 from .subscribers import Subscribers
 
 _logger = logging.getLogger("s3replicationmanager")
@@ -34,15 +37,27 @@ _logger = logging.getLogger("s3replicationmanager")
 async def on_startup(app):
     _logger.debug("Starting server...")
 
+    if app["job_journal"] is not None:
+        app["job_journal"].start()
+
     distributor = JobDistributor(app)
     app["job_distributor"] = distributor
     asyncio.ensure_future(distributor.start())
 
+    # Reload site config when files change or on SIGHUP.
+    site_registry = app["site_registry"]
+    site_registry.start_watch(app["config"].site_config_check_interval)
+    asyncio.get_event_loop().add_signal_handler(
+        signal.SIGHUP, site_registry.load)
+
 
 async def on_shutdown(app):
     _logger.debug("Performing cleanup on shutdown...")
     app["job_distributor"].stop()
+    app["site_registry"].stop_watch()
     await app['subscribers'].close()
+    if app["job_journal"] is not None:
+        await app["job_journal"].close()
 
 
 class ReplicationManagerApp:
@@ -61,11 +76,30 @@ class ReplicationManagerApp:
 
         self._config.print_with(self._logger)
 
-        self._jobs = Jobs(self._logger, "all-jobs")
+        fairness_key = self._config.queue_fairness_key
+        if fairness_key not in FAIRNESS_KEYS:
+            self._logger.error("Unknown queue_fairness_key {}, using {}".
+                               format(fairness_key, "bucket"))
+            fairness_key = "bucket"
+        self._jobs = Jobs(self._logger, "all-jobs",
+                          fairness_key=fairness_key)
+
+        self._site_registry = SiteRegistry(self._jobs).load()
+
+        # Restore jobs persisted before restart.
+        self._job_journal = None
+        if self._config.job_journal_path:
+            self._job_journal = JobJournal(
+                FileJournalBackend(self._config.job_journal_path),
+                self._config.job_journal_flush_interval_ms,
+                self._config.job_journal_snapshot_records)
+            self._job_journal.replay(self._jobs, self._site_registry)
         self._subscribers = Subscribers()
 
     def run(self):
-        app = web.Application()
+        # Batches of jobs need a body larger than aiohttp default of 1MB.
+        app = web.Application(
+            client_max_size=self._config.max_request_body_size)
 
         # Setup the global context store.
         # https://docs.aiohttp.org/en/stable/web_advanced.html#application-s-config
@@ -74,7 +108,9 @@ class ReplicationManagerApp:
         # processing to replicator and 3. Completed and acknowledged by
         # replicator.
         app['all_jobs'] = self._jobs
+        app['job_journal'] = self._job_journal
         app['subscribers'] = self._subscribers
+        app['site_registry'] = self._site_registry
 
         # Setup application routes.
         app.add_routes([
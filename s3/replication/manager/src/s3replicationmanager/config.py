@@ -67,6 +67,28 @@ class Config:
             self.service_name = config_props['manager']['service_name']
             self.job_polling_interval = \
                 config_props['manager']['job_polling_interval']
+            self.dispatch_policy = \
+                config_props['manager']['dispatch_policy']
+            self.queue_fairness_key = \
+                config_props['manager']['queue_fairness_key']
+            self.site_config_check_interval = \
+                config_props['manager']['site_config_check_interval']
+            self.max_request_body_size = \
+                config_props['manager']['max_request_body_size']
+            self.job_journal_path = \
+                config_props['manager']['job_journal_path']
+            self.job_journal_flush_interval_ms = \
+                config_props['manager']['job_journal_flush_interval_ms']
+            self.job_journal_snapshot_records = \
+                config_props['manager']['job_journal_snapshot_records']
+            self.job_content_types = \
+                config_props['manager']['job_content_types']
+            self.job_content_encodings = \
+                config_props['manager']['job_content_encodings']
+            self.job_compress_min_bytes = \
+                config_props['manager']['job_compress_min_bytes']
+            self.max_job_attempts = \
+                config_props['manager']['max_job_attempts']
         return self
 
     def print_with(self, logger):
@@ -79,3 +101,31 @@ class Config:
             logger.info(
                 "job_polling_interval: {}".format(
                     self.job_polling_interval))
+            logger.info(
+                "dispatch_policy: {}".format(self.dispatch_policy))
+            logger.info(
+                "queue_fairness_key: {}".format(self.queue_fairness_key))
+            logger.info(
+                "site_config_check_interval: {}".format(
+                    self.site_config_check_interval))
+            logger.info(
+                "max_request_body_size: {}".format(
+                    self.max_request_body_size))
+            logger.info(
+                "job_journal_path: {}".format(self.job_journal_path))
+            logger.info(
+                "job_journal_flush_interval_ms: {}".format(
+                    self.job_journal_flush_interval_ms))
+            logger.info(
+                "job_journal_snapshot_records: {}".format(
+                    self.job_journal_snapshot_records))
+            logger.info(
+                "job_content_types: {}".format(self.job_content_types))
+            logger.info(
+                "job_content_encodings: {}".format(
+                    self.job_content_encodings))
+            logger.info(
+                "job_compress_min_bytes: {}".format(
+                    self.job_compress_min_bytes))
+            logger.info(
+                "max_job_attempts: {}".format(self.max_job_attempts))
@@ -0,0 +1,183 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# dispatch_policy.py
+#
+# Policies deciding which subscriber (replicator) each queued job is sent to.
+
+import hashlib
+import heapq
+
+LEAST_OUTSTANDING = "least_outstanding"
+ROUND_ROBIN = "round_robin"
+ENDPOINT_AFFINITY = "endpoint_affinity"
+
+
+class DispatchPolicy:
+    """Assigns jobs to subscribers.
+
+    Distributor takes as many queued jobs as subscribers can accept in
+    total, so every job is assigned and no subscriber is given more than
+    its pending_capacity().
+    """
+
+    def assign(self, subscribers, jobs):
+        """Returns jobs per subscriber.
+
+        Args
+        -----
+            subscribers (list): All subscribers, in subscription order.
+            jobs (list): Jobs to send, at most total pending capacity.
+
+        Returns
+        -------
+            dict: {subscriber_id: [Job, ...]}, only subscribers with jobs.
+        """
+        raise NotImplementedError
+
+
+class LeastOutstandingPolicy(DispatchPolicy):
+    """Sends each job to subscriber with least outstanding jobs relative to
+    its prefetch_count, so load is spread in proportion to capacity.
+    """
+
+    def assign(self, subscribers, jobs):
+        heap = []
+        for index, subscriber in enumerate(subscribers):
+            if subscriber.pending_capacity() <= 0:
+                continue
+            outstanding = subscriber.prefetch_count - \
+                subscriber.pending_capacity()
+            # Index breaks ties in subscription order.
+            heap.append((outstanding / subscriber.prefetch_count, index,
+                         outstanding, subscriber))
+        heapq.heapify(heap)
+
+        assigned = {}
+        for job in jobs:
+            _, index, outstanding, subscriber = heapq.heappop(heap)
+            assigned.setdefault(subscriber.id, []).append(job)
+            outstanding += 1
+            if outstanding < subscriber.prefetch_count:
+                heapq.heappush(heap, (outstanding / subscriber.prefetch_count,
+                                      index, outstanding, subscriber))
+        return assigned
+
+
+class RoundRobinPolicy(DispatchPolicy):
+    """Sends jobs to subscribers in turn, continuing where previous
+    dispatch left off.
+    """
+
+    def __init__(self):
+        """Initialise."""
+        self._next_subscriber_id = None
+
+    def assign(self, subscribers, jobs):
+        start = 0
+        for index, subscriber in enumerate(subscribers):
+            if subscriber.id == self._next_subscriber_id:
+                start = index
+                break
+        ring = subscribers[start:] + subscribers[:start]
+        capacity = [subscriber.pending_capacity() for subscriber in ring]
+
+        assigned = {}
+        position = 0
+        for job in jobs:
+            while capacity[position] <= 0:
+                position = (position + 1) % len(ring)
+            assigned.setdefault(ring[position].id, []).append(job)
+            capacity[position] -= 1
+            position = (position + 1) % len(ring)
+        self._next_subscriber_id = ring[position].id
+        return assigned
+
+
+def _affinity_key(job):
+    """Returns source/target pair of job, jobs with same key share S3
+    sessions at replicator.
+    """
+    source = job.get_source_site_id()
+    target = job.get_target_site_id()
+    if source is None or target is None:
+        # Sites inlined in job.
+        source = job.get_source_session_key()
+        target = job.get_target_session_key()
+    return source + "|" + target
+
+
+class EndpointAffinityPolicy(DispatchPolicy):
+    """Sends jobs with same source and target to same subscriber, so its
+    connection pools and signing caches for them stay warm.
+
+    Subscriber for a source/target pair is chosen by rendezvous hashing,
+    so pairs move only when subscribers join or leave. When preferred
+    subscriber is full, job goes to the next one in hash order.
+    """
+
+    def __init__(self):
+        """Initialise."""
+        self._subscriber_ids = None
+        # Subscribers ordered by preference, keyed by affinity key.
+        self._rankings = {}
+
+    def _ranking(self, key, subscribers):
+        ranking = self._rankings.get(key)
+        if ranking is None:
+            ranking = sorted(
+                subscribers,
+                key=lambda subscriber: hashlib.md5(
+                    (key + "|" + subscriber.id).encode()).digest(),
+                reverse=True)
+            self._rankings[key] = ranking
+        return ranking
+
+    def assign(self, subscribers, jobs):
+        subscriber_ids = tuple(subscriber.id for subscriber in subscribers)
+        if subscriber_ids != self._subscriber_ids:
+            # Subscribers joined or left.
+            self._subscriber_ids = subscriber_ids
+            self._rankings = {}
+        capacity = {subscriber.id: subscriber.pending_capacity()
+                    for subscriber in subscribers}
+
+        assigned = {}
+        for job in jobs:
+            for subscriber in self._ranking(_affinity_key(job), subscribers):
+                if capacity[subscriber.id] > 0:
+                    capacity[subscriber.id] -= 1
+                    assigned.setdefault(subscriber.id, []).append(job)
+                    break
+        return assigned
+
+
+_POLICIES = {
+    LEAST_OUTSTANDING: LeastOutstandingPolicy,
+    ROUND_ROBIN: RoundRobinPolicy,
+    ENDPOINT_AFFINITY: EndpointAffinityPolicy
+}
+
+
+def make_dispatch_policy(name):
+    """Returns dispatch policy for name, None if name is unknown."""
+    policy_class = _POLICIES.get(name)
+    if policy_class is None:
+        return None
+    return policy_class()
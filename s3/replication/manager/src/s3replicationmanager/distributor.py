@@ -20,6 +20,8 @@
 import asyncio
 import logging
 from enum import Enum
+from .dispatch_policy import LEAST_OUTSTANDING
+from .dispatch_policy import make_dispatch_policy
 from .replicator_client import ReplicatorClient
 
 
@@ -42,8 +44,49 @@ class JobDistributor:
     def __init__(self, app):
         """Initialise."""
         self._app = app
+        # Distribution is driven by wakeups, polling interval is only a
+        # fallback to retry jobs which failed to post.
         self._polling_interval = app["config"].job_polling_interval
         self._state = DistributorState.INITIAL
+        self._wakeup_event = asyncio.Event()
+
+        policy_name = app["config"].dispatch_policy
+        self._dispatch_policy = make_dispatch_policy(policy_name)
+        if self._dispatch_policy is None:
+            _logger.error("Unknown dispatch_policy {}, using {}".format(
+                policy_name, LEAST_OUTSTANDING))
+            self._dispatch_policy = make_dispatch_policy(LEAST_OUTSTANDING)
+
+        app['all_jobs'].set_queued_listener(self.wakeup)
+        app['subscribers'].set_capacity_listener(self.wakeup)
+
+    def wakeup(self):
+        """Wake up distributor loop to check for jobs to distribute."""
+        self._wakeup_event.set()
+
+    async def _wait_for_wakeup(self):
+        """Waits till woken up or polling interval elapses."""
+        try:
+            await asyncio.wait_for(self._wakeup_event.wait(),
+                                   self._polling_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup_event.clear()
+
+    def _sites_to_register(self, subscriber, jobs):
+        """Returns sites referred by jobs, not yet sent to subscriber."""
+        site_registry = self._app['site_registry']
+        sites = {}
+        for job in jobs:
+            for site_id in (job.get_source_site_id(),
+                            job.get_target_site_id()):
+                if site_id is None or site_id in sites or \
+                        site_id in subscriber.registered_site_ids:
+                    continue
+                site = site_registry.get_site_by_id(site_id)
+                if site is not None:
+                    sites[site_id] = site
+        return sites
 
     async def start(self):
         """Starts distributor loop for distributing jobs to subscribers."""
@@ -52,8 +95,8 @@ class JobDistributor:
         subscribers_list = self._app['subscribers']
         jobs_list = self._app['all_jobs']
         while self._state == DistributorState.RUNNING:
-            # Wait for next interval.
-            await asyncio.sleep(self._polling_interval)
+            # Wait for new jobs, released capacity or next interval.
+            await self._wait_for_wakeup()
 
             if self._state == DistributorState.RUNNING:
                 # Scan jobs list and send to subscribers.
@@ -67,46 +110,38 @@ class JobDistributor:
                     _logger.debug("No jobs available to distribute.")
                     continue
 
-                # For each subscriber, check count to send as per prefetch.
+                # Take as many jobs as subscribers can accept in total.
+                subscribers = list(subscribers_list.values())
+                total_capacity = sum(
+                    max(subscriber.pending_capacity(), 0)
+                    for subscriber in subscribers)
+                count_to_send = min(jobs_list.queued_count(), total_capacity)
+                if count_to_send == 0:
+                    _logger.debug("All subscribers are busy.")
+                    continue
+
+                # Policy decides which subscriber gets which job.
+                assigned_jobs = self._dispatch_policy.assign(
+                    subscribers, jobs_list.get_queued(count_to_send))
+
                 task_list = []
                 jobs_list_per_task = []  # so we can co-relate with task
-                for subscriber_id, subscriber in subscribers_list.items():
-                    _logger.debug("Processing subscriber id {}".format(
-                        subscriber_id))
-                    # How many more subscriber can accept?
-                    capacity = subscriber.pending_capacity()
-
-                    # Find count of jobs in pending jobs.
-                    available_jobs_count = jobs_list.queued_count()
-
-                    # Identify how many jobs to send to current subscriber.
-                    count_to_send = 0
-                    if available_jobs_count == 0:
-                        # No available jobs, break for subscribers and wait
-                        _logger.debug("No jobs available to distribute.")
-                        break
-                    elif capacity == 0:
-                        # Current subscriber has no more capacity.
-                        _logger.debug("Subscriber with id {} is busy.")
-                        continue
-                    elif available_jobs_count > capacity:
-                        # Send capacity jobs.
-                        count_to_send = capacity
-                    else:
-                        # We dont have enough to fullfill capacity, send all.
-                        count_to_send = available_jobs_count
+                for subscriber_id, jobs_to_send in assigned_jobs.items():
+                    _logger.debug("Sending {} jobs to subscriber id {}".format(
+                        len(jobs_to_send), subscriber_id))
+                    subscriber = subscribers_list.get_subscriber(subscriber_id)
 
-                    # Extract first count_to_send number of jobs from queue.
-                    jobs_to_send = jobs_list.get_queued(count_to_send)
                     # For each job, add subscriber ID, so when job is ack'ed,
                     # subscriber prefetch count can be updated.
                     for job in jobs_to_send:
                         job.set_subscriber_id(subscriber_id)
 
-                    replicator_client = ReplicatorClient(subscriber)
+                    replicator_client = ReplicatorClient(
+                        subscriber, self._app["config"])
                     # Schedule async job send using http POST.
                     task = asyncio.ensure_future(replicator_client.post(
-                        jobs_to_send))
+                        jobs_to_send, self._sites_to_register(
+                            subscriber, jobs_to_send)))
                     task_list.append(task)
                     jobs_list_per_task.append(jobs_to_send)
 
@@ -125,7 +160,10 @@ class JobDistributor:
                         _logger.debug(
                             "Jobs posted successfully to subscriber id {}".
                             format(client.get_subscriber_id()))
-                        subscriber.jobs_sent(len(client.jobs_to_send))
+                        subscriber = subscribers_list.get_subscriber(
+                            client.get_subscriber_id())
+                        if subscriber is not None:
+                            subscriber.jobs_sent(len(client.jobs_to_send))
                     else:
                         # Job post failed, move back to queued.
                         _logger.debug(
@@ -140,13 +178,14 @@ class JobDistributor:
                 _logger.debug("Job distributor is paused, do nothing.")
             else:
                 # Either Stopped or aborted, break while loop.
-                _logger.debug("Job distributor {}".str(self._state))
+                _logger.debug("Job distributor {}".format(self._state))
                 break
 
     def stop(self):
         """Stops the Distributor loop."""
         _logger.debug("Stopping job distribution.")
         self._state = DistributorState.STOPPED
+        self.wakeup()
 
     def pause(self):
         """Pauses the Distributor loop."""
@@ -157,6 +196,7 @@ class JobDistributor:
         """Resumes the Distributor loop."""
         _logger.debug("Resuming job distribution.")
         self._state = DistributorState.RUNNING
+        self.wakeup()
 
     def on_client_send_done(self, client):
         """Once client send completes, handle success or failure."""
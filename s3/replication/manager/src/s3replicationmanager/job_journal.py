@@ -0,0 +1,402 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# job_journal.py
+#
+# Write ahead journal of job state transitions, so queued jobs survive
+# replication manager restart.
+
+import asyncio
+import json
+import logging
+import os
+from s3replicationcommon.job import Job
+from s3replicationcommon.job import JobState
+
+_logger = logging.getLogger('s3replicationmanager')
+
+# Journal records, one json object per line.
+# {"op": "add", "job_id": <job_id>, "job": <job dict>}
+# {"op": "move", "replication_id": <id>, "to": <state>[, "state": <state>]}
+#   where to is one of queued, inprogress, paused, completed and state is
+#   JobState name of completed job.
+# {"op": "remove", "job_id": <job_id>}
+
+_COMPLETED_STATES = {
+    str(JobState.COMPLETED): Job.mark_completed,
+    str(JobState.FAILED): Job.mark_failed,
+    str(JobState.ABORTED): Job.mark_aborted
+}
+
+
+class JournalBackend:
+    """Storage for journal records and snapshots.
+
+    Methods are blocking and called from an executor thread, one at a time.
+    """
+
+    def load(self):
+        """Returns list of records, from snapshot followed by journal."""
+        raise NotImplementedError
+
+    def append(self, lines):
+        """Durably appends encoded records, returns once persisted."""
+        raise NotImplementedError
+
+    def write_snapshot(self, lines):
+        """Durably replaces snapshot with given records, clears journal."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class FileJournalBackend(JournalBackend):
+    """Journal and snapshot as newline delimited json files in a directory.
+
+    Snapshot header names generation of journal file that follows it, so a
+    crash while compacting never applies a journal twice.
+    """
+
+    SNAPSHOT_FILE = "snapshot.json"
+
+    def __init__(self, directory):
+        """Initialise."""
+        self._directory = os.path.expanduser(directory)
+        os.makedirs(self._directory, exist_ok=True)
+        self._generation = 0
+        self._journal_file = None
+
+    def _journal_path(self, generation):
+        return os.path.join(self._directory,
+                            "journal.{}.log".format(generation))
+
+    def _sync_directory(self):
+        fd = os.open(self._directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _read_records(file_path, records):
+        with open(file_path, 'r') as journal_f:
+            for line in journal_f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Torn write at crash, rest of file is not valid.
+                    _logger.warn("Ignoring partial record in {}".format(
+                        file_path))
+                    break
+
+    def load(self):
+        records = []
+        snapshot_path = os.path.join(self._directory, self.SNAPSHOT_FILE)
+        if os.path.isfile(snapshot_path):
+            self._read_records(snapshot_path, records)
+            # First record is header.
+            self._generation = records.pop(0)["generation"]
+
+        journal_path = self._journal_path(self._generation)
+        if os.path.isfile(journal_path):
+            self._read_records(journal_path, records)
+        self._journal_file = open(journal_path, 'a')
+        return records
+
+    def append(self, lines):
+        self._journal_file.write("".join(lines))
+        self._journal_file.flush()
+        os.fsync(self._journal_file.fileno())
+
+    def write_snapshot(self, lines):
+        generation = self._generation + 1
+        snapshot_path = os.path.join(self._directory, self.SNAPSHOT_FILE)
+        tmp_path = snapshot_path + ".tmp"
+        with open(tmp_path, 'w') as snapshot_f:
+            snapshot_f.write(json.dumps({"generation": generation}) + "\n")
+            for line in lines:
+                snapshot_f.write(line)
+            snapshot_f.flush()
+            os.fsync(snapshot_f.fileno())
+        os.rename(tmp_path, snapshot_path)
+        self._sync_directory()
+
+        # Snapshot now covers old journal, switch to new one.
+        self._journal_file.close()
+        os.remove(self._journal_path(self._generation))
+        self._generation = generation
+        self._journal_file = open(self._journal_path(generation), 'a')
+
+    def close(self):
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+
+def _encode(record):
+    return json.dumps(record) + "\n"
+
+
+def _encode_add(job):
+    # Job json is spliced in, avoids building job dict.
+    return '{{"op": "add", "job_id": {}, "job": {}}}\n'.format(
+        json.dumps(job.get_job_id()), job.to_json())
+
+
+def _encode_add_record(job_id, record_json):
+    # subscriber_id and state are not restored, so only record is needed.
+    return '{{"op": "add", "job_id": {}, "job": {}}}\n'.format(
+        json.dumps(job_id), record_json)
+
+
+class JobJournal:
+    """Journal of Jobs state transitions with group commit.
+
+    Jobs records each transition with record_* methods, which only buffer
+    the record. A single flusher task writes buffered records in one
+    write and fsync, at most every flush_interval_ms. Callers that must
+    not acknowledge before data is durable await commit(), concurrent
+    callers share the same fsync. After snapshot_records journal records
+    the journal is compacted into a snapshot of current jobs.
+    """
+
+    def __init__(self, backend, flush_interval_ms, snapshot_records):
+        """Initialise."""
+        self._backend = backend
+        self._flush_interval = flush_interval_ms / 1000
+        self._snapshot_records = snapshot_records
+        self._jobs = None
+
+        self._pending = []
+        # Resolved when records in self._pending are persisted.
+        self._pending_future = None
+        # Resolved when records being written are persisted.
+        self._flushing_future = None
+        self._journal_records = 0
+
+        self._wakeup_event = None
+        self._flusher = None
+        self._running = False
+
+    # Recording, called by Jobs.
+    def _append(self, line):
+        if self._pending_future is None:
+            self._pending_future = asyncio.get_event_loop().create_future()
+        self._pending.append(line)
+
+    def record_add(self, job):
+        self._append(_encode_add(job))
+
+    def record_move(self, job, to_state):
+        record = {"op": "move", "replication_id": job.get_replication_id(),
+                  "to": to_state}
+        if to_state == "completed":
+            record["state"] = str(job.get_state())
+        self._append(_encode(record))
+
+    def record_remove(self, job_id):
+        self._append(_encode({"op": "remove", "job_id": job_id}))
+
+    # Replay.
+    @staticmethod
+    def _apply(jobs, record):
+        op = record["op"]
+        if op == "add":
+            job_dict = record["job"]
+            job_dict.pop("job_id", None)
+            jobs.add_job(Job(job_dict, job_id=record["job_id"]))
+        elif op == "move":
+            replication_id = record["replication_id"]
+            to_state = record["to"]
+            if to_state == "inprogress":
+                jobs.move_to_inprogress(replication_id)
+            elif to_state == "paused":
+                jobs.move_to_pause(replication_id)
+            elif to_state == "queued":
+                jobs.move_to_queued(replication_id)
+            elif to_state == "completed":
+                job = jobs.get_job(replication_id)
+                mark_state = _COMPLETED_STATES.get(record.get("state"))
+                if mark_state is not None:
+                    mark_state(job)
+                jobs.move_to_complete(replication_id)
+        elif op == "remove":
+            jobs.remove_job_by_job_id(record["job_id"])
+
+    @staticmethod
+    def _has_unknown_site(job, site_registry):
+        for site_id in (job.get_source_site_id(), job.get_target_site_id()):
+            if site_id is not None and \
+                    site_registry.get_site_by_id(site_id) is None:
+                return True
+        return False
+
+    def replay(self, jobs, site_registry=None):
+        """Loads persisted jobs into jobs and starts journaling it.
+
+        Jobs that were sent to subscribers are queued again, as
+        subscribers do not survive restart. Jobs not yet completed which
+        refer to a site that is no longer configured are completed as
+        failed, as they can never be replicated.
+
+        Args
+        -----
+            jobs (Jobs): Empty jobs collection.
+            site_registry (SiteRegistry, optional): Resolves site_id of
+            jobs, sites are not checked when None.
+        """
+        records = self._backend.load()
+        for record in records:
+            self._apply(jobs, record)
+
+        pending = [(state, job) for state, job in jobs.iter_jobs_by_state()
+                   if state != "completed"]
+        requeue_count = 0
+        failed_count = 0
+        for state, job in pending:
+            replication_id = job.get_replication_id()
+            if site_registry is not None and \
+                    self._has_unknown_site(job, site_registry):
+                _logger.error(
+                    "Failing job_id {}, unknown site {} or {}".format(
+                        job.get_job_id(), job.get_source_site_id(),
+                        job.get_target_site_id()))
+                if state != "inprogress":
+                    jobs.move_to_inprogress(replication_id)
+                job.mark_failed()
+                jobs.move_to_complete(replication_id)
+                failed_count += 1
+            elif state != "queued":
+                if state == "paused":
+                    jobs.move_to_inprogress(replication_id)
+                jobs.move_to_queued(replication_id)
+                requeue_count += 1
+
+        _logger.info("Replayed {} journal records, {} jobs, {} re-queued, "
+                     "{} failed for unknown site".format(
+                         len(records), jobs.count(), requeue_count,
+                         failed_count))
+
+        self._jobs = jobs
+        jobs.set_journal(self)
+        # Start from compact state.
+        self._backend.write_snapshot(self._snapshot_lines())
+
+    def _snapshot_lines(self):
+        """Returns generator of records recreating current jobs."""
+        # Copy immutable fields of jobs now, on event loop, so jobs changed
+        # meanwhile do not affect snapshot. Records are encoded later in
+        # executor.
+        jobs_by_state = [(to_state, job.get_job_id(),
+                          job.get_replication_id(), job.get_record_json(),
+                          str(job.get_state()))
+                         for to_state, job in self._jobs.iter_jobs_by_state()]
+        return self._encode_snapshot(jobs_by_state)
+
+    @staticmethod
+    def _encode_snapshot(jobs_by_state):
+        for to_state, job_id, replication_id, record_json, job_state in \
+                jobs_by_state:
+            yield _encode_add_record(job_id, record_json)
+            if to_state == "queued":
+                continue
+            # Jobs are added as queued, and reach other states through
+            # inprogress.
+            yield _encode({"op": "move", "replication_id": replication_id,
+                           "to": "inprogress"})
+            if to_state != "inprogress":
+                record = {"op": "move",
+                          "replication_id": replication_id,
+                          "to": to_state}
+                if to_state == "completed":
+                    record["state"] = job_state
+                yield _encode(record)
+
+    # Flushing.
+    async def commit(self):
+        """Waits till all records so far are persisted."""
+        if self._pending_future is not None:
+            future = self._pending_future
+            self._wakeup_event.set()
+        elif self._flushing_future is not None:
+            future = self._flushing_future
+        else:
+            return
+        await asyncio.shield(future)
+
+    async def _flush(self):
+        if not self._pending:
+            return
+        lines = self._pending
+        future = self._pending_future
+        self._pending = []
+        self._pending_future = None
+        self._flushing_future = future
+
+        loop = asyncio.get_event_loop()
+        try:
+            if self._journal_records + len(lines) >= self._snapshot_records:
+                # Snapshot reflects all recorded transitions, so pending
+                # lines need not be written to journal.
+                await loop.run_in_executor(
+                    None, self._backend.write_snapshot,
+                    self._snapshot_lines())
+                self._journal_records = 0
+            else:
+                await loop.run_in_executor(
+                    None, self._backend.append, lines)
+                self._journal_records += len(lines)
+        except OSError as e:
+            _logger.error("Failed to persist job journal: {}".format(e))
+            # Journal may now miss records, rewrite all on next flush.
+            self._journal_records = self._snapshot_records
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+        finally:
+            self._flushing_future = None
+
+    async def _run(self):
+        while self._running:
+            try:
+                await asyncio.wait_for(self._wakeup_event.wait(),
+                                       self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup_event.clear()
+            # Let concurrent committers join this batch.
+            await asyncio.sleep(0)
+            await self._flush()
+
+    def start(self):
+        """Starts background flushing."""
+        self._running = True
+        self._wakeup_event = asyncio.Event()
+        self._flusher = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        """Flushes pending records and stops background flushing."""
+        self._running = False
+        self._wakeup_event.set()
+        if self._flusher is not None:
+            await self._flusher
+            self._flusher = None
+        await self._flush()
+        self._backend.close()
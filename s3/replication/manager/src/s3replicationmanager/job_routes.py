@@ -18,11 +18,12 @@
 #
 
 from aiohttp import web
+import asyncio
 import logging
 import json
 from urllib.parse import urlparse, parse_qs
 from s3replicationcommon.job import JobJsonEncoder
-from s3replicationcommon.jobs import Jobs
+from s3replicationcommon.job_listing import stream_jobs
 from .prepare_job import PrepareReplicationJob
 
 _logger = logging.getLogger('s3replicationmanager')
@@ -30,6 +31,78 @@ _logger = logging.getLogger('s3replicationmanager')
 # Route table declaration
 routes = web.RouteTableDef()
 
+# Records prepared between yields to event loop during batch ingestion.
+BATCH_YIELD_INTERVAL = 256
+
+# Job status which subscribers can report.
+JOB_STATUSES = ("completed", "failed", "aborted")
+
+
+def _add_fdmi_record(app, fdmi_job):
+    """Prepares and queues job for FDMI record.
+
+    Returns
+    -------
+        dict: Per record result with http like status, job_id on success.
+    """
+    try:
+        job_record = PrepareReplicationJob.from_fdmi(
+            fdmi_job, app['site_registry'])
+    except (KeyError, TypeError) as e:
+        _logger.debug('Invalid FDMI record, missing {}'.format(e))
+        job_record = None
+
+    if job_record is None:
+        return {'status': 400, 'ErrorResponse': 'BadRequest. Invalid Job!'}
+
+    jobs_list = app['all_jobs']
+    if jobs_list.is_job_present(job_record["replication-id"]):
+        return {'status': 409, 'ErrorResponse': 'Duplicate Job!'}
+
+    job = jobs_list.add_job_using_json(job_record)
+    return {'status': 201, 'job_id': job.get_job_id()}
+
+
+def _update_job_status(app, job, status):
+    """Marks job with status reported by subscriber and completes it.
+
+    Failed job is queued again till it was sent max_job_attempts times.
+    """
+    jobs_list = app['all_jobs']
+    if status == "completed":
+        job.mark_completed()
+    elif status == "failed":
+        job.mark_failed()
+        if job.get_failure_count() < app['config'].max_job_attempts:
+            _logger.info('Queueing failed job_id {} again, attempt {}'.format(
+                job.get_job_id(), job.get_failure_count() + 1))
+            jobs_list.move_to_queued(job.get_replication_id())
+            return
+        _logger.error('Job_id {} failed after {} attempts'.format(
+            job.get_job_id(), job.get_failure_count()))
+    elif status == "aborted":
+        job.mark_aborted()
+
+    jobs_list.move_to_complete(job.get_replication_id())
+
+
+async def _commit_journal(app):
+    """Waits till job changes so far are persisted."""
+    if app['job_journal'] is not None:
+        await app['job_journal'].commit()
+
+
+async def _read_ndjson(request):
+    """Yields records of NDJSON body as each line arrives."""
+    async for line in request.content:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Reported as invalid record.
+                yield None
+
 
 @routes.post('/jobs')  # noqa: E302
 async def add_job(request):
@@ -37,7 +110,8 @@ async def add_job(request):
     fdmi_job = await request.json()
     _logger.debug('API: POST /jobs\nContent : {}'.format(fdmi_job))
 
-    job_record = PrepareReplicationJob.from_fdmi(fdmi_job)
+    job_record = PrepareReplicationJob.from_fdmi(
+        fdmi_job, request.app['site_registry'])
 
     if job_record is None:
         return web.json_response(
@@ -51,11 +125,55 @@ async def add_job(request):
             {'ErrorResponse': 'Duplicate Job!'}, status=409)
 
     job = jobs_list.add_job_using_json(job_record)
+    await _commit_journal(request.app)
     _logger.debug('Successfully added Job with job_id : {} '.
                   format(job.get_job_id()))
     return web.json_response(job.get_dict(), status=201)
 
 
+@routes.post('/jobs:batch')  # noqa: E302
+async def add_jobs_batch(request):
+    """Handler to add many jobs to job queue.
+
+    Body is JSON array of FDMI records, or one record per line when
+    Content-Type is application/x-ndjson. Responds with result of each
+    record in request order.
+    """
+    _logger.debug('API: POST /jobs:batch')
+
+    if request.content_type == 'application/x-ndjson':
+        fdmi_jobs = _read_ndjson(request)
+    else:
+        try:
+            fdmi_jobs = await request.json()
+        except ValueError:
+            fdmi_jobs = None
+        if not isinstance(fdmi_jobs, list):
+            return web.json_response(
+                {'ErrorResponse': 'BadRequest. Expected list of jobs!'},
+                status=400)
+
+    results = []
+    if isinstance(fdmi_jobs, list):
+        for fdmi_job in fdmi_jobs:
+            result = _add_fdmi_record(request.app, fdmi_job)
+            results.append(result)
+            if len(results) % BATCH_YIELD_INTERVAL == 0:
+                # Dont starve other requests during large batches.
+                await asyncio.sleep(0)
+    else:
+        async for fdmi_job in fdmi_jobs:
+            results.append(_add_fdmi_record(request.app, fdmi_job))
+
+    # Single commit for whole batch.
+    await _commit_journal(request.app)
+    added_count = sum(1 for result in results if result['status'] == 201)
+    _logger.debug('Added {} of {} jobs in batch'.format(
+        added_count, len(results)))
+    return web.json_response(
+        {'added': added_count, 'results': results}, status=200)
+
+
 @routes.get('/jobs/{job_id}')  # noqa: E302
 async def get_job(request):
     """Handler to get job attributes."""
@@ -82,26 +200,34 @@ async def update_job_attr(request):
     job_id = request.match_info['job_id']
     _logger.debug('API: PUT /jobs/{}'.format(job_id))
 
+    try:
+        status = job_record["status"]
+    except (KeyError, TypeError):
+        status = None
+    if status not in JOB_STATUSES:
+        return web.json_response(
+            {'ErrorResponse': 'BadRequest. Invalid status!'}, status=400)
+
     jobs_list = request.app['all_jobs']
     job = jobs_list.get_job_by_job_id(job_id)
 
     if job is None:
-        _logger.error('Job Not Found! job_id : {} '.format(job.get_job_id()))
+        _logger.error('Job Not Found! job_id : {} '.format(job_id))
         return web.json_response(
             {'ErrorResponse': 'Job Not Found!'}, status=404)
+    elif not jobs_list.is_job_inprogress(job.get_replication_id()):
+        # Duplicate update e.g. resent after lost response.
+        _logger.warn('Job not in progress! job_id : {} '.format(job_id))
+        return web.json_response(
+            {'ErrorResponse': 'Job not in progress!'}, status=409)
     else:
         subscriber_id = job.get_subscriber_id()
         subscriber = request.app['subscribers'].get_subscriber(subscriber_id)
-        subscriber.job_acknowledged(1)
-
-        if job_record["status"] == "completed":
-            job.mark_completed()
-        elif job_record["status"] == "failed":
-            job.mark_failed()
-        elif job_record["status"] == "aborted":
-            job.mark_aborted()
+        if subscriber is not None:
+            subscriber.job_acknowledged(1)
 
-        jobs_list.move_to_complete(job.get_replication_id())
+        _update_job_status(request.app, job, status)
+        await _commit_journal(request.app)
 
         _logger.info('Updated Job with job_id : {} '.format(job.get_job_id()))
         _logger.debug(
@@ -109,6 +235,67 @@ async def update_job_attr(request):
         return web.json_response(job.get_dict(), status=200)
 
 
+@routes.put('/jobs')  # noqa: E302
+async def update_jobs_status(request):
+    """Handler to update status of many jobs.
+
+    Body is [{"job_id": <job_id>, "status": <status>}, ...], status is one
+    of completed, failed or aborted. Subscribers are acknowledged once per
+    request and all updates are persisted with a single journal commit.
+    Responds with result of each update in request order.
+    """
+    updates = await request.json()
+    _logger.debug('API: PUT /jobs')
+
+    if not isinstance(updates, list):
+        return web.json_response(
+            {'ErrorResponse': 'BadRequest. Expected list of job status!'},
+            status=400)
+
+    jobs_list = request.app['all_jobs']
+    # Acknowledged count per subscriber_id.
+    acknowledged = {}
+    results = []
+    for update in updates:
+        try:
+            job_id = update["job_id"]
+            status = update["status"]
+        except (KeyError, TypeError):
+            status = None
+        if status not in JOB_STATUSES:
+            results.append({'status': 400,
+                            'ErrorResponse': 'BadRequest. Invalid update!'})
+            continue
+
+        job = jobs_list.get_job_by_job_id(job_id)
+        if job is None:
+            results.append({'job_id': job_id, 'status': 404,
+                            'ErrorResponse': 'Job Not Found!'})
+        elif not jobs_list.is_job_inprogress(job.get_replication_id()):
+            # Duplicate update e.g. resent after lost response.
+            results.append({'job_id': job_id, 'status': 409,
+                            'ErrorResponse': 'Job not in progress!'})
+        else:
+            subscriber_id = job.get_subscriber_id()
+            acknowledged[subscriber_id] = \
+                acknowledged.get(subscriber_id, 0) + 1
+            _update_job_status(request.app, job, status)
+            results.append({'job_id': job_id, 'status': 200})
+
+    subscribers = request.app['subscribers']
+    for subscriber_id, count in acknowledged.items():
+        subscriber = subscribers.get_subscriber(subscriber_id)
+        if subscriber is not None:
+            subscriber.job_acknowledged(count)
+
+    # Single commit for whole batch.
+    await _commit_journal(request.app)
+    updated_count = sum(acknowledged.values())
+    _logger.info('Updated {} of {} jobs'.format(updated_count, len(updates)))
+    return web.json_response(
+        {'updated': updated_count, 'results': results}, status=200)
+
+
 @routes.get('/jobs')  # noqa: E302
 async def get_jobs(request):
     """List active jobs."""
@@ -138,37 +325,32 @@ async def get_jobs(request):
             return web.json_response(
                 {'count': all_jobs_list.count()}, status=200)
 
+    # Listings are streamed, a page at a time when limit is given.
     elif 'queued' in query:
         # Return queued jobs not yet distributed.
-        queued_jobs = all_jobs_list.get_queued()
         _logger.debug('Returning Jobs Queued, count = {}'.format(
-            len(queued_jobs)))
-        return web.json_response(
-            queued_jobs, dumps=Jobs.list_dumps, status=200)
+            all_jobs_list.queued_count()))
+        return await stream_jobs(request, all_jobs_list, query, "queued")
 
     elif 'inprogress' in query:
         # Return in progress jobs that are distributed.
-        inprogress_jobs_list = all_jobs_list.get_inprogress()
-
         _logger.debug('Returning Jobs In-Progress, count = {}'.format(
-            len(inprogress_jobs_list)))
-        return web.json_response(
-            inprogress_jobs_list, dumps=Jobs.list_dumps, status=200)
+            all_jobs_list.inprogress_count()))
+        return await stream_jobs(
+            request, all_jobs_list, query, "inprogress")
 
     elif 'completed' in query:
         # Return completed and acknowledged jobs.
-        completed_jobs = all_jobs_list.get_completed()
         _logger.debug('Returning Jobs completed, count = {}'.format(
-            len(completed_jobs)))
-        return web.json_response(
-            completed_jobs, dumps=Jobs.list_dumps, status=200)
+            all_jobs_list.completed_count()))
+        return await stream_jobs(
+            request, all_jobs_list, query, "completed")
 
     else:
         # return jobs that are not yet distributed.
         _logger.debug('Returning All Jobs, count = {}'.format(
             all_jobs_list.count()))
-        return web.json_response(
-            all_jobs_list, dumps=Jobs.dumps, status=200)
+        return await stream_jobs(request, all_jobs_list, query, as_dict=True)
 
 
 @routes.delete('/jobs/{job_id}')  # noqa: E302
@@ -181,6 +363,7 @@ async def remove_job(request):
     job = jobs_list.remove_job_by_job_id(job_id)
 
     if job is not None:
+        await _commit_journal(request.app)
         _logger.debug('Deleted job with job_id : {} '.format(job_id))
         return web.json_response({"job_id": job_id}, status=204)
     else:
@@ -23,55 +23,34 @@
 # replication job preparation from s3 metadata
 
 import datetime
-import os
-import yaml
 
-from configparser import ConfigParser
+from s3replicationcommon.site_table import SITE_FIELDS
 from s3replicationcommon.templates import replication_job_template
 
 
 class PrepareReplicationJob:
 
     @staticmethod
-    def from_fdmi(fdmi_record):
-        """Prepare replication job record from fdmi record."""
+    def from_fdmi(fdmi_record, site_registry):
+        """Prepare replication job record from fdmi record.
+
+        Args
+        -----
+            fdmi_record (dict): FDMI record of S3 object.
+            site_registry (SiteRegistry): Source/target sites.
+
+        Returns
+        -------
+            dict: Job record, None if source/target site is unknown.
+        """
         # XXX All below, source/target credentials logic to change after
         # S3 server changes are ready for setting up replication.
-
-        # Read the config file for source/target sites.
-        cortx_s3 = None
-        conf_path = os.path.join(os.path.expanduser('~'), '.cortxs3')
-        file_path = os.path.join(conf_path, "cortx_s3.yaml")
-        if not os.path.isfile(file_path):
-            file_path = os.path.join(
-                os.path.dirname(__file__), '..', 'config/cortx_s3.yaml')
-
-        with open(file_path, 'r') as cortx_s3_f:
-            cortx_s3 = yaml.safe_load(cortx_s3_f)
-
-        aws_s3 = None
-        file_path = os.path.join(conf_path, "aws_s3.yaml")
-        if not os.path.isfile(file_path):
-            file_path = os.path.join(
-                os.path.dirname(__file__), '..', 'config/aws_s3.yaml')
-
-        with open(file_path, 'r') as aws_s3_f:
-            aws_s3 = yaml.safe_load(aws_s3_f)
-
-        # File with credentials. ~/.cortxs3/credentials.yaml
-        cortx_creds_path = os.path.join(conf_path, 'credentials.yaml')
-
-        cortx_credentials = None
-        with open(cortx_creds_path, 'r') as cred_config:
-            cortx_credentials = yaml.safe_load(cred_config)
-
-        # For AWS target.
-        # File with credentials. ~/.aws/credentials
-        aws_s3_creds_home = os.path.join(os.path.expanduser('~'), '.aws')
-        aws_s3_creds_path = os.path.join(aws_s3_creds_home, 'credentials')
-
-        aws_s3_credentials = ConfigParser()
-        aws_s3_credentials.read(aws_s3_creds_path)
+        source_site = site_registry.get_source_site()
+        target_site = site_registry.get_site(
+            fdmi_record["User-Defined"]["x-amz-meta-target-site"])
+        if source_site is None or target_site is None:
+            # Invalid record.
+            return None
 
         job_dict = replication_job_template()
 
@@ -88,15 +67,15 @@ class PrepareReplicationJob:
         job_dict["replication-event-create-time"] = epoch_t.strftime(
             '%Y%m%dT%H%M%SZ')
 
-        job_dict["source"]["endpoint"] = cortx_s3["endpoint"]
+        # Higher priority objects are replicated first.
+        job_dict["priority"] = fdmi_record["User-Defined"].get(
+            "x-amz-meta-replication-priority", 0)
 
-        if "admin_endpoint" in cortx_s3:
-            job_dict["source"]["admin_endpoint"] = cortx_s3["admin_endpoint"]
-        job_dict["source"]["service_name"] = cortx_s3["s3_service_name"]
-        job_dict["source"]["region"] = cortx_s3["s3_region"]
-
-        job_dict["source"]["access_key"] = cortx_credentials["access_key"]
-        job_dict["source"]["secret_key"] = cortx_credentials["secret_key"]
+        # Sites are sent to replicators once, jobs only refer to them.
+        for field in SITE_FIELDS:
+            job_dict["source"].pop(field, None)
+            job_dict["target"].pop(field, None)
+        job_dict["source"]["site_id"] = source_site["site_id"]
 
         job_dict["source"]["operation"]["attributes"]["Bucket-Name"] = \
             fdmi_record["Bucket-Name"]
@@ -131,23 +110,7 @@ class PrepareReplicationJob:
             job_dict["User-Defined-Tags"] = fdmi_record["User-Defined-Tags"]
 
         # XXX: Change after S3 changes are ready for replication.
-        if fdmi_record["User-Defined"]["x-amz-meta-target-site"] == "cortxs3":
-            job_dict["target"]["endpoint"] = cortx_s3["endpoint"]
-            job_dict["target"]["service_name"] = cortx_s3["s3_service_name"]
-            job_dict["target"]["region"] = cortx_s3["s3_region"]
-            job_dict["target"]["access_key"] = cortx_credentials["access_key"]
-            job_dict["target"]["secret_key"] = cortx_credentials["secret_key"]
-        elif fdmi_record["User-Defined"]["x-amz-meta-target-site"] == "awss3":
-            job_dict["target"]["endpoint"] = aws_s3["endpoint"]
-            job_dict["target"]["service_name"] = aws_s3["s3_service_name"]
-            job_dict["target"]["region"] = aws_s3["s3_region"]
-            job_dict["target"]["access_key"] = \
-                aws_s3_credentials["default"]["aws_access_key_id"]
-            job_dict["target"]["secret_key"] = \
-                aws_s3_credentials["default"]["aws_secret_access_key"]
-        else:
-            # Invalid record.
-            return None
+        job_dict["target"]["site_id"] = target_site["site_id"]
 
         job_dict["target"]["Bucket-Name"] = \
             fdmi_record["User-Defined"]["x-amz-meta-target-bucket"]
@@ -22,15 +22,16 @@ import json
 import logging
 from s3replicationcommon.s3_common import url_with_resources
 from s3replicationcommon.timer import Timer
-from s3replicationcommon.job import JobJsonEncoder
+from s3replicationcommon import wire_format
 
 _logger = logging.getLogger("s3replicationmanager")
 
 
 class ReplicatorClient:
-    def __init__(self, subscriber):
+    def __init__(self, subscriber, config):
         """Initialise."""
         self._subscriber = subscriber
+        self._config = config
 
         self.http_status = None
         self.response = None
@@ -42,21 +43,80 @@ class ReplicatorClient:
     def get_subscriber_id(self):
         return self._subscriber.id
 
+    def _choose_wire_format(self):
+        """Returns (content_type, content_encoding) for job batches.
+
+        content_encoding is None when batches are sent uncompressed.
+        """
+        content_type = wire_format.choose(
+            [content_type for content_type in self._config.job_content_types
+             if content_type in wire_format.supported_content_types()],
+            self._subscriber.content_types) or wire_format.JSON
+        content_encoding = wire_format.choose(
+            [content_encoding
+             for content_encoding in self._config.job_content_encodings
+             if content_encoding in wire_format.supported_content_encodings()
+             and content_encoding != wire_format.IDENTITY],
+            self._subscriber.content_encodings)
+        return content_type, content_encoding
+
     def get_execution_time(self):
         """Return total time for PUT Object operation."""
         return self._timer.elapsed_time_ms()
 
+    async def _put_sites(self, sites):
+        """Registers sites with replicator, returns True on success."""
+        sites_url = url_with_resources(self._subscriber.endpoint, ["sites"])
+
+        _logger.info('PUT on {}'.format(sites_url))
+        try:
+            async with self._subscriber.client_session.put(
+                    sites_url,
+                    headers={"Content-Type": "application/json"},
+                    data=json.dumps(sites)) as resp:
+                self.http_status = resp.status
+                _logger.info(
+                    'PUT on {} completed with http status: {}'.format(
+                        sites_url, resp.status))
+        except aiohttp.client_exceptions.ClientConnectorError as e:
+            self.remote_down = True
+            _logger.error('Failed to connect to replicator: ' + str(e))
+            return False
+
+        if self.http_status != 200:
+            return False
+        self._subscriber.registered_site_ids.update(sites.keys())
+        return True
+
     # Post the jobs to replicator.
-    async def post(self, jobs_to_send):
+    async def post(self, jobs_to_send, sites=None):
+        """Posts jobs, after registering sites they refer to.
+
+        Args
+        -----
+            jobs_to_send (list): Jobs to send.
+            sites (dict, optional): Site dicts keyed by site_id, not yet
+            registered with replicator.
+        """
         self.jobs_to_send = jobs_to_send
 
-        headers = {"Content-Type": "application/json"}
-        payload = json.dumps(jobs_to_send, cls=JobJsonEncoder)
+        if sites and not await self._put_sites(sites):
+            # Jobs are not sent, replicator cannot resolve their sites.
+            return self
+
+        content_type, content_encoding = self._choose_wire_format()
+        headers = {"Content-Type": content_type}
+        payload = wire_format.encode_jobs(jobs_to_send, content_type)
+        if content_encoding is not None and \
+                len(payload) >= self._config.job_compress_min_bytes:
+            payload = wire_format.compress(payload, content_encoding)
+            headers["Content-Encoding"] = content_encoding
 
         jobs_url = url_with_resources(self._subscriber.endpoint, ["jobs"])
 
         _logger.info('POST on {}'.format(jobs_url))
-        _logger.debug('POST content {}'.format(payload))
+        _logger.debug('POST {} jobs, {} bytes with headers {}'.format(
+            len(jobs_to_send), len(payload), headers))
 
         self._timer.start()
         try:
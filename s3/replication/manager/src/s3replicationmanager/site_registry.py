@@ -0,0 +1,222 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# site_registry.py
+#
+# Source/target site endpoints and credentials used to prepare replication
+# jobs, loaded from config files once and reloaded when files change.
+
+import asyncio
+import logging
+import os
+import yaml
+
+from configparser import ConfigParser
+from s3replicationcommon.site_table import make_site_id
+
+_logger = logging.getLogger('s3replicationmanager')
+
+# Values of x-amz-meta-target-site.
+CORTX_S3_SITE = "cortxs3"
+AWS_S3_SITE = "awss3"
+
+
+def _site_config_path(conf_path, file_name):
+    """Returns ~/.cortxs3/<file_name> if present, else one from source."""
+    file_path = os.path.join(conf_path, file_name)
+    if not os.path.isfile(file_path):
+        file_path = os.path.join(
+            os.path.dirname(__file__), '..', 'config', file_name)
+    return file_path
+
+
+def _mtime(file_path):
+    """Returns modification time of file, None if file is missing."""
+    try:
+        return os.stat(file_path).st_mtime
+    except OSError:
+        return None
+
+
+class SiteRegistry:
+    """Sites keyed by x-amz-meta-target-site.
+
+    Each site is a dict with endpoint, service_name, region, access_key,
+    secret_key and optionally admin_endpoint. Config files are read only
+    in load(), so lookups are plain dict accesses. A site whose files are
+    missing or invalid is left out of registry.
+
+    Each site also has a site_id, which changes when site config changes.
+    Jobs refer to sites by site_id, and sites that were replaced on reload
+    remain available by site_id only while queued or in progress jobs refer
+    to them, so replaced credentials are not kept longer than needed.
+    """
+
+    def __init__(self, jobs=None):
+        """Initialise.
+
+        Args
+        -----
+            jobs (Jobs, optional): Jobs which may refer to replaced sites.
+        """
+        self._jobs = jobs
+        self._conf_path = os.path.join(os.path.expanduser('~'), '.cortxs3')
+        self._aws_creds_path = os.path.join(
+            os.path.expanduser('~'), '.aws', 'credentials')
+        self._sites = {}
+        self._sites_by_id = {}
+        self._files_signature = None
+        self._watch_task = None
+
+    def _file_paths(self):
+        return [
+            _site_config_path(self._conf_path, "cortx_s3.yaml"),
+            _site_config_path(self._conf_path, "aws_s3.yaml"),
+            # File with credentials. ~/.cortxs3/credentials.yaml
+            os.path.join(self._conf_path, 'credentials.yaml'),
+            # For AWS target. File with credentials. ~/.aws/credentials
+            self._aws_creds_path
+        ]
+
+    def _get_files_signature(self):
+        return tuple((file_path, _mtime(file_path))
+                     for file_path in self._file_paths())
+
+    def _load_cortx_s3(self):
+        cortx_s3_path = _site_config_path(self._conf_path, "cortx_s3.yaml")
+        with open(cortx_s3_path, 'r') as cortx_s3_f:
+            cortx_s3 = yaml.safe_load(cortx_s3_f)
+
+        cortx_creds_path = os.path.join(self._conf_path, 'credentials.yaml')
+        with open(cortx_creds_path, 'r') as cred_config:
+            cortx_credentials = yaml.safe_load(cred_config)
+
+        site = {
+            "endpoint": cortx_s3["endpoint"],
+            "service_name": cortx_s3["s3_service_name"],
+            "region": cortx_s3["s3_region"],
+            "access_key": cortx_credentials["access_key"],
+            "secret_key": cortx_credentials["secret_key"]
+        }
+        if "admin_endpoint" in cortx_s3:
+            site["admin_endpoint"] = cortx_s3["admin_endpoint"]
+        return site
+
+    def _load_aws_s3(self):
+        aws_s3_path = _site_config_path(self._conf_path, "aws_s3.yaml")
+        with open(aws_s3_path, 'r') as aws_s3_f:
+            aws_s3 = yaml.safe_load(aws_s3_f)
+
+        aws_s3_credentials = ConfigParser()
+        aws_s3_credentials.read(self._aws_creds_path)
+
+        return {
+            "endpoint": aws_s3["endpoint"],
+            "service_name": aws_s3["s3_service_name"],
+            "region": aws_s3["s3_region"],
+            "access_key": aws_s3_credentials["default"]["aws_access_key_id"],
+            "secret_key":
+                aws_s3_credentials["default"]["aws_secret_access_key"]
+        }
+
+    def _get_pending_site_ids(self):
+        """Returns site_ids referred by jobs not yet completed."""
+        site_ids = set()
+        if self._jobs is None:
+            return site_ids
+        for state, job in self._jobs.iter_jobs_by_state():
+            if state == "completed":
+                # Completed jobs are listed last.
+                break
+            site_ids.add(job.get_source_site_id())
+            site_ids.add(job.get_target_site_id())
+        return site_ids
+
+    def load(self):
+        """(Re)loads all sites from config files.
+
+        Returns
+        -------
+            SiteRegistry: self, with sites that could be loaded.
+        """
+        self._files_signature = self._get_files_signature()
+
+        sites = {}
+        sites_by_id = {}
+        for site_name, load_site in [(CORTX_S3_SITE, self._load_cortx_s3),
+                                     (AWS_S3_SITE, self._load_aws_s3)]:
+            try:
+                site = load_site()
+                site["site_id"] = make_site_id(site_name, site)
+                sites[site_name] = site
+                sites_by_id[site["site_id"]] = site
+            except (OSError, KeyError, TypeError, yaml.YAMLError) as e:
+                _logger.error(
+                    "Failed to load site {} config, {}: {}".format(
+                        site_name, type(e).__name__, e))
+        # Replaced sites are kept only for jobs still referring to them.
+        for site_id in self._get_pending_site_ids():
+            if site_id not in sites_by_id and site_id in self._sites_by_id:
+                sites_by_id[site_id] = self._sites_by_id[site_id]
+        # Swap whole dicts, so lookups never see a partial load.
+        self._sites = sites
+        self._sites_by_id = sites_by_id
+        _logger.info("Loaded sites: {}".format(list(sites.keys())))
+        return self
+
+    def reload_if_changed(self):
+        """Reloads sites if any config file was modified, added or removed.
+
+        Returns
+        -------
+            bool: True if reloaded.
+        """
+        if self._get_files_signature() == self._files_signature:
+            return False
+        _logger.info("Site config files changed, reloading.")
+        self.load()
+        return True
+
+    def get_site(self, site_name):
+        """Returns site dict for x-amz-meta-target-site, None if unknown."""
+        return self._sites.get(site_name)
+
+    def get_source_site(self):
+        """Returns site from where objects are replicated."""
+        return self._sites.get(CORTX_S3_SITE)
+
+    def get_site_by_id(self, site_id):
+        """Returns site dict for site_id, None if unknown."""
+        return self._sites_by_id.get(site_id)
+
+    async def _watch(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_if_changed()
+
+    def start_watch(self, interval):
+        """Check config files for changes every interval secs."""
+        if self._watch_task is None:
+            self._watch_task = asyncio.ensure_future(self._watch(interval))
+
+    def stop_watch(self):
+        """Stop checking config files for changes."""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
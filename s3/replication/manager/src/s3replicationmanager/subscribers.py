@@ -21,15 +21,28 @@ import aiohttp
 import json
 import uuid
 from collections import OrderedDict
+from s3replicationcommon.wire_format import IDENTITY
+from s3replicationcommon.wire_format import JSON
 
 
 class Subscriber:
-    def __init__(self, sub_obj):
+    def __init__(self, sub_obj, capacity_listener=None):
         """Initialise Subscriber object."""
         self.id = str(uuid.uuid4())
         self.endpoint = sub_obj["endpoint"]
         self.prefetch_count = int(sub_obj["prefetch_count"])
+        # Job batch formats subscriber can decode, older subscribers only
+        # accept uncompressed json.
+        self.content_types = sub_obj.get("content_types", [JSON])
+        self.content_encodings = sub_obj.get("content_encodings", [IDENTITY])
+        # Concurrency budget per size class of job, reported for
+        # information only, dispatch is bounded by prefetch_count.
+        self.capacity = sub_obj.get("capacity", {})
         self._jobs_sent_count = 0
+        # Called when subscriber can accept more jobs.
+        self._capacity_listener = capacity_listener
+        # Sites registered with subscriber, jobs refer to them by site_id.
+        self.registered_site_ids = set()
         self.client_session = aiohttp.ClientSession()
 
     async def close(self):
@@ -39,8 +52,10 @@ class Subscriber:
         return {
             "id": self.id,
             "endpoint": self.endpoint,
-            "prefetch_count": self.prefetch_count
-
+            "prefetch_count": self.prefetch_count,
+            "content_types": self.content_types,
+            "content_encodings": self.content_encodings,
+            "capacity": self.capacity
         }
 
     def pending_capacity(self):
@@ -80,6 +95,8 @@ class Subscriber:
             return -1
         else:
             self._jobs_sent_count -= count
+            if count > 0 and self._capacity_listener is not None:
+                self._capacity_listener()
             return 0
 
 
@@ -102,6 +119,11 @@ class Subscribers(OrderedDict):
         # E.g. : subscriber = {'id':'some-uuid','foo':'bar'}
         # subscribers = {some-uuid': Subscriber(subscriber), ...}
         super(Subscribers, self).__init__()
+        self._capacity_listener = None
+
+    def set_capacity_listener(self, listener):
+        """Register callable invoked when subscribers can take more jobs."""
+        self._capacity_listener = listener
 
     def count(self):
         """Returns total subscribers in collection.
@@ -114,10 +136,15 @@ class Subscribers(OrderedDict):
 
     def add_subscriber(self, subscriber):
         """Adds subscriber to the subscribers dict."""
-        subscriber = Subscriber(subscriber)
+        subscriber = Subscriber(subscriber, self._notify_capacity)
         self[subscriber.id] = subscriber
+        self._notify_capacity()
         return subscriber
 
+    def _notify_capacity(self):
+        if self._capacity_listener is not None:
+            self._capacity_listener()
+
     def get_subscriber(self, subscriber_id):
         """Gets subscriber with given id."""
         subscriber = self.get(subscriber_id, None)
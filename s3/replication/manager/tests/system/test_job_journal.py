@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# Job journal tests, run without replication manager or S3.
+
+import asyncio
+import os
+import shutil
+
+from s3replicationcommon.job import JobState
+from s3replicationcommon.jobs import Jobs
+from s3replicationcommon.templates import replication_job_template
+from s3replicationmanager.job_journal import FileJournalBackend
+from s3replicationmanager.job_journal import JobJournal
+
+# Large enough that tests control when snapshots are written.
+SNAPSHOT_RECORDS = 100000
+
+
+class SiteRegistryStub:
+    """Knows only given site ids."""
+
+    def __init__(self, site_ids):
+        self._site_ids = site_ids
+
+    def get_site_by_id(self, site_id):
+        if site_id in self._site_ids:
+            return {"id": site_id}
+        return None
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def _job_record(index, source_site_id="source"):
+    job_record = replication_job_template()
+    job_record["replication-id"] = "replication-{}".format(index)
+    job_record["source"]["site_id"] = source_site_id
+    job_record["target"]["site_id"] = "target"
+    return job_record
+
+
+def _open_journal(logger, directory, site_registry=None):
+    """Returns (jobs, journal) replayed from directory."""
+    jobs = Jobs(logger, "all-jobs")
+    journal = JobJournal(
+        FileJournalBackend(directory), 10, SNAPSHOT_RECORDS)
+    journal.replay(jobs, site_registry)
+    return jobs, journal
+
+
+def _job_states(jobs):
+    return sorted((job.get_replication_id(), state, str(job.get_state()))
+                  for state, job in jobs.iter_jobs_by_state())
+
+
+async def _record_jobs(logger, directory):
+    """Journals jobs in each state, returns their job ids."""
+    jobs, journal = _open_journal(logger, directory)
+    journal.start()
+    job_ids = {}
+    for index in range(6):
+        job = jobs.add_job_using_json(_job_record(index))
+        job_ids[job.get_replication_id()] = job.get_job_id()
+
+    jobs.move_to_inprogress("replication-1")
+    jobs.move_to_inprogress("replication-2")
+    jobs.move_to_pause("replication-2")
+    jobs.move_to_inprogress("replication-3")
+    jobs.get_job("replication-3").mark_completed()
+    jobs.move_to_complete("replication-3")
+    jobs.move_to_inprogress("replication-4")
+    jobs.get_job("replication-4").mark_failed()
+    jobs.move_to_complete("replication-4")
+    jobs.remove_job_by_job_id(job_ids.pop("replication-5"))
+
+    await journal.commit()
+    await journal.close()
+    return job_ids
+
+
+# Jobs sent to subscribers (inprogress, paused) are queued again on replay.
+EXPECTED_STATES = [
+    ("replication-0", "queued", str(JobState.INITIAL)),
+    ("replication-1", "queued", str(JobState.INITIAL)),
+    ("replication-2", "queued", str(JobState.INITIAL)),
+    ("replication-3", "completed", str(JobState.COMPLETED)),
+    ("replication-4", "completed", str(JobState.FAILED))
+]
+
+
+def test_replay_round_trip(logger, tmp_path):
+    """Jobs are restored with their ids and states."""
+    directory = str(tmp_path)
+    job_ids = _run(_record_jobs(logger, directory))
+
+    async def replay():
+        jobs, journal = _open_journal(logger, directory)
+        journal.start()
+        await journal.close()
+        return jobs
+
+    jobs = _run(replay())
+    assert _job_states(jobs) == EXPECTED_STATES
+    for replication_id, job_id in job_ids.items():
+        assert jobs.get_job(replication_id).get_job_id() == job_id
+
+    # Snapshot written by first replay replays the same.
+    jobs = _run(replay())
+    assert _job_states(jobs) == EXPECTED_STATES
+
+
+def test_replay_fails_jobs_of_unknown_site(logger, tmp_path):
+    """Pending jobs of removed sites are completed as failed."""
+    directory = str(tmp_path)
+
+    async def record():
+        jobs, journal = _open_journal(logger, directory)
+        journal.start()
+        jobs.add_job_using_json(_job_record(0, "source"))
+        jobs.add_job_using_json(_job_record(1, "removed"))
+        jobs.move_to_inprogress("replication-1")
+        await journal.close()
+
+    async def replay():
+        jobs, journal = _open_journal(
+            logger, directory,
+            SiteRegistryStub({"source", "target"}))
+        journal.start()
+        await journal.close()
+        return jobs
+
+    _run(record())
+    jobs = _run(replay())
+    assert _job_states(jobs) == [
+        ("replication-0", "queued", str(JobState.INITIAL)),
+        ("replication-1", "completed", str(JobState.FAILED))
+    ]
+
+
+def test_replay_ignores_torn_last_record(logger, tmp_path):
+    """Partial record written at crash is dropped, earlier ones apply."""
+    directory = str(tmp_path)
+
+    async def record():
+        jobs, journal = _open_journal(logger, directory)
+        journal.start()
+        jobs.add_job_using_json(_job_record(0))
+        jobs.add_job_using_json(_job_record(1))
+        await journal.close()
+
+    _run(record())
+    journal_files = [name for name in os.listdir(directory)
+                     if name.startswith("journal.")]
+    assert len(journal_files) == 1
+    with open(os.path.join(directory, journal_files[0]), 'a') as journal_f:
+        journal_f.write('{"op": "move", "replication_id": "replica')
+
+    jobs, journal = _open_journal(logger, directory)
+    journal._backend.close()
+    assert _job_states(jobs) == [
+        ("replication-0", "queued", str(JobState.INITIAL)),
+        ("replication-1", "queued", str(JobState.INITIAL))
+    ]
+
+
+def test_replay_after_interrupted_snapshot(logger, tmp_path):
+    """Crash at any step of writing a snapshot loses no jobs."""
+    directory = str(tmp_path)
+    _run(_record_jobs(logger, directory))
+    snapshot_path = os.path.join(directory, FileJournalBackend.SNAPSHOT_FILE)
+
+    # Crash before new snapshot replaced old one.
+    with open(snapshot_path + ".tmp", 'w') as snapshot_f:
+        snapshot_f.write('{"generation": 99}\n{"op": "add", "job_')
+    jobs, journal = _open_journal(logger, directory)
+    journal._backend.close()
+    assert _job_states(jobs) == EXPECTED_STATES
+
+    # Crash after snapshot replaced old one, before old journal was
+    # removed. Old journal is covered by snapshot and must not be applied.
+    backend = FileJournalBackend(directory)
+    backend.load()
+    old_journal_path = backend._journal_path(backend._generation)
+    with open(old_journal_path, 'a') as journal_f:
+        journal_f.write('{"op": "remove", "job_id": "%s"}\n' %
+                        jobs.get_job("replication-0").get_job_id())
+    shutil.copy(old_journal_path, old_journal_path + ".saved")
+    backend.write_snapshot(
+        line for line in open(snapshot_path, 'r').readlines()[1:])
+    backend.close()
+    shutil.move(old_journal_path + ".saved", old_journal_path)
+
+    jobs, journal = _open_journal(logger, directory)
+    journal._backend.close()
+    assert _job_states(jobs) == EXPECTED_STATES
@@ -136,6 +136,35 @@ async def test_get_jobs(logger, test_config):
                 'GET job successful: http status: {}'.format(response.status))
 
 
+@pytest.mark.asyncio
+async def test_get_jobs_page(logger, test_config):
+    """GET jobs a page at a time, expected entry added in post."""
+    global global_valid_job_id
+    job_id = global_valid_job_id
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+                test_config['url'] + '/jobs?limit=1') as response:
+            assert response.status == 200
+            jobs_list = await response.json()
+            assert len(jobs_list) == 1
+            job = next(iter(jobs_list.values()))
+            assert job_id == job["job_id"]
+            after = response.headers['X-Next-After']
+
+        # Next page is empty, as single job is present.
+        async with session.get(
+                test_config['url'] + '/jobs?limit=1&after=' + after) \
+                as response:
+            assert response.status == 200
+            assert await response.json() == {}
+            assert 'X-Next-After' not in response.headers
+
+        async with session.get(
+                test_config['url'] + '/jobs?limit=0') as response:
+            assert response.status == 400
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "test_case_name, expected_http_status",
@@ -196,3 +225,88 @@ async def test_get_jobs_count(logger, test_config):
 
             logger.info(
                 'GET job successful: http status: {}'.format(response.status))
+
+
+@pytest.mark.asyncio
+async def test_post_jobs_batch(logger, test_config,
+                               fdmi_job):  # noqa: F811;
+    """Post batch of jobs, expect result per record."""
+    expected_http_status = 200
+    expected_record_status = [201, 400]
+
+    async with aiohttp.ClientSession() as session:
+        async with session.post(test_config['url'] + '/jobs:batch',
+                                json=[fdmi_job, {}]) as response:
+
+            logger.debug('HTTP Response: Status: {}'.format(response.status))
+
+            response_body = await response.json()
+            logger.debug('HTTP Response Body: {}'.format(response_body))
+
+            assert expected_http_status == response.status, \
+                "ERROR : Received http status : " + str(response.status) + \
+                "Expected http status :" + str(expected_http_status)
+
+            record_status = [result["status"]
+                             for result in response_body["results"]]
+            assert record_status == expected_record_status, \
+                "ERROR : Received record status : {}\n".format(
+                    record_status) + \
+                "Expected record status : {}".format(expected_record_status)
+
+            job_id = response_body["results"][0]["job_id"]
+
+        # Remove the added job.
+        async with session.delete(
+                test_config['url'] + '/jobs/' + job_id) as response:
+            assert response.status == 204, \
+                "ERROR : Failed to delete job_id = {}".format(job_id)
+
+            logger.info('POST jobs batch successful.')
+
+
+@pytest.mark.asyncio
+async def test_put_jobs_status(logger, test_config,
+                               fdmi_job):  # noqa: F811;
+    """Update status of many jobs, expect result per update."""
+    expected_http_status = 200
+    # Queued job is not in progress, unknown job and invalid update.
+    expected_update_status = [409, 404, 400]
+
+    async with aiohttp.ClientSession() as session:
+        async with session.post(test_config['url'] + '/jobs',
+                                json=fdmi_job) as response:
+            assert response.status == 201, \
+                "ERROR : Failed to add job, status {}".format(
+                    response.status)
+            job_id = (await response.json())["job_id"]
+
+        updates = [{"job_id": job_id, "status": "completed"},
+                   {"job_id": "unknown-job-id", "status": "completed"},
+                   {}]
+        async with session.put(test_config['url'] + '/jobs',
+                               json=updates) as response:
+
+            logger.debug('HTTP Response: Status: {}'.format(response.status))
+
+            response_body = await response.json()
+            logger.debug('HTTP Response Body: {}'.format(response_body))
+
+            assert expected_http_status == response.status, \
+                "ERROR : Received http status : " + str(response.status) + \
+                "Expected http status :" + str(expected_http_status)
+
+            update_status = [result["status"]
+                             for result in response_body["results"]]
+            assert update_status == expected_update_status, \
+                "ERROR : Received update status : {}\n".format(
+                    update_status) + \
+                "Expected update status : {}".format(expected_update_status)
+
+        # Remove the added job.
+        async with session.delete(
+                test_config['url'] + '/jobs/' + job_id) as response:
+            assert response.status == 204, \
+                "ERROR : Failed to delete job_id = {}".format(job_id)
+
+            logger.info('PUT jobs status successful.')
@@ -0,0 +1,168 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# ack_coalescer.py
+#
+# Batches job status updates (acks) sent to replication manager.
+
+import asyncio
+import logging
+
+_logger = logging.getLogger('s3replicator')
+
+# Secs to wait before resending updates which failed to send.
+RETRY_INTERVAL = 1
+
+# Responses to update of single job which resending would not change, e.g.
+# job unknown to manager or no longer in progress.
+FINAL_HTTP_STATUSES = (400, 404, 409)
+
+
+class AckCoalescer:
+    """Sends job status updates to replication manager in batches.
+
+    Updates are buffered by add() and a single flusher task sends them with
+    one PUT /jobs, as soon as max_batch_size updates are pending or at most
+    every flush_interval_ms. Updates which failed to send are retried after
+    RETRY_INTERVAL. Replication managers without bulk update are sent one
+    PUT /jobs/{job_id} per update, updates it rejects as unknown or no
+    longer in progress are dropped.
+    """
+
+    def __init__(self, replication_manager, max_batch_size,
+                 flush_interval_ms):
+        """Initialise."""
+        self._replication_manager = replication_manager
+        self._max_batch_size = max_batch_size
+        self._flush_interval = flush_interval_ms / 1000
+
+        self._pending = []
+        self._bulk_supported = True
+
+        self._wakeup_event = None
+        self._flusher = None
+        self._running = False
+
+    def add(self, job_id, status):
+        """Queues status update of job.
+
+        Args
+        -----
+            job_id (str): Job ID at the replication manager.
+            status (str): completed/failed/aborted.
+        """
+        self._pending.append({"job_id": job_id, "status": status})
+        if len(self._pending) >= self._max_batch_size and \
+                self._wakeup_event is not None:
+            self._wakeup_event.set()
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def _requeue(self, updates):
+        """Puts back updates which failed to send, ahead of newer ones.
+
+        An update is dropped if a newer status of same job was added while
+        it was being sent.
+        """
+        newer = set(update["job_id"] for update in self._pending)
+        self._pending[0:0] = [update for update in updates
+                              if update["job_id"] not in newer]
+
+    async def _send_each(self, updates):
+        """Sends updates one per job, returns updates to be retried."""
+        failed = []
+        for update in updates:
+            if await self._replication_manager.send_update(
+                    update["job_id"], update["status"]):
+                continue
+            if self._replication_manager.http_status in FINAL_HTTP_STATUSES:
+                _logger.warning("Dropping update {} of job_id {}, "
+                                "replication manager returned {}.".format(
+                                    update["status"], update["job_id"],
+                                    self._replication_manager.http_status))
+                continue
+            failed.append(update)
+        return failed
+
+    async def _flush(self):
+        """Sends pending updates, returns False if they are to be retried."""
+        while self._pending:
+            updates = self._pending[:self._max_batch_size]
+            del self._pending[:self._max_batch_size]
+
+            try:
+                if not self._bulk_supported:
+                    failed = await self._send_each(updates)
+                elif await self._replication_manager.send_updates(updates):
+                    failed = []
+                elif self._replication_manager.http_status == 405:
+                    _logger.info("Replication manager does not support bulk "
+                                 "job update, sending updates per job.")
+                    self._bulk_supported = False
+                    failed = await self._send_each(updates)
+                else:
+                    failed = updates
+            except Exception as e:
+                _logger.error("Failed to send job updates, {}: {}".format(
+                    type(e).__name__, e))
+                failed = updates
+
+            if failed:
+                # Keep order, retry on next flush.
+                _logger.error("Failed to send {} job updates, will retry.".
+                              format(len(failed)))
+                self._requeue(failed)
+                return False
+        return True
+
+    async def _run(self):
+        interval = self._flush_interval
+        while self._running:
+            try:
+                await asyncio.wait_for(self._wakeup_event.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup_event.clear()
+            try:
+                flushed = await self._flush()
+            except Exception as e:
+                _logger.error("Job update flush failed, {}: {}".format(
+                    type(e).__name__, e))
+                flushed = False
+            interval = self._flush_interval if flushed else RETRY_INTERVAL
+
+    def start(self):
+        """Starts background flushing."""
+        self._running = True
+        self._wakeup_event = asyncio.Event()
+        self._flusher = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        """Sends pending updates and stops background flushing."""
+        self._running = False
+        if self._wakeup_event is not None:
+            self._wakeup_event.set()
+        if self._flusher is not None:
+            await self._flusher
+            self._flusher = None
+        if not await self._flush():
+            _logger.error("Dropping {} job updates on shutdown.".format(
+                len(self._pending)))
+            self._pending = []
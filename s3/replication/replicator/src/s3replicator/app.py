@@ -17,17 +17,22 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 
-import asyncio
 import sys
 from aiohttp import web
 import logging
 from .config import Config
+from s3replicationcommon.buffer_pool import BufferPool
 from s3replicationcommon.log import setup_logger
 from s3replicationcommon.jobs import Jobs
+from s3replicationcommon.site_table import SiteTable
+from .ack_coalescer import AckCoalescer
+from .job_queue import JobWorkQueue, SizeClassBudget
+from .job_queue import LARGE, SMALL, TAG
 from .replicator_routes import routes
 from .replication_manager import ReplicationManager
 from .replication_managers import ReplicationManagers
 from .session_manager import close_all_sessions
+from .upload_checkpoints import UploadCheckpoints
 
 _logger = logging.getLogger('s3replicator')
 
@@ -38,13 +43,25 @@ async def on_startup(app):
     config = app["config"]
     managers_list = app['replication-managers']
 
+    app['job_queue'].start()
+    if app['upload_checkpoints'] is not None:
+        app['upload_checkpoints'].start_sweeper(app['sessions'])
+
     remote_endpoint = config.get_replication_manager_endpoint()
     replication_manager = ReplicationManager(remote_endpoint)
+    # Prefetch count only bounds jobs by count, size class budgets are
+    # enforced by job queue and reported for information.
+    job_queue = app['job_queue']
     connected = await replication_manager.subscribe(
-        config.get_replicator_endpoint(), config.max_replications)
+        config.get_replicator_endpoint(), job_queue.get_prefetch_count(),
+        job_queue.get_capacity())
     if connected:
         _logger.debug("Subscribed successfully for jobs...")
         managers_list[replication_manager.id] = replication_manager
+        app['ack_coalescer'] = AckCoalescer(
+            replication_manager, config.ack_batch_size,
+            config.ack_flush_interval_ms)
+        app['ack_coalescer'].start()
     else:
         await close_all_sessions(app)
         await replication_manager.close()
@@ -54,6 +71,12 @@ async def on_startup(app):
 
 async def on_shutdown(app):
     _logger.debug("Performing cleanup on shutdown...")
+    await app['job_queue'].close()
+    if app['upload_checkpoints'] is not None:
+        await app['upload_checkpoints'].close()
+    if app['ack_coalescer'] is not None:
+        # Send pending job status updates before closing sessions.
+        await app['ack_coalescer'].close()
     await close_all_sessions(app)
     await app['replication-managers'].close()
 
@@ -76,7 +99,8 @@ class ReplicatorApp:
         if self._config.job_cache_enabled:
             self._completed_jobs = Jobs(
                 self._logger, "completed-jobs",
-                self._config.job_cache_timeout_secs)
+                self._config.job_cache_timeout_secs,
+                self._config.job_cache_max_count)
         else:
             self._completed_jobs = Jobs(self._logger, "completed-jobs")
 
@@ -96,17 +120,53 @@ class ReplicatorApp:
         # "tgt.s3.seagate.com|access_key": aiohttp.ClientSession()}
         # See session_manager.py
         app["sessions"] = {}
+        # Limit on multipart parts in flight per target endpoint, shared
+        # across jobs. Example {"tgt.s3.seagate.com": asyncio.Semaphore(64)}
+        app["endpoint_semaphores"] = {}
+        # Adaptive chunk/part sizes per source endpoint.
+        # Example {"src.s3.seagate.com": AdaptiveChunkSizer()}
+        app["chunk_sizers"] = {}
         app["config"] = self._config
+        # Sites registered by replication manager, jobs refer to them by id.
+        app["site_table"] = SiteTable()
+        # Bounds data in flight, shared by all jobs.
+        # Buffer size fits the largest chunk size in use.
+        buffer_size = self._config.transfer_chunk_size_bytes
+        if self._config.adaptive_chunk_size:
+            buffer_size = max(buffer_size,
+                              self._config.max_transfer_chunk_size_bytes)
+        app["buffer_pool"] = BufferPool(
+            buffer_size, self._config.buffer_pool_count)
+
+        # Multipart uploads are resumed from checkpoints, when enabled.
+        app['upload_checkpoints'] = None
+        if self._config.upload_checkpoint_path:
+            app['upload_checkpoints'] = UploadCheckpoints(
+                self._config.upload_checkpoint_path,
+                self._config.upload_checkpoint_expiry_secs)
 
         # All scheduled jobs
         app['all_jobs'] = self._inprogress_jobs
         # completed = successfully completed, failed, or aborted and cached
         app['completed_jobs'] = self._completed_jobs
         app['replication-managers'] = self._replication_managers
-
-        # Throttle:  Allow only Max replications to run at a moment.
-        # Alternative design option is to use queued requests.
-        app['semaphore'] = asyncio.Semaphore(self._config.max_replications)
+        # Batches job status updates to replication manager, set once
+        # subscribed.
+        app['ack_coalescer'] = None
+
+        # Throttle: Accepted jobs wait in a bounded queue, and only max
+        # replications run at a moment, one per worker, within budgets of
+        # their size class.
+        budgets = {
+            TAG: SizeClassBudget(self._config.max_tag_replications),
+            SMALL: SizeClassBudget(self._config.max_small_replications,
+                                   self._config.max_small_bytes_in_flight),
+            LARGE: SizeClassBudget(self._config.max_large_replications,
+                                   self._config.max_large_bytes_in_flight)
+        }
+        app['job_queue'] = JobWorkQueue(
+            app, self._config.max_replications, self._config.max_queued_jobs,
+            budgets, self._config.large_object_threshold_bytes)
 
         # Setup application routes.
         app.add_routes(routes)
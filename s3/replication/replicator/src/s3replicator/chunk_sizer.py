@@ -0,0 +1,160 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import logging
+
+_logger = logging.getLogger('s3replicator')
+
+# Weight of latest sample in moving averages.
+EWMA_WEIGHT = 0.25
+
+# Part should take many round trips to transfer, so request overhead
+# stays small relative to data time.
+PART_SIZE_BDP_MULTIPLE = 16
+
+# Throughput samples averaged before sizes follow bandwidth delay product,
+# a single transfer is too noisy to size from.
+BDP_MIN_SAMPLES = 4
+
+
+def _round_to_power_of_2(value):
+    """Returns nearest power of 2 not below value."""
+    return 1 << max(0, int(value) - 1).bit_length()
+
+
+def _clamp(value, min_value, max_value):
+    return max(min_value, min(max_value, value))
+
+
+class AdaptiveChunkSizer:
+    """Tunes transfer chunk and part size for one S3 endpoint.
+
+    Chunk size tracks bandwidth delay product (throughput x RTT) measured
+    from completed transfers and HEAD round trips. Till BDP_MIN_SAMPLES
+    transfers are measured, chunk size grows additively on each successful
+    transfer, and any failed transfer halves chunk and part size (AIMD).
+    Sizes always stay within configured bounds.
+    """
+
+    def __init__(self, netloc, min_chunk_size, max_chunk_size,
+                 min_part_size, max_part_size, initial_chunk_size):
+        """Initialise."""
+        self._netloc = netloc
+        self._min_chunk_size = min_chunk_size
+        self._max_chunk_size = max_chunk_size
+        self._min_part_size = min_part_size
+        self._max_part_size = max_part_size
+
+        self._chunk_size = _clamp(
+            initial_chunk_size, min_chunk_size, max_chunk_size)
+        self._part_size = min_part_size
+
+        # Moving averages, bytes per sec and secs.
+        self._throughput = None
+        self._rtt = None
+        self._transfer_count = 0
+        self._failure_count = 0
+
+    def get_chunk_size(self):
+        """Returns chunk size in bytes for next transfer."""
+        return self._chunk_size
+
+    def get_part_size(self):
+        """Returns multipart part size in bytes for next transfer."""
+        return self._part_size
+
+    def record_rtt(self, rtt_ms):
+        """Record round trip time of a request without payload."""
+        if rtt_ms is None or rtt_ms <= 0:
+            return
+        rtt = rtt_ms / 1000
+        if self._rtt is None:
+            self._rtt = rtt
+        else:
+            self._rtt += EWMA_WEIGHT * (rtt - self._rtt)
+
+    def record_transfer(self, transferred_bytes, elapsed_ms, success):
+        """Record a completed transfer and adjust sizes.
+
+        Args
+        -----
+            transferred_bytes (int): Bytes moved by the transfer.
+            elapsed_ms (float): Time taken by the transfer.
+            success (bool): False if transfer failed.
+        """
+        if not success:
+            # Multiplicative decrease.
+            self._failure_count += 1
+            self._chunk_size = max(self._min_chunk_size,
+                                   self._chunk_size // 2)
+            self._part_size = max(self._min_part_size,
+                                  self._part_size // 2)
+            _logger.debug("Reduced chunk size to {} for {}".format(
+                self._chunk_size, self._netloc))
+            return
+
+        # Small transfers are dominated by request latency.
+        if elapsed_ms is None or elapsed_ms <= 0 or \
+                transferred_bytes < self._chunk_size:
+            return
+
+        self._transfer_count += 1
+        throughput = transferred_bytes * 1000 / elapsed_ms
+        if self._throughput is None:
+            self._throughput = throughput
+        else:
+            self._throughput += EWMA_WEIGHT * (throughput - self._throughput)
+
+        if self._rtt is None or self._transfer_count < BDP_MIN_SAMPLES:
+            # Additive increase till throughput and RTT are known.
+            self._chunk_size = min(self._max_chunk_size,
+                                   self._chunk_size + self._min_chunk_size)
+        else:
+            bdp = self._throughput * self._rtt
+            self._chunk_size = _clamp(
+                _round_to_power_of_2(bdp),
+                self._min_chunk_size, self._max_chunk_size)
+            self._part_size = _clamp(
+                _round_to_power_of_2(bdp * PART_SIZE_BDP_MULTIPLE),
+                self._min_part_size, self._max_part_size)
+        _logger.debug("Chunk size {}, part size {} for {}".format(
+            self._chunk_size, self._part_size, self._netloc))
+
+    def get_stats(self):
+        """Returns current sizes and measurements.
+
+        Returns
+        -------
+            dict: chunk/part size in bytes, throughput in bytes/sec,
+            rtt in ms and sample counts.
+        """
+        rtt_ms = None
+        if self._rtt is not None:
+            rtt_ms = round(self._rtt * 1000, 3)
+        throughput = None
+        if self._throughput is not None:
+            throughput = int(self._throughput)
+        return {
+            "chunk_size": self._chunk_size,
+            "part_size": self._part_size,
+            "throughput_bytes_per_sec": throughput,
+            "rtt_ms": rtt_ms,
+            "transfer_count": self._transfer_count,
+            "failure_count": self._failure_count
+        }
@@ -68,22 +68,70 @@ class Config:
 
             self.max_replications = \
                 config_props['transfer']["max_replications"]
+            self.max_queued_jobs = \
+                config_props['transfer']["max_queued_jobs"]
+            self.large_object_threshold_bytes = \
+                config_props['transfer']["large_object_threshold_bytes"]
+            self.max_small_replications = \
+                config_props['transfer']["max_small_replications"]
+            self.max_small_bytes_in_flight = \
+                config_props['transfer']["max_small_bytes_in_flight"]
+            self.max_large_replications = \
+                config_props['transfer']["max_large_replications"]
+            self.max_large_bytes_in_flight = \
+                config_props['transfer']["max_large_bytes_in_flight"]
+            self.max_tag_replications = \
+                config_props['transfer']["max_tag_replications"]
             self.range_read_offset = \
                 config_props['transfer']["range_read_offset"]
             self.range_read_length = \
                 config_props['transfer']["range_read_length"]
             self.transfer_chunk_size_bytes = \
                 config_props['transfer']["transfer_chunk_size_bytes"]
+            self.parallel_read_threshold_bytes = \
+                config_props['transfer']["parallel_read_threshold_bytes"]
+            self.parallel_read_count = \
+                config_props['transfer']["parallel_read_count"]
+            self.max_parts_in_flight_per_job = \
+                config_props['transfer']["max_parts_in_flight_per_job"]
+            self.max_parts_in_flight_per_endpoint = \
+                config_props['transfer']["max_parts_in_flight_per_endpoint"]
             self.max_connections_per_s3_session = \
                 config_props['transfer']['max_connections_per_s3_session']
+            self.buffer_pool_count = \
+                config_props['transfer']['buffer_pool_count']
+            self.signed_payload = \
+                config_props['transfer']['signed_payload']
+            self.skip_identical_target = \
+                config_props['transfer']['skip_identical_target']
+            self.server_side_copy = \
+                config_props['transfer']['server_side_copy']
+            self.upload_checkpoint_path = \
+                config_props['transfer']['upload_checkpoint_path']
+            self.upload_checkpoint_expiry_secs = \
+                config_props['transfer']['upload_checkpoint_expiry_secs']
+            self.adaptive_chunk_size = \
+                config_props['transfer']['adaptive_chunk_size']
+            self.min_transfer_chunk_size_bytes = \
+                config_props['transfer']['min_transfer_chunk_size_bytes']
+            self.max_transfer_chunk_size_bytes = \
+                config_props['transfer']['max_transfer_chunk_size_bytes']
+            self.min_part_size_bytes = \
+                config_props['transfer']['min_part_size_bytes']
+            self.max_part_size_bytes = \
+                config_props['transfer']['max_part_size_bytes']
 
             self.job_cache_enabled = config_props['jobs']['enable_cache']
             self.job_cache_timeout_secs = config_props['jobs']['cache_timeout']
+            self.job_cache_max_count = config_props['jobs']['cache_max_count']
 
             self.manager_host = config_props['manager']['host']
             self.manager_port = config_props['manager']['port']
             self.manager_ssl = config_props['manager']['ssl']
             self.manager_service_name = config_props['manager']['service_name']
+            self.ack_batch_size = config_props['manager']['ack_batch_size']
+            self.ack_flush_interval_ms = \
+                config_props['manager']['ack_flush_interval_ms']
         return self
 
     def get_replicator_endpoint(self):
@@ -112,12 +160,56 @@ class Config:
 
             logger.info("transfer_chunk_size_bytes: {}".format(
                 self.transfer_chunk_size_bytes))
+            logger.info("signed_payload: {}".format(self.signed_payload))
+            logger.info("skip_identical_target: {}".format(
+                self.skip_identical_target))
+            logger.info("server_side_copy: {}".format(self.server_side_copy))
+            logger.info("upload_checkpoint_path: {}".format(
+                self.upload_checkpoint_path))
+            logger.info("upload_checkpoint_expiry_secs: {}".format(
+                self.upload_checkpoint_expiry_secs))
+            logger.info("adaptive_chunk_size: {}".format(
+                self.adaptive_chunk_size))
+            logger.info("min_transfer_chunk_size_bytes: {}".format(
+                self.min_transfer_chunk_size_bytes))
+            logger.info("max_transfer_chunk_size_bytes: {}".format(
+                self.max_transfer_chunk_size_bytes))
+            logger.info("min_part_size_bytes: {}".format(
+                self.min_part_size_bytes))
+            logger.info("max_part_size_bytes: {}".format(
+                self.max_part_size_bytes))
+            logger.info("parallel_read_threshold_bytes: {}".format(
+                self.parallel_read_threshold_bytes))
+            logger.info("parallel_read_count: {}".format(
+                self.parallel_read_count))
+            logger.info("max_parts_in_flight_per_job: {}".format(
+                self.max_parts_in_flight_per_job))
+            logger.info("max_parts_in_flight_per_endpoint: {}".format(
+                self.max_parts_in_flight_per_endpoint))
             logger.info("max_replications: {}".format(self.max_replications))
+            logger.info("max_queued_jobs: {}".format(self.max_queued_jobs))
+            logger.info("large_object_threshold_bytes: {}".format(
+                self.large_object_threshold_bytes))
+            logger.info("max_small_replications: {}".format(
+                self.max_small_replications))
+            logger.info("max_small_bytes_in_flight: {}".format(
+                self.max_small_bytes_in_flight))
+            logger.info("max_large_replications: {}".format(
+                self.max_large_replications))
+            logger.info("max_large_bytes_in_flight: {}".format(
+                self.max_large_bytes_in_flight))
+            logger.info("max_tag_replications: {}".format(
+                self.max_tag_replications))
             logger.info("max_connections_per_s3_session: {}".format(
                 self.max_connections_per_s3_session))
+            logger.info("buffer_pool_count: {}".format(
+                self.buffer_pool_count))
 
             logger.info("manager_host: {}".format(self.manager_host))
             logger.info("manager_port: {}".format(self.manager_port))
             logger.info("manager_ssl: {}".format(self.manager_ssl))
             logger.info("manager_service_name: {}".format(
                 self.manager_service_name))
+            logger.info("ack_batch_size: {}".format(self.ack_batch_size))
+            logger.info("ack_flush_interval_ms: {}".format(
+                self.ack_flush_interval_ms))
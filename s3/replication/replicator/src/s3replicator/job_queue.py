@@ -0,0 +1,281 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# job_queue.py
+#
+# Bounded queue of accepted jobs, run by a fixed pool of workers within
+# concurrency budgets per size class of job.
+
+import asyncio
+import logging
+import time
+from collections import deque
+from s3replicationcommon.job import ReplicationJobType
+from .transfer_initiator import TransferInitiator
+
+_logger = logging.getLogger('s3replicator')
+
+# Size classes of jobs.
+TAG = "tag"
+SMALL = "small"
+LARGE = "large"
+
+
+def _get_object_size(job):
+    try:
+        return int(job.get_source_object_size())
+    except (TypeError, ValueError):
+        return 0
+
+
+class SizeClassBudget:
+    """Jobs of a size class which may run at once, by count and bytes."""
+
+    def __init__(self, max_jobs, max_bytes=None):
+        """Initialise.
+
+        Args
+        -----
+            max_jobs (int): Max jobs running at once.
+            max_bytes (int, optional): Max total object size of running
+            jobs, no limit when None. A larger object runs alone.
+        """
+        self.max_jobs = max_jobs
+        self.max_bytes = max_bytes
+        # (queued time, job, object size) in arrival order.
+        self.waiting = deque()
+        self.running = 0
+        self.bytes_in_flight = 0
+
+    def can_start(self, object_size):
+        if self.running >= self.max_jobs:
+            return False
+        if self.max_bytes is None or self.running == 0:
+            return True
+        return self.bytes_in_flight + object_size <= self.max_bytes
+
+    def get_capacity(self):
+        return {"max_jobs": self.max_jobs, "max_bytes": self.max_bytes}
+
+    def get_metrics(self):
+        metrics = self.get_capacity()
+        metrics.update({
+            "queued": len(self.waiting),
+            "running": self.running,
+            "bytes_in_flight": self.bytes_in_flight
+        })
+        return metrics
+
+
+class JobWorkQueue:
+    """Runs accepted jobs with worker_count workers.
+
+    At most max_queued jobs wait for a worker, so jobs held in memory are
+    bounded by configuration rather than by size of posted batches. Jobs
+    beyond that are not admitted, and are left for the replication manager
+    to send again.
+
+    Tag jobs, small object and large object jobs each run within their own
+    budget, so a few huge objects cannot hold all workers and small ones
+    are not held back behind them. Workers take jobs from size classes in
+    turn.
+    """
+
+    def __init__(self, app, worker_count, max_queued, budgets,
+                 large_object_threshold):
+        """Initialise.
+
+        Args
+        -----
+            app (web.Application): Replicator app.
+            worker_count (int): Max jobs running at once, across classes.
+            max_queued (int): Max jobs waiting to run.
+            budgets (dict): SizeClassBudget keyed by TAG, SMALL and LARGE.
+            large_object_threshold (int): Objects of this size or larger
+            are in LARGE size class.
+        """
+        self._app = app
+        self._worker_count = worker_count
+        self._max_queued = max_queued
+        self._budgets = budgets
+        self._size_classes = list(budgets.keys())
+        self._large_object_threshold = large_object_threshold
+
+        # Size class to take next job from.
+        self._next_class_index = 0
+        self._queued_count = 0
+        self._condition = None
+        self._workers = []
+        self._running = False
+        self._busy_workers = 0
+
+        self._peak_depth = 0
+        self._admitted_count = 0
+        self._rejected_count = 0
+        self._started_count = 0
+        self._total_wait_time = 0
+        self._max_wait_time = 0
+
+    def is_running(self):
+        return self._running
+
+    def free_slots(self):
+        """Returns count of jobs which can be admitted now."""
+        if not self._running:
+            return 0
+        return self._max_queued - self._queued_count
+
+    def reject(self, count):
+        """Accounts jobs which were not admitted."""
+        self._rejected_count += count
+
+    def get_prefetch_count(self):
+        """Returns count of jobs workers can run at once.
+
+        Bytes budgets are not reflected, jobs over budget wait in queue.
+        """
+        return min(self._worker_count,
+                   sum(budget.max_jobs for budget in self._budgets.values()))
+
+    def get_capacity(self):
+        """Returns budget of each size class."""
+        return {size_class: budget.get_capacity()
+                for size_class, budget in self._budgets.items()}
+
+    def _get_size_class(self, job, object_size):
+        if job.get_operation_type() == \
+                ReplicationJobType.OBJECT_TAGS_REPLICATION:
+            return TAG
+        if object_size >= self._large_object_threshold:
+            return LARGE
+        return SMALL
+
+    async def put(self, job):
+        """Queues job to run, caller checks free_slots() first."""
+        object_size = _get_object_size(job)
+        size_class = self._get_size_class(job, object_size)
+        if size_class == TAG:
+            # Only tags are transferred.
+            object_size = 0
+        self._budgets[size_class].waiting.append(
+            (time.monotonic(), job, object_size))
+        self._queued_count += 1
+        self._admitted_count += 1
+        self._peak_depth = max(self._peak_depth, self._queued_count)
+        async with self._condition:
+            self._condition.notify()
+
+    def _take_next(self):
+        """Returns (budget, queued time, job, object size) of next job to
+        run, None if no job can start within its budget.
+        """
+        all_jobs = self._app['all_jobs']
+        for offset in range(len(self._size_classes)):
+            index = (self._next_class_index + offset) % \
+                len(self._size_classes)
+            budget = self._budgets[self._size_classes[index]]
+            while budget.waiting and all_jobs.get_job_by_job_id(
+                    budget.waiting[0][1].get_job_id()) is None:
+                # Aborted while queued.
+                _, job, _ = budget.waiting.popleft()
+                self._queued_count -= 1
+                _logger.debug("Skipping removed job_id {}".format(
+                    job.get_job_id()))
+            if budget.waiting and budget.can_start(budget.waiting[0][2]):
+                queued_time, job, object_size = budget.waiting.popleft()
+                self._queued_count -= 1
+                budget.running += 1
+                budget.bytes_in_flight += object_size
+                self._next_class_index = (index + 1) % \
+                    len(self._size_classes)
+                return budget, queued_time, job, object_size
+        return None
+
+    async def _run_worker(self):
+        while True:
+            async with self._condition:
+                entry = self._take_next()
+                while entry is None:
+                    await self._condition.wait()
+                    entry = self._take_next()
+            budget, queued_time, job, object_size = entry
+
+            wait_time = time.monotonic() - queued_time
+            self._total_wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+            self._started_count += 1
+            self._busy_workers += 1
+            try:
+                await TransferInitiator.start(job, self._app)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                _logger.exception("Replication failed for job_id {}".format(
+                    job.get_job_id()))
+                await TransferInitiator.fail(job, self._app)
+            finally:
+                self._busy_workers -= 1
+                budget.running -= 1
+                budget.bytes_in_flight -= object_size
+
+            # Released budget may let waiting jobs start.
+            async with self._condition:
+                self._condition.notify_all()
+
+    def start(self):
+        """Starts workers."""
+        self._condition = asyncio.Condition()
+        self._workers = [asyncio.ensure_future(self._run_worker())
+                         for _ in range(self._worker_count)]
+        self._running = True
+
+    async def close(self):
+        """Stops admitting jobs and cancels queued and running ones."""
+        self._running = False
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def get_metrics(self):
+        """Returns queue depth, worker usage and queue wait times.
+
+        Returns
+        -------
+            dict: Wait times in ms, counts since start.
+        """
+        average_wait_time = 0
+        if self._started_count > 0:
+            average_wait_time = self._total_wait_time / self._started_count
+        return {
+            "depth": self._queued_count,
+            "peak_depth": self._peak_depth,
+            "max_queued": self._max_queued,
+            "worker_count": self._worker_count,
+            "busy_workers": self._busy_workers,
+            "admitted_count": self._admitted_count,
+            "rejected_count": self._rejected_count,
+            "started_count": self._started_count,
+            "avg_wait_time_ms": round(average_wait_time * 1000, 3),
+            "max_wait_time_ms": round(self._max_wait_time * 1000, 3),
+            "size_classes": {
+                size_class: budget.get_metrics()
+                for size_class, budget in self._budgets.items()}
+        }
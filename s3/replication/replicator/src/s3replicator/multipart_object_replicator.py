@@ -20,11 +20,10 @@
 import logging
 from s3replicationcommon.job import JobEvents
 from s3replicationcommon.s3_common import S3RequestState
-from s3replicationcommon.s3_get_object import S3AsyncGetObject
-from s3replicationcommon.s3_create_multipart_upload import S3AsyncCreateMultipartUpload
-from s3replicationcommon.s3_upload_part import S3AsyncUploadPart
-from s3replicationcommon.s3_complete_multipart_upload import S3AsyncCompleteMultipartUpload
 from s3replicationcommon.timer import Timer
+from .part_transfer import PartTransfer
+from .part_transfer import PartUploadScheduler
+from .upload_checkpoints import get_checkpoint_key
 
 _logger = logging.getLogger('s3replicator')
 
@@ -32,7 +31,10 @@ _logger = logging.getLogger('s3replicator')
 class MultipartObjectReplicator:
     def __init__(self, job, transfer_chunk_size_bytes,
                  source_session, target_session,
-                 part_count, part_length) -> None:
+                 part_count, part_length,
+                 max_parts_in_flight=1, endpoint_semaphore=None,
+                 source_etag=None, buffer_pool=None,
+                 upload_checkpoints=None) -> None:
         """Initialise."""
         self._transfer_chunk_size_bytes = transfer_chunk_size_bytes
         self._job_id = job.get_job_id()
@@ -41,6 +43,24 @@ class MultipartObjectReplicator:
         self._part_count = part_count
         self._part_length = part_length
 
+        # Start offset of each part within the source object.
+        self._part_offset = []
+        offset = 0
+        for length in self._part_length:
+            self._part_offset.append(offset)
+            offset += length
+
+        # Parts uploaded concurrently for this job, and limit shared
+        # across jobs writing to same target endpoint.
+        self._max_parts_in_flight = max_parts_in_flight
+        self._endpoint_semaphore = endpoint_semaphore
+
+        # ETag of source from HEAD, verified against ETag computed from
+        # parts sent, without reading source again.
+        self._source_etag = source_etag
+        # Pool of transfer buffers shared by all jobs.
+        self._buffer_pool = buffer_pool
+
         # A set of observers to watch for varius notifications.
         # To start with job completed (success/failure)
         self._observers = {}
@@ -53,64 +73,157 @@ class MultipartObjectReplicator:
         # Setup target site info
         self._s3_target_session = target_session
         self._target_bucket = job.get_target_bucket_name()
+        # Upload id and uploaded parts are checkpointed when set, and
+        # failed upload is kept at target to resume.
+        self._upload_checkpoints = upload_checkpoints
+        self._checkpoint_key = get_checkpoint_key(
+            target_session, self._target_bucket, self._source_object)
+        self._part_transfer = None
+        self._transfer_state = None
+        self._aborted = False
 
     def get_execution_time(self):
         """Return total time for Object replication."""
         return self._timer.elapsed_time_ms()
 
+    def get_transfer_state(self):
+        """Returns S3RequestState of transfer, None if not finished."""
+        return self._transfer_state
+
     def setup_observers(self, label, observer):
         self._observers[label] = observer
 
+    async def _resume_upload(self, part_transfer):
+        """Continue checkpointed upload of object, if any.
+
+        Returns
+        -------
+            dict: Part number to ETag of parts already at target, None when
+            target could not be checked.
+        """
+        checkpoint = await self._upload_checkpoints.load(self._checkpoint_key)
+        if checkpoint is None:
+            return {}
+
+        upload_id = checkpoint["upload_id"]
+        if checkpoint["source_etag"] != self._source_etag or \
+                checkpoint["part_length"] != self._part_length:
+            # Source object changed since upload was started.
+            _logger.info(
+                "Aborting stale upload {} for job_id {}".format(
+                    upload_id, self._job_id))
+            await part_transfer.abort(upload_id)
+            await self._upload_checkpoints.remove(self._checkpoint_key)
+            return {}
+
+        part_etags = {
+            part_no: (etag, self._part_length[part_no - 1])
+            for part_no, etag in checkpoint["parts"].items()
+            if 0 < part_no <= len(self._part_length)}
+        etag_dict = await part_transfer.resume(upload_id, part_etags)
+        if etag_dict is None:
+            return None
+        if part_transfer.get_upload_id() is None:
+            _logger.info(
+                "Upload {} no longer at target for job_id {}".format(
+                    upload_id, self._job_id))
+            await self._upload_checkpoints.remove(self._checkpoint_key)
+            return {}
+
+        _logger.info(
+            "Resuming upload {} for job_id {}, {} of {} parts at "
+            "target".format(upload_id, self._job_id, len(etag_dict),
+                            len(self._part_length)))
+        return etag_dict
+
+    async def _transfer_parts(self):
+        """Upload all parts concurrently within the in-flight window.
+
+        Returns
+        -------
+            S3RequestState: Final state of the transfer.
+        """
+        part_transfer = PartTransfer(
+            self._request_id,
+            self._s3_source_session, self._source_bucket,
+            self._source_object, int(self._object_size),
+            self._s3_target_session, self._target_bucket,
+            self._transfer_chunk_size_bytes, self._buffer_pool)
+        self._part_transfer = part_transfer
+        checkpoints = self._upload_checkpoints
+
+        etag_dict = {}
+        if checkpoints is not None:
+            etag_dict = await self._resume_upload(part_transfer)
+            if etag_dict is None:
+                return S3RequestState.FAILED
+
+        if part_transfer.get_upload_id() is None:
+            if not await part_transfer.create():
+                return S3RequestState.FAILED
+            if checkpoints is not None:
+                await checkpoints.start(
+                    self._checkpoint_key, self._s3_target_session,
+                    self._target_bucket, self._source_object,
+                    part_transfer.get_upload_id(), self._source_etag,
+                    self._part_length)
+
+        async def transfer_part(part_no):
+            if self._aborted:
+                return None
+            _logger.debug("Part Number : {}, Part Length : {}".format(
+                part_no, self._part_length[part_no - 1]))
+            etag = await part_transfer.transfer_part(
+                part_no,
+                self._part_offset[part_no - 1],
+                self._part_length[part_no - 1])
+            if etag is not None and checkpoints is not None:
+                await checkpoints.add_part(
+                    self._checkpoint_key, part_no, etag)
+            return etag
+
+        scheduler = PartUploadScheduler(
+            self._request_id, self._max_parts_in_flight,
+            self._endpoint_semaphore)
+        part_numbers = [part_no
+                        for part_no in range(1, len(self._part_length) + 1)
+                        if part_no not in etag_dict]
+        uploaded_etag_dict = await scheduler.run(part_numbers, transfer_part)
+        if uploaded_etag_dict is None:
+            if checkpoints is not None and not self._aborted:
+                # Uploaded parts are kept, and reused when job is retried.
+                _logger.error(
+                    "Multipart upload failed for job_id {}, keeping upload "
+                    "{} to resume".format(
+                        self._job_id, part_transfer.get_upload_id()))
+                return S3RequestState.FAILED
+            # Failed part fails the whole upload, discard uploaded parts.
+            _logger.error(
+                "Aborting multipart upload for job_id {}".format(
+                    self._job_id))
+            await part_transfer.abort()
+            if self._aborted:
+                if checkpoints is not None:
+                    await checkpoints.remove(self._checkpoint_key)
+                return S3RequestState.ABORTED
+            return S3RequestState.FAILED
+        etag_dict.update(uploaded_etag_dict)
+
+        transfer_state = await part_transfer.complete(etag_dict)
+        if transfer_state == S3RequestState.COMPLETED and \
+                checkpoints is not None:
+            await checkpoints.remove(self._checkpoint_key)
+        return transfer_state
+
     async def start(self):
         # Start transfer
-        # Create multipart upload
-        self._obj_create = S3AsyncCreateMultipartUpload(self._s3_target_session, self._request_id,
-                                                        self._target_bucket, self._source_object)
-        await self._obj_create.create()
-
-        # Get the upload id
-        upload_id = self._obj_create.get_response_header("UploadId")
-
-        # Upload part
-        self._obj_upload = S3AsyncUploadPart(self._s3_target_session, self._request_id,
-                                             self._target_bucket,
-                                             self._source_object, upload_id)
-
-        self._start_bytes = 0
-        part_no = 0
-
-        for part in range(0, (len(self._part_length))):
-            part_no += 1
-            _logger.debug("Part Length : {}".format(self._part_length[part]))
-            _logger.debug("Part Number : {}".format(part_no))
-
-            self._object_source_reader = S3AsyncGetObject(
-                self._s3_source_session,
-                self._request_id,
-                self._source_bucket,
-                self._source_object,
-                int(self._object_size),
-                self._start_bytes, self._part_length[part])
-
-            self._timer.start()
-            await self._obj_upload.upload(self._object_source_reader, part_no, self._part_length[part])
-
-            self._timer.stop()
-            self._start_bytes = 0
-
-        # Get the ETag dict
-        e_dict = self._obj_upload.get_etag_dict()
-
-        # Complete multipart upload
-        self._obj_complete = S3AsyncCompleteMultipartUpload(self._s3_target_session, self._request_id,
-                                                            self._target_bucket,
-                                                            self._source_object,
-                                                            upload_id, e_dict)
-
-        await self._obj_complete.complete_upload()
-        _logger.info(
-            "Final ETag : {}".format(
-                self._obj_complete.get_final_etag()))
+        self._timer.start()
+        transfer_state = await self._transfer_parts()
+        self._timer.stop()
+        if transfer_state == S3RequestState.COMPLETED and \
+                not self._verify():
+            transfer_state = S3RequestState.FAILED
+        self._transfer_state = transfer_state
         _logger.info(
             "Replication completed in {}ms for job_id {}".format(
                 self._timer.elapsed_time_ms(), self._job_id))
@@ -119,39 +232,40 @@ class MultipartObjectReplicator:
         for label, observer in self._observers.items():
             _logger.debug(
                 "Notify completion to observer with label[{}]".format(label))
-            if self._obj_complete.get_state() == S3RequestState.PAUSED:
+            if transfer_state == S3RequestState.PAUSED:
                 await observer.notify(JobEvents.STOPPED, self._job_id)
-            elif self._obj_complete.get_state() == S3RequestState.ABORTED:
+            elif transfer_state == S3RequestState.ABORTED:
                 await observer.notify(JobEvents.ABORTED, self._job_id)
+            elif transfer_state == S3RequestState.FAILED:
+                # Job is sent again and resumes checkpointed upload.
+                await observer.notify(JobEvents.FAILED, self._job_id)
             else:
                 await observer.notify(JobEvents.COMPLETED, self._job_id)
 
-        # Validation of Source and Target object ETag should be done after
-        # completion of replication.
-        self._obj_reader = S3AsyncGetObject(
-                self._s3_source_session,
-                self._request_id,
-                self._source_bucket,
-                self._source_object,
-                int(self._object_size),
-                -1, -1)
-
-        reader_generator = self._obj_reader.fetch(
-                self._transfer_chunk_size_bytes)
-        async for _ in reader_generator:
-            pass
-
-        source_etag = self._obj_reader.get_etag()
-        target_etag = self._obj_complete.get_final_etag()
-        if source_etag == target_etag:
-            _logger.info(
-                "ETag matched for job_id {}".format(
-                self._job_id))
-        else:
-            _logger.error(
-                "ETag not matched for job_id {}".format(
-                self._job_id))
+    def _verify(self):
+        """Verify target ETag with composite MD5 of parts sent.
 
+        Returns
+        -------
+            bool: True when source, sent and target ETags match.
+        """
+        local_etag = self._part_transfer.get_composite_md5()
+        target_etag = self._part_transfer.get_final_etag()
+        source_etag = None
+        if self._source_etag is not None:
+            source_etag = self._source_etag.strip("\"")
+
+        _logger.info(
+            "ETag : Source {}, Sent {} and Target {}".format(
+                source_etag, local_etag, target_etag))
+        if target_etag == local_etag and \
+                source_etag in (None, local_etag):
+            _logger.info(
+                "ETag matched for job_id {}".format(self._job_id))
+            return True
+        _logger.error(
+            "ETag not matched for job_id {}".format(self._job_id))
+        return False
 
     def pause(self):
         """Pause the running object tranfer."""
@@ -162,5 +276,7 @@ class MultipartObjectReplicator:
         pass  # XXX
 
     def abort(self):
-        """Abort the running object tranfer."""
-        self._object_writer.abort()
+        """Abort the running object tranfer, parts not started are skipped
+        and upload is aborted at target.
+        """
+        self._aborted = True
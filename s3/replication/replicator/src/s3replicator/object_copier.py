@@ -0,0 +1,231 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import logging
+from s3replicationcommon.s3_common import MAX_COPY_SIZE_BYTES
+from s3replicationcommon.s3_common import MAX_PART_COUNT
+from s3replicationcommon.s3_common import MIN_PART_SIZE_BYTES
+from s3replicationcommon.s3_common import REPLICATION_SOURCE_ETAG_META
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_copy_object import S3AsyncCopyObject
+from s3replicationcommon.timer import Timer
+from .part_transfer import PartTransfer
+from .part_transfer import PartUploadScheduler
+
+_logger = logging.getLogger('s3replicator')
+
+
+def is_same_endpoint(source_site, target_site):
+    """Returns True when source and target are served by same S3."""
+    return source_site.get_netloc() == target_site.get_netloc()
+
+
+class ObjectCopier:
+    """Replicates object within one S3 endpoint with server side copy.
+
+    Objects up to copy_part_threshold_bytes are copied with CopyObject, and
+    larger ones with concurrent UploadPartCopy into a multipart upload, so
+    object data is never read by replicator. Multipart source objects are
+    copied part for part, which keeps their ETag at target.
+    """
+
+    def __init__(self, job, source_session, target_session, source_etag,
+                 part_length=None, copy_part_threshold_bytes=None,
+                 parallel_copy_count=1, endpoint_semaphore=None,
+                 record_source_etag=False) -> None:
+        """Initialise.
+
+        Args
+        -----
+            job (Job): Job to replicate.
+            source_session (S3Session): Session for source S3.
+            target_session (S3Session): Session for target S3, used for
+            copy, so it must be allowed to read source object.
+            source_etag (str): ETag of source object from HEAD.
+            part_length (list[int], optional): Length of each part of
+            multipart source object.
+            copy_part_threshold_bytes (int, optional): Objects larger than
+            this are copied as parts.
+            parallel_copy_count (int, optional): Parts copied at once.
+            endpoint_semaphore (asyncio.Semaphore, optional): Limit on parts
+            in flight to endpoint, shared across jobs.
+            record_source_etag (bool, optional): Record source ETag in
+            metadata of target when its ETag will differ.
+        """
+        self._job_id = job.get_job_id()
+        self._request_id = self._job_id
+        self._timer = Timer()
+
+        self._source_bucket = job.get_source_bucket_name()
+        self._object_name = job.get_source_object_name()
+        self._object_size = int(job.get_source_object_size())
+        self._target_bucket = job.get_target_bucket_name()
+        self._source_etag = source_etag.strip("\"")
+
+        self._s3_source_session = source_session
+        self._s3_target_session = target_session
+
+        self._part_length = part_length
+        if copy_part_threshold_bytes is None:
+            copy_part_threshold_bytes = MAX_COPY_SIZE_BYTES
+        self._use_part_copy = part_length is not None or \
+            self._object_size > min(copy_part_threshold_bytes,
+                                    MAX_COPY_SIZE_BYTES)
+        self._parallel_copy_count = parallel_copy_count
+        self._endpoint_semaphore = endpoint_semaphore
+        self._record_source_etag = record_source_etag
+
+        self._part_transfer = None
+        self._transfer_state = None
+        self._aborted = False
+
+    def get_execution_time(self):
+        """Return total time for Object copy."""
+        return self._timer.elapsed_time_ms()
+
+    def get_transfer_state(self):
+        """Returns S3RequestState of copy, None if not finished."""
+        return self._transfer_state
+
+    def _get_copy_ranges(self):
+        """Returns (offset, length) byte ranges, one per part."""
+        if self._part_length is not None:
+            lengths = self._part_length
+        else:
+            part_size = max(-(-self._object_size // self._parallel_copy_count),
+                            MIN_PART_SIZE_BYTES,
+                            -(-self._object_size // MAX_PART_COUNT))
+            part_size = min(part_size, MAX_COPY_SIZE_BYTES)
+            lengths = [min(part_size, self._object_size - offset)
+                       for offset in range(0, self._object_size, part_size)]
+
+        copy_ranges = []
+        offset = 0
+        for length in lengths:
+            copy_ranges.append((offset, length))
+            offset += length
+        return copy_ranges
+
+    async def _copy_object(self):
+        """Copy object with single CopyObject.
+
+        Returns
+        -------
+            S3RequestState: Final state of the copy.
+        """
+        obj_copy = S3AsyncCopyObject(
+            self._s3_target_session, self._request_id,
+            self._source_bucket, self._object_name,
+            self._target_bucket, self._object_name)
+        await obj_copy.copy()
+        if obj_copy.get_state() != S3RequestState.COMPLETED:
+            return S3RequestState.FAILED
+
+        _logger.info("ETag : Source {} and Target {}".format(
+            self._source_etag, obj_copy.get_etag()))
+        if obj_copy.get_etag() != self._source_etag:
+            _logger.error(
+                "ETag not matched for job_id {}".format(self._job_id))
+            return S3RequestState.FAILED
+        return S3RequestState.COMPLETED
+
+    async def _copy_parts(self):
+        """Copy object as concurrent UploadPartCopy into multipart upload.
+
+        Returns
+        -------
+            S3RequestState: Final state of the copy.
+        """
+        metadata = None
+        if self._record_source_etag and self._part_length is None:
+            # Multipart ETag at target differs from source ETag.
+            metadata = {REPLICATION_SOURCE_ETAG_META: self._source_etag}
+        part_transfer = PartTransfer(
+            self._request_id,
+            self._s3_source_session, self._source_bucket,
+            self._object_name, self._object_size,
+            self._s3_target_session, self._target_bucket,
+            None, metadata=metadata)
+        self._part_transfer = part_transfer
+        if not await part_transfer.create():
+            return S3RequestState.FAILED
+
+        copy_ranges = self._get_copy_ranges()
+        _logger.info(
+            "Copying {} bytes as {} parts for job_id {}".format(
+                self._object_size, len(copy_ranges), self._job_id))
+
+        async def copy_part(part_no):
+            if self._aborted:
+                return None
+            offset, length = copy_ranges[part_no - 1]
+            return await part_transfer.copy_part(part_no, offset, length)
+
+        scheduler = PartUploadScheduler(
+            self._request_id, self._parallel_copy_count,
+            self._endpoint_semaphore)
+        etag_dict = await scheduler.run(
+            range(1, len(copy_ranges) + 1), copy_part)
+        if etag_dict is None:
+            await part_transfer.abort()
+            if self._aborted:
+                return S3RequestState.ABORTED
+            return S3RequestState.FAILED
+
+        transfer_state = await part_transfer.complete(etag_dict)
+        if transfer_state == S3RequestState.COMPLETED and \
+                self._part_length is not None and \
+                part_transfer.get_final_etag() != self._source_etag:
+            _logger.error(
+                "ETag not matched for job_id {}".format(self._job_id))
+            return S3RequestState.FAILED
+        return transfer_state
+
+    async def start(self):
+        """Copy the object.
+
+        Returns
+        -------
+            S3RequestState: COMPLETED, ABORTED, or FAILED when the copy is
+            not possible, e.g. target credentials cannot read source, or
+            target ETag does not match source.
+        """
+        self._timer.start()
+        if self._use_part_copy:
+            transfer_state = await self._copy_parts()
+        else:
+            transfer_state = await self._copy_object()
+        self._timer.stop()
+        self._transfer_state = transfer_state
+        _logger.info(
+            "Server side copy {} in {}ms for job_id {}".format(
+                transfer_state, self._timer.elapsed_time_ms(), self._job_id))
+        return transfer_state
+
+    def pause(self):
+        """Pause the running object copy."""
+        pass  # XXX
+
+    def resume(self):
+        """Resume the running object copy."""
+        pass  # XXX
+
+    def abort(self):
+        """Abort the running object copy, parts not started are skipped."""
+        self._aborted = True
@@ -19,18 +19,29 @@
 
 import logging
 from s3replicationcommon.job import JobEvents
+from s3replicationcommon.s3_checksum_reader import S3ChecksumReader
+from s3replicationcommon.s3_common import MAX_PART_COUNT
+from s3replicationcommon.s3_common import MAX_PART_SIZE_BYTES
+from s3replicationcommon.s3_common import MIN_PART_SIZE_BYTES
+from s3replicationcommon.s3_common import REPLICATION_SOURCE_ETAG_META
 from s3replicationcommon.s3_common import S3RequestState
 from s3replicationcommon.s3_get_object import S3AsyncGetObject
 from s3replicationcommon.s3_put_object import S3AsyncPutObject
 from s3replicationcommon.s3_update_replication_status import S3AsyncUpdatereplicationStatus
 from s3replicationcommon.timer import Timer
+from .part_transfer import PartTransfer
+from .part_transfer import PartUploadScheduler
 
 _logger = logging.getLogger('s3replicator')
 
 
 class ObjectReplicator:
     def __init__(self, job, transfer_chunk_size_bytes, range_read_offset,
-                 range_read_length, source_session, target_session) -> None:
+                 range_read_length, source_session, target_session,
+                 parallel_read_threshold_bytes=None,
+                 parallel_read_count=1, endpoint_semaphore=None,
+                 buffer_pool=None,
+                 part_size=None, source_etag=None) -> None:
         """Initialise."""
         self._transfer_chunk_size_bytes = transfer_chunk_size_bytes
         self._job_id = job.get_job_id()
@@ -39,20 +50,47 @@ class ObjectReplicator:
         self._range_read_offset = range_read_offset
         self._range_read_length = range_read_length
 
+        self._source_bucket = job.get_source_bucket_name()
+        self._object_name = job.get_source_object_name()
+        self._object_size = int(job.get_source_object_size())
+        self._target_bucket = job.get_target_bucket_name()
+
+        # Objects above threshold are read as parallel byte ranges and
+        # written to target as multipart upload, one part per range.
+        self._parallel_read_count = parallel_read_count
+        # Preferred part size for ranged transfer, None to split object in
+        # parallel_read_count equal parts.
+        self._part_size = part_size
+        # Recorded on target when its ETag will differ from source ETag.
+        self._source_etag = source_etag
+        self._transfer_state = None
+        # Shared limit on parts in flight to target endpoint.
+        self._endpoint_semaphore = endpoint_semaphore
+        # Pool of transfer buffers shared by all jobs.
+        self._buffer_pool = buffer_pool
+        self._part_transfer = None
+        self._use_ranged_transfer = \
+            parallel_read_threshold_bytes is not None and \
+            parallel_read_count > 1 and \
+            self._range_read_length < 0 and \
+            self._object_size > parallel_read_threshold_bytes
+
         # A set of observers to watch for varius notifications.
         # To start with job completed (success/failure)
         self._observers = {}
 
         self._s3_source_session = source_session
 
-        self._object_source_reader = S3AsyncGetObject(
-            self._s3_source_session,
-            self._request_id,
-            job.get_source_bucket_name(),
-            job.get_source_object_name(),
-            int(job.get_source_object_size()),
-            self._range_read_offset,
-            self._range_read_length)
+        self._object_source_reader = S3ChecksumReader(
+            S3AsyncGetObject(
+                self._s3_source_session,
+                self._request_id,
+                job.get_source_bucket_name(),
+                job.get_source_object_name(),
+                int(job.get_source_object_size()),
+                self._range_read_offset,
+                self._range_read_length,
+                self._buffer_pool))
 
         self._source_replication_status = S3AsyncUpdatereplicationStatus(
             self._s3_source_session,
@@ -71,28 +109,94 @@ class ObjectReplicator:
             job.get_source_object_name(),
             int(job.get_source_object_size()))
 
-        self._object_target_reader = S3AsyncGetObject(
-            self._s3_target_session,
-            self._request_id,
-            job.get_target_bucket_name(),
-            job.get_source_object_name(),
-            int(job.get_source_object_size()),
-            self._range_read_offset,
-            self._range_read_length)
-
     def get_execution_time(self):
         """Return total time for Object replication."""
         return self._timer.elapsed_time_ms()
 
+    def get_transfer_state(self):
+        """Returns S3RequestState of transfer, None if not finished."""
+        return self._transfer_state
+
     def setup_observers(self, label, observer):
         self._observers[label] = observer
 
+    def _get_read_ranges(self):
+        """Split object into (offset, length) byte ranges, one per part."""
+        part_size = -(-self._object_size // self._parallel_read_count)
+        if self._part_size is not None:
+            # Smaller parts when preferred, but never fewer parts than
+            # parallel reads.
+            part_size = min(part_size, self._part_size)
+        part_size = max(part_size, MIN_PART_SIZE_BYTES,
+                        -(-self._object_size // MAX_PART_COUNT))
+        # More parts than parallel reads when parts would be too large.
+        part_size = min(part_size, MAX_PART_SIZE_BYTES)
+
+        read_ranges = []
+        offset = 0
+        while offset < self._object_size:
+            length = min(part_size, self._object_size - offset)
+            read_ranges.append((offset, length))
+            offset += length
+        return read_ranges
+
+    async def _start_ranged_transfer(self):
+        """Replicate object as parallel ranged GETs into multipart upload.
+
+        Returns
+        -------
+            S3RequestState: Final state of the transfer.
+        """
+        # Multipart ETag at target differs from source ETag, so source ETag
+        # is recorded to recognise the object as identical later.
+        metadata = None
+        if self._source_etag is not None:
+            metadata = {REPLICATION_SOURCE_ETAG_META:
+                        self._source_etag.strip("\"")}
+        part_transfer = PartTransfer(
+            self._request_id,
+            self._s3_source_session, self._source_bucket,
+            self._object_name, self._object_size,
+            self._s3_target_session, self._target_bucket,
+            self._transfer_chunk_size_bytes, self._buffer_pool, metadata)
+        self._part_transfer = part_transfer
+        if not await part_transfer.create():
+            return S3RequestState.FAILED
+
+        read_ranges = self._get_read_ranges()
+        _logger.info(
+            "Replicating {} bytes as {} parallel ranges for job_id {}".format(
+                self._object_size, len(read_ranges), self._job_id))
+
+        async def transfer_part(part_no):
+            offset, length = read_ranges[part_no - 1]
+            return await part_transfer.transfer_part(part_no, offset, length)
+
+        scheduler = PartUploadScheduler(
+            self._request_id, self._parallel_read_count,
+            self._endpoint_semaphore)
+        etag_dict = await scheduler.run(
+            range(1, len(read_ranges) + 1), transfer_part)
+        if etag_dict is None:
+            await part_transfer.abort()
+            return S3RequestState.FAILED
+
+        return await part_transfer.complete(etag_dict)
+
     async def start(self):
         # Start transfer
         self._timer.start()
-        await self._object_writer.send(self._object_source_reader,
-                                       self._transfer_chunk_size_bytes)
+        if self._use_ranged_transfer:
+            transfer_state = await self._start_ranged_transfer()
+        else:
+            await self._object_writer.send(self._object_source_reader,
+                                           self._transfer_chunk_size_bytes)
+            transfer_state = self._object_writer.get_state()
         self._timer.stop()
+        if transfer_state == S3RequestState.COMPLETED and \
+                not self._verify():
+            transfer_state = S3RequestState.FAILED
+        self._transfer_state = transfer_state
         _logger.info(
             "Replication completed in {}ms for job_id {}".format(
                 self._timer.elapsed_time_ms(), self._job_id))
@@ -101,54 +205,66 @@ class ObjectReplicator:
         for label, observer in self._observers.items():
             _logger.debug(
                 "Notify completion to observer with label[{}]".format(label))
-            if self._object_writer.get_state() == S3RequestState.PAUSED:
+            if transfer_state == S3RequestState.PAUSED:
                 await observer.notify(JobEvents.STOPPED, self._job_id)
-            elif self._object_writer.get_state() == S3RequestState.ABORTED:
+            elif transfer_state == S3RequestState.ABORTED:
                 await observer.notify(JobEvents.ABORTED, self._job_id)
+            elif transfer_state == S3RequestState.FAILED:
+                await observer.notify(JobEvents.FAILED, self._job_id)
             else:
                 await observer.notify(JobEvents.COMPLETED, self._job_id)
 
-        if JobEvents.COMPLETED:
+        if transfer_state == S3RequestState.COMPLETED:
             await self._source_replication_status.update('COMPLETED')
 
-            source_etag = self._object_source_reader.get_etag()
+    def _verify(self):
+        """Verify size and ETag of target with checksums computed in flight.
+
+        Returns
+        -------
+            bool: True when target matches the data read from source.
+        """
+        if self._use_ranged_transfer:
+            # Ranged transfer yields multipart ETag at target, computed
+            # here from MD5 of each part sent.
+            target_size = self._part_transfer.get_transferred_bytes()
+            local_etag = self._part_transfer.get_composite_md5()
+            target_etag = self._part_transfer.get_final_etag()
+            source_etag = None
+        else:
+            target_size = self._object_source_reader.get_size()
+            local_etag = self._object_source_reader.get_md5()
             target_etag = self._object_writer.get_etag()
+            source_etag = None
+            if self._range_read_length < 0:
+                source_etag = self._object_source_reader.get_etag()
 
-            _logger.info(
-                "MD5 : Source {} and Target {}".format(
-                    source_etag, target_etag))
+        _logger.info(
+            "MD5 : Source {}, Sent {} and Target {}".format(
+                source_etag, local_etag, target_etag))
 
-            # check md5 of source and replicated objects at target
-            if source_etag == target_etag:
-                _logger.info("MD5 matched for job_id {}".format(self._job_id))
-            else:
-                _logger.error(
-                    "MD5 not matched for job_id {}".format(
-                        self._job_id))
-
-            # check content length of source and target objects
-            # [system-defined metadata]
-            reader_generator = self._object_target_reader.fetch(
-                self._transfer_chunk_size_bytes)
-            async for _ in reader_generator:
-                pass
-
-            source_content_length = self._object_source_reader.get_content_length()
-            target_content_length = self._object_target_reader.get_content_length()
-
-            _logger.info(
-                "Content Length : Source {} and Target {}".format(
-                    source_content_length,
-                    target_content_length))
-
-            if source_content_length == target_content_length:
-                _logger.info(
-                    "Content length matched for job_id {}".format(
-                        self._job_id))
-            else:
-                _logger.error(
-                    "Content length not matched for job_id {}".format(
-                        self._job_id))
+        # check md5 of data sent against source and target ETag
+        verified = True
+        if target_etag == local_etag and \
+                source_etag in (None, local_etag):
+            _logger.info("MD5 matched for job_id {}".format(self._job_id))
+        else:
+            _logger.error(
+                "MD5 not matched for job_id {}".format(self._job_id))
+            verified = False
+
+        # check content length of source and target objects
+        # [system-defined metadata]
+        _logger.info(
+            "Content Length : Source {} and Target {}".format(
+                self._object_size, target_size))
+        if self._range_read_length < 0 and \
+                target_size != self._object_size:
+            _logger.error(
+                "Content length not matched for job_id {}".format(
+                    self._job_id))
+            verified = False
+        return verified
 
     def pause(self):
         """Pause the running object tranfer."""
@@ -0,0 +1,119 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import asyncio
+import logging
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_head_object import S3AsyncHeadObject
+
+_logger = logging.getLogger('s3replicator')
+
+
+def get_etag_part_count(etag):
+    """Returns part count encoded in multipart ETag ("<md5>-<count>").
+
+    Returns
+    -------
+        int: Part count, None when ETag is not a multipart ETag.
+    """
+    if etag is None:
+        return None
+    etag = etag.strip("\"")
+    if "-" not in etag:
+        return None
+    try:
+        return int(etag.rsplit("-", 1)[1])
+    except ValueError:
+        return None
+
+
+class PartLayoutDiscovery:
+    """Discovers exact part layout of a multipart source object.
+
+    Issues HEAD ?partNumber=N for every part, within a bounded number of
+    concurrent requests, and collects Content-Length of each part.
+    """
+
+    def __init__(self, session, request_id, bucket_name, object_name,
+                 version_id, max_concurrency):
+        """Initialise."""
+        self._session = session
+        self._request_id = request_id
+        self._bucket_name = bucket_name
+        self._object_name = object_name
+        self._version_id = version_id
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _head_part(self, part_no):
+        """Returns HEAD response for given part, None on failure."""
+        head_object = S3AsyncHeadObject(
+            self._session, self._request_id,
+            self._bucket_name, self._object_name,
+            self._version_id)
+        async with self._semaphore:
+            await head_object.get(part_no)
+        if head_object.get_state() != S3RequestState.COMPLETED:
+            _logger.error(
+                "HEAD for part {} failed for request_id {}".format(
+                    part_no, self._request_id))
+            return None
+        return head_object
+
+    async def discover(self, object_size, part_count=None):
+        """Returns length of each part, in part number order.
+
+        Args
+        -----
+            object_size (int): Total object size, to validate layout.
+            part_count (int, optional): Part count when already known,
+            else read from x-amz-mp-parts-count of first part.
+
+        Returns
+        -------
+            list[int]: Part lengths, None on failure.
+        """
+        first_part = await self._head_part(1)
+        if first_part is None:
+            return None
+
+        parts_count = first_part.get_x_amz_mp_parts_count()
+        if parts_count is None:
+            parts_count = part_count
+        if parts_count is None:
+            _logger.error(
+                "Unable to determine part count for request_id {}".format(
+                    self._request_id))
+            return None
+
+        remaining_parts = await asyncio.gather(*[
+            self._head_part(part_no)
+            for part_no in range(2, parts_count + 1)])
+        if None in remaining_parts:
+            return None
+
+        part_length = [head_object.get_content_length()
+                       for head_object in [first_part, *remaining_parts]]
+
+        if sum(part_length) != object_size:
+            _logger.error(
+                "Part lengths add up to {} bytes, expected object size {} "
+                "for request_id {}".format(
+                    sum(part_length), object_size, self._request_id))
+            return None
+        return part_length
@@ -0,0 +1,321 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+import asyncio
+import logging
+from s3replicationcommon.s3_abort_multipart_upload import S3AsyncAbortMultipartUpload
+from s3replicationcommon.s3_checksum_reader import S3ChecksumReader
+from s3replicationcommon.s3_checksum_reader import composite_md5
+from s3replicationcommon.s3_common import S3RequestState
+from s3replicationcommon.s3_complete_multipart_upload import S3AsyncCompleteMultipartUpload
+from s3replicationcommon.s3_create_multipart_upload import S3AsyncCreateMultipartUpload
+from s3replicationcommon.s3_get_object import S3AsyncGetObject
+from s3replicationcommon.s3_list_parts import S3AsyncListParts
+from s3replicationcommon.s3_upload_part import S3AsyncUploadPart
+from s3replicationcommon.s3_upload_part_copy import S3AsyncUploadPartCopy
+
+_logger = logging.getLogger('s3replicator')
+
+
+class PartTransfer:
+    """Multipart upload at target, with parts read from source byte ranges.
+
+    Wraps create/upload part/complete/abort of one multipart upload so
+    object and multipart replicators can share the part data path.
+    """
+
+    def __init__(self, request_id, source_session, source_bucket,
+                 object_name, object_size, target_session, target_bucket,
+                 transfer_chunk_size_bytes, buffer_pool=None,
+                 metadata=None):
+        """Initialise."""
+        self._request_id = request_id
+        self._s3_source_session = source_session
+        self._source_bucket = source_bucket
+        self._object_name = object_name
+        self._object_size = object_size
+
+        self._s3_target_session = target_session
+        self._target_bucket = target_bucket
+        self._transfer_chunk_size_bytes = transfer_chunk_size_bytes
+        self._buffer_pool = buffer_pool
+        # User metadata set on target object.
+        self._metadata = metadata
+
+        # MD5 of each part computed as data streams through.
+        self._part_md5 = {}
+        self._transferred_bytes = 0
+
+        self._upload_id = None
+        self._obj_complete = None
+
+    def get_upload_id(self):
+        """Returns upload id of multipart upload at target."""
+        return self._upload_id
+
+    def get_final_etag(self):
+        """Returns final ETag after multipart upload completes."""
+        if self._obj_complete is not None and \
+                self._obj_complete.get_state() == S3RequestState.COMPLETED:
+            # ETag in complete response is quoted.
+            return self._obj_complete.get_final_etag().strip("\"")
+        return None
+
+    def get_transferred_bytes(self):
+        """Returns bytes of all parts uploaded so far."""
+        return self._transferred_bytes
+
+    def get_composite_md5(self):
+        """Returns multipart ETag computed from data of uploaded parts."""
+        return composite_md5(
+            [self._part_md5[part_no] for part_no in sorted(self._part_md5)])
+
+    async def create(self):
+        """Create multipart upload at target.
+
+        Returns
+        -------
+            bool: True when upload is created, False on failure.
+        """
+        obj_create = S3AsyncCreateMultipartUpload(
+            self._s3_target_session, self._request_id,
+            self._target_bucket, self._object_name, self._metadata)
+        await obj_create.create()
+        if obj_create.get_state() != S3RequestState.COMPLETED:
+            return False
+
+        self._upload_id = obj_create.get_response_header("UploadId")
+        return True
+
+    async def resume(self, upload_id, part_etags):
+        """Continue multipart upload created earlier at target.
+
+        Parts listed at target with same ETag and length as uploaded earlier
+        are kept, and count as transferred.
+
+        Args
+        -----
+            upload_id (str): Id of multipart upload at target.
+            part_etags (dict): Part number to (ETag, length) of parts
+            uploaded earlier.
+
+        Returns
+        -------
+            dict: Part number to ETag of kept parts, empty when upload no
+            longer exists at target (upload id is then not set), None when
+            parts could not be listed.
+        """
+        list_parts = S3AsyncListParts(
+            self._s3_target_session, self._request_id,
+            self._target_bucket, self._object_name, upload_id)
+        await list_parts.list()
+        if list_parts.get_state() != S3RequestState.COMPLETED:
+            if list_parts.get_http_status() == 404:
+                return {}
+            return None
+
+        self._upload_id = upload_id
+        listed_parts = list_parts.get_parts()
+        kept_parts = {}
+        for part_no, (etag, length) in part_etags.items():
+            if listed_parts.get(part_no) == (etag.strip("\""), length):
+                kept_parts[part_no] = etag
+                # Part ETag is MD5 of its data.
+                self._part_md5[part_no] = bytes.fromhex(etag.strip("\""))
+                self._transferred_bytes += length
+        return kept_parts
+
+    async def transfer_part(self, part_no, offset, length):
+        """Read given byte range from source and upload it as a part.
+
+        Returns
+        -------
+            str: ETag of uploaded part, None on failure.
+        """
+        range_reader = S3ChecksumReader(
+            S3AsyncGetObject(
+                self._s3_source_session,
+                self._request_id,
+                self._source_bucket,
+                self._object_name,
+                self._object_size,
+                offset, length, self._buffer_pool))
+
+        part_writer = S3AsyncUploadPart(
+            self._s3_target_session,
+            self._request_id,
+            self._target_bucket,
+            self._object_name,
+            self._upload_id)
+
+        await part_writer.upload(range_reader, part_no, length,
+                                 self._transfer_chunk_size_bytes)
+
+        if range_reader.get_state() != S3RequestState.COMPLETED or \
+                part_writer.get_state() != S3RequestState.COMPLETED:
+            _logger.error(
+                "Failed to replicate part {} (offset {}, length {}) "
+                "for request_id {}".format(
+                    part_no, offset, length, self._request_id))
+            return None
+
+        part_etag = part_writer.get_etag_dict()[part_no]
+        if part_etag.strip("\"") != range_reader.get_md5():
+            _logger.error(
+                "ETag {} of part {} does not match MD5 {} of data sent "
+                "for request_id {}".format(
+                    part_etag, part_no, range_reader.get_md5(),
+                    self._request_id))
+            return None
+        self._part_md5[part_no] = range_reader.get_md5_digest()
+        self._transferred_bytes += range_reader.get_size()
+        return part_etag
+
+    async def copy_part(self, part_no, offset, length):
+        """Copy given byte range of source object as a part, within S3.
+
+        Source object is read with target session credentials, so source
+        and target must be on same S3 endpoint.
+
+        Returns
+        -------
+            str: ETag of copied part, None on failure.
+        """
+        part_copy = S3AsyncUploadPartCopy(
+            self._s3_target_session,
+            self._request_id,
+            self._source_bucket,
+            self._object_name,
+            self._target_bucket,
+            self._object_name,
+            self._upload_id)
+        await part_copy.copy(part_no, offset, length)
+
+        if part_copy.get_state() != S3RequestState.COMPLETED:
+            _logger.error(
+                "Failed to copy part {} (offset {}, length {}) "
+                "for request_id {}".format(
+                    part_no, offset, length, self._request_id))
+            return None
+        self._transferred_bytes += length
+        return part_copy.get_etag()
+
+    async def complete(self, etag_dict):
+        """Complete the multipart upload with given part to ETag map.
+
+        Returns
+        -------
+            S3RequestState: Final state of complete request.
+        """
+        self._obj_complete = S3AsyncCompleteMultipartUpload(
+            self._s3_target_session, self._request_id,
+            self._target_bucket, self._object_name,
+            self._upload_id, etag_dict)
+        await self._obj_complete.complete_upload()
+        _logger.info("Final ETag : {}".format(self.get_final_etag()))
+        return self._obj_complete.get_state()
+
+    async def abort(self, upload_id=None):
+        """Abort the multipart upload, or given earlier upload of object, so
+        target discards uploaded parts.
+        """
+        if upload_id is None:
+            upload_id = self._upload_id
+        if upload_id is None:
+            return
+        obj_abort = S3AsyncAbortMultipartUpload(
+            self._s3_target_session, self._request_id,
+            self._target_bucket, self._object_name, upload_id)
+        await obj_abort.abort()
+
+
+class PartUploadScheduler:
+    """Runs part uploads concurrently within a bounded in-flight window.
+
+    At most max_in_flight parts of a job are uploaded at a time, and when
+    endpoint_semaphore is given, each part also holds a slot shared by all
+    jobs writing to the same target endpoint. ETags are collected as parts
+    complete, in any order. First failed part cancels remaining parts.
+    """
+
+    def __init__(self, request_id, max_in_flight, endpoint_semaphore=None):
+        """Initialise."""
+        self._request_id = request_id
+        self._max_in_flight = max(1, max_in_flight)
+        self._endpoint_semaphore = endpoint_semaphore
+
+        self._etag_dict = {}
+        self._workers = []
+        self._failed = False
+
+    async def _upload_one(self, transfer_part, part_no):
+        if self._endpoint_semaphore is None:
+            return await transfer_part(part_no)
+        async with self._endpoint_semaphore:
+            return await transfer_part(part_no)
+
+    async def _worker(self, worker_index, part_iter, transfer_part):
+        for part_no in part_iter:
+            if self._failed:
+                return
+            etag = await self._upload_one(transfer_part, part_no)
+            if etag is None:
+                self._failed = True
+                self._cancel_workers(worker_index)
+                return
+            self._etag_dict[part_no] = etag
+
+    def _cancel_workers(self, failed_worker_index):
+        for index, worker in enumerate(self._workers):
+            if index != failed_worker_index and not worker.done():
+                worker.cancel()
+
+    async def run(self, part_numbers, transfer_part):
+        """Upload all parts.
+
+        Args
+        -----
+            part_numbers (list[int]): Part numbers to upload.
+            transfer_part (coroutine function): Called with part number,
+            returns ETag of uploaded part or None on failure.
+
+        Returns
+        -------
+            dict: part number to ETag map, None if any part failed.
+        """
+        part_iter = iter(part_numbers)
+        worker_count = min(self._max_in_flight, len(part_numbers))
+        self._workers = [
+            asyncio.ensure_future(
+                self._worker(index, part_iter, transfer_part))
+            for index in range(worker_count)]
+
+        results = await asyncio.gather(*self._workers,
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception) and \
+                    not isinstance(result, asyncio.CancelledError):
+                _logger.error(
+                    "Part upload failed for request_id {}: {}".format(
+                        self._request_id, result))
+                self._failed = True
+
+        if self._failed:
+            return None
+        return self._etag_dict
@@ -18,6 +18,7 @@
 #
 
 import aiohttp
+import asyncio
 import json
 import logging
 import uuid
@@ -26,6 +27,8 @@ from s3replicationcommon.s3_common import S3RequestState
 from s3replicationcommon.s3_common import url_with_resources
 from s3replicationcommon.templates import subscribe_payload_template
 from s3replicationcommon.timer import Timer
+from s3replicationcommon.wire_format import server_content_encodings
+from s3replicationcommon.wire_format import supported_content_types
 
 _logger = logging.getLogger('s3replicator')
 
@@ -53,7 +56,8 @@ class ReplicationManager:
             "subscriber_id": self.subscriber_id
         }
 
-    async def subscribe(self, replicator_endpoint, prefetch_count):
+    async def subscribe(self, replicator_endpoint, prefetch_count,
+                        capacity=None):
         """Subscribe to remote replication manager for jobs.
 
         Args
@@ -61,6 +65,8 @@ class ReplicationManager:
             replicator_endpoint (str): url for replicator (current process).
             prefetch_count (int): maximum count of jobs to receive from
             replication manager.
+            capacity (dict, optional): Concurrency budget per size class of
+            job, {"small": {"max_jobs": 100, "max_bytes": 4294967296}, ...}
 
         Returns
         -------
@@ -71,6 +77,11 @@ class ReplicationManager:
         subscriber_payload.pop("id")  # replication manager will generate.
         subscriber_payload["endpoint"] = replicator_endpoint
         subscriber_payload["prefetch_count"] = prefetch_count
+        # Job batch formats that can be decoded here.
+        subscriber_payload["content_types"] = supported_content_types()
+        subscriber_payload["content_encodings"] = server_content_encodings()
+        if capacity is not None:
+            subscriber_payload["capacity"] = capacity
 
         resource_url = url_with_resources(self.endpoint, ["subscribers"])
         req_id = str(uuid.uuid4())
@@ -124,10 +135,12 @@ class ReplicationManager:
 
         Returns
         -------
-            bool: True when status updated successfully, False when failed.
+            bool: True when status updated successfully, False when failed,
+            self.http_status is then set if manager responded.
         """
         headers = {"Content-Type": "application/json"}
         payload = {"status": status}
+        self.http_status = None
 
         resource_url = url_with_resources(
             self.endpoint, ["jobs", job_id])
@@ -171,12 +184,76 @@ class ReplicationManager:
             self.remote_down = True
             _logger.error(
                 'Failed to connect to Replication manager: ' + str(e))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._timer.stop()
+            self._state = S3RequestState.FAILED
+            _logger.error(fmt_reqid_log(req_id) +
+                          'PUT on {} failed: {} {}'.format(
+                              resource_url, type(e).__name__, e))
 
         if self._state == S3RequestState.COMPLETED:
             return True
         else:
             return False
 
+    async def send_updates(self, updates):
+        """Updates replication manager with status of many jobs.
+
+        Args
+        -----
+            updates (list): [{"job_id": <job id at replication manager>,
+            "status": <completed/failed/aborted>}, ...]
+
+        Returns
+        -------
+            bool: True when status updated successfully, False when failed.
+            self.http_status is 405 when replication manager does not
+            support bulk update.
+        """
+        resource_url = url_with_resources(self.endpoint, ["jobs"])
+        req_id = str(uuid.uuid4())
+
+        _logger.info(fmt_reqid_log(req_id) +
+                     'PUT on {} for {} jobs'.format(resource_url,
+                                                    len(updates)))
+
+        self.http_status = None
+        self._timer.start()
+        try:
+            self._state = S3RequestState.RUNNING
+            async with self.client_session.put(resource_url,
+                                               json=updates) as resp:
+                self._timer.stop()
+
+                self.http_status = resp.status
+                _logger.info(fmt_reqid_log(req_id) +
+                             'PUT on {} returned http status: {}'.
+                             format(resource_url, resp.status))
+
+                if resp.status == 200:
+                    self._state = S3RequestState.COMPLETED
+                    self.response = await resp.json()
+                    _logger.debug(fmt_reqid_log(req_id) +
+                                  'PUT on {} returned Response: {}'.
+                                  format(resource_url, self.response))
+                else:
+                    self._state = S3RequestState.FAILED
+
+        except aiohttp.client_exceptions.ClientConnectorError as e:
+            self._timer.stop()
+            self._state = S3RequestState.FAILED
+            self.remote_down = True
+            _logger.error(
+                'Failed to connect to Replication manager: ' + str(e))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._timer.stop()
+            self._state = S3RequestState.FAILED
+            _logger.error(fmt_reqid_log(req_id) +
+                          'PUT on {} failed: {} {}'.format(
+                              resource_url, type(e).__name__, e))
+
+        return self._state == S3RequestState.COMPLETED
+
 
 class ReplicationManagerJsonEncoder(json.JSONEncoder):
     def default(self, o):  # pylint: disable=E0202
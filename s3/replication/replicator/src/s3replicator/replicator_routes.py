@@ -17,21 +17,23 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 
-import asyncio
 from aiohttp import web
 import json
 import logging
 from urllib.parse import urlparse, parse_qs
 from s3replicationcommon.jobs import Job
-from s3replicationcommon.jobs import Jobs
+from s3replicationcommon.job_listing import stream_jobs
 from s3replicationcommon.job import JobJsonEncoder
-from .transfer_initiator import TransferInitiator
+from s3replicationcommon import wire_format
 
 _logger = logging.getLogger('s3replicator')
 
 # Route table declaration
 routes = web.RouteTableDef()
 
+# Secs replication manager is asked to wait when job queue is full.
+RETRY_AFTER_SECS = 1
+
 
 @routes.get('/jobs')  # noqa: E302
 async def list_jobs(request):
@@ -53,12 +55,13 @@ async def list_jobs(request):
                                       completed_jobs.count()}, status=200)
         else:
             return web.json_response({'count': jobs.count()}, status=200)
+    # Listings are streamed, a page at a time when limit is given.
     elif 'completed' in query:
         _logger.debug('Completed jobs count {}'.format(completed_jobs.count()))
-        return web.json_response(completed_jobs, dumps=Jobs.dumps, status=200)
+        return await stream_jobs(request, completed_jobs, query, as_dict=True)
     else:
         _logger.debug('Total replication jobs count {}'.format(jobs.count()))
-        return web.json_response(jobs, dumps=Jobs.dumps, status=200)
+        return await stream_jobs(request, jobs, query, as_dict=True)
 
 
 @routes.get('/jobs/{job_id}')  # noqa: E302
@@ -83,14 +86,32 @@ async def get_job(request):
 
 @routes.post('/jobs')  # noqa: E302
 async def add_job(request):
-    """Add job in the queue and trigger replication."""
-    job_records = await request.json()
-    _logger.debug('API: POST /jobs\nContent : {}'.format(job_records))
+    """Add job in the queue and trigger replication.
+
+    Body is list of job records, as json or msgpack per Content-Type and
+    optionally compressed per Content-Encoding.
+    """
+    body = await request.read()
+    try:
+        job_records = wire_format.decode(
+            wire_format.decompress(
+                body,
+                request.headers.get('Content-Encoding', wire_format.IDENTITY),
+                request.app['config'].max_payload),
+            request.content_type)
+    except ValueError as e:
+        _logger.warn('Invalid job batch: {}'.format(e))
+        return web.json_response(
+            {'ErrorResponse': 'BadRequest. Invalid job batch!'}, status=400)
+    _logger.debug('API: POST /jobs\nContent-Type : {}, {} bytes'.format(
+        request.content_type, len(body)))
 
     jobs_list = request.app['all_jobs']
+    job_queue = request.app['job_queue']
 
-    # Accepted_jobs response format [{"replication-id": "job-id"}, ...].
-    accepted_jobs = []
+    # Jobs to run.
+    new_jobs = []
+    replication_ids = set()
 
     # Discarded jobs with additional info as possible.
     # Format [{msg: "Job already exists.", record = {post in request}}, ...]
@@ -98,7 +119,7 @@ async def add_job(request):
 
     for record in job_records:
         _logger.debug('Processing record: {} '.format(record))
-        job = Job(record)
+        job = Job(record, site_table=request.app['site_table'])
 
         # Check if job already present.
         if job.is_valid() is False:
@@ -107,7 +128,8 @@ async def add_job(request):
                 "record": record
             })
             _logger.warn('Invalid job record: {} '.format(record))
-        elif jobs_list.is_job_present(job.get_replication_id()):
+        elif jobs_list.is_job_present(job.get_replication_id()) or \
+                job.get_replication_id() in replication_ids:
             discarded_jobs.append({
                 "message": "Job Already exists for replication-id {}.".
                 format(job.get_replication_id()),
@@ -115,29 +137,44 @@ async def add_job(request):
             })
             _logger.warn('Job Already exists: {} '.format(record))
         else:
-            jobs_list.add_job(job)
+            new_jobs.append(job)
+            replication_ids.add(job.get_replication_id())
+
+    # end of for each record.
 
-            # Start the async replication.
-            _logger.debug('Starting Replication Job : {} '.format(
-                json.dumps(job, cls=JobJsonEncoder)))
-            # XXX create task is only supported for python v3.7+
-            asyncio.ensure_future(
-                TransferInitiator.start(
-                    job, request.app))
+    # Batch is admitted whole or not at all, rejected jobs are sent again
+    # by replication manager.
+    if not job_queue.is_running():
+        return web.json_response(
+            {'ErrorResponse': 'Service Unavailable. Not accepting jobs!'},
+            status=503)
+    if len(new_jobs) > job_queue.free_slots():
+        job_queue.reject(len(new_jobs))
+        _logger.warn('Job queue full, rejected {} jobs.'.format(
+            len(new_jobs)))
+        return web.json_response(
+            {'ErrorResponse': 'Too Many Requests. Job queue full!'},
+            status=429, headers={'Retry-After': str(RETRY_AFTER_SECS)})
 
-            jobs_list.move_to_inprogress(job.get_replication_id())
+    # Accepted_jobs response format [{"replication-id": "job-id"}, ...].
+    accepted_jobs = []
+    for job in new_jobs:
+        jobs_list.add_job(job)
 
-            # Populate the response.
-            accepted_jobs.append({
-                job.get_replication_id(): job.get_job_id()
-            })
+        # Queue the replication, started when a worker is free.
+        await job_queue.put(job)
 
-            _logger.info('Started Replication Job with job_id : {} '.format(
-                job.get_job_id()))
-            _logger.debug('Started Replication Job : {} '.format(
-                json.dumps(job, cls=JobJsonEncoder)))
+        jobs_list.move_to_inprogress(job.get_replication_id())
 
-    # end of for each record.
+        # Populate the response.
+        accepted_jobs.append({
+            job.get_replication_id(): job.get_job_id()
+        })
+
+        _logger.info('Queued Replication Job with job_id : {} '.format(
+            job.get_job_id()))
+        _logger.debug('Queued Replication Job : {} '.format(
+            json.dumps(job, cls=JobJsonEncoder)))
 
     response_status = None
     if len(accepted_jobs) > 0:
@@ -151,6 +188,55 @@ async def add_job(request):
         status=response_status)
 
 
+@routes.put('/sites')  # noqa: E302
+async def register_sites(request):
+    """Register sites which jobs refer to by site_id.
+
+    Body is {"<site_id>": {"endpoint": ..., "access_key": ...}, ...}
+    """
+    sites = await request.json()
+    _logger.debug('API: PUT /sites\nSite ids : {}'.format(
+        list(sites.keys()) if isinstance(sites, dict) else sites))
+
+    if not isinstance(sites, dict):
+        return web.json_response(
+            {'ErrorResponse': 'BadRequest. Expected sites by site_id!'},
+            status=400)
+
+    site_table = request.app['site_table']
+    invalid_sites = []
+    for site_id, site_dict in sites.items():
+        try:
+            site_table.add_site(site_id, site_dict)
+        except (KeyError, TypeError, AttributeError):
+            invalid_sites.append(site_id)
+
+    if invalid_sites:
+        _logger.warn('Invalid sites: {}'.format(invalid_sites))
+        return web.json_response(
+            {'ErrorResponse': 'BadRequest. Invalid sites!',
+             'site_ids': invalid_sites},
+            status=400)
+
+    _logger.info('Registered sites: {}'.format(list(sites.keys())))
+    return web.json_response(
+        {'site_ids': list(sites.keys())}, status=200)
+
+
+@routes.get('/stats')  # noqa: E302
+async def get_stats(request):
+    """Get replicator runtime stats."""
+    _logger.debug('API: GET /stats')
+    chunk_sizers = {
+        netloc: chunk_sizer.get_stats()
+        for netloc, chunk_sizer in request.app["chunk_sizers"].items()}
+    return web.json_response(
+        {"buffer_pool": request.app["buffer_pool"].get_metrics(),
+         "job_queue": request.app["job_queue"].get_metrics(),
+         "chunk_sizers": chunk_sizers},
+        status=200)
+
+
 @routes.delete('/jobs/{job_id}')  # noqa: E302
 async def abort_job(request):
     """Abort a job with given job_id."""
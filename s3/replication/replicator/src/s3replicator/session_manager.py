@@ -17,8 +17,10 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 
+import asyncio
 import logging
 from s3replicationcommon.s3_session import S3Session
+from .chunk_sizer import AdaptiveChunkSizer
 
 _logger = logging.getLogger('s3replicator')
 
@@ -26,10 +28,12 @@ _logger = logging.getLogger('s3replicator')
 # access key to uniquely identify each session for an IAM account/user.
 
 
-def get_session(app, s3_site, access_key, secret_key, max_connections):
+def get_session(app, s3_site, access_key, secret_key, max_connections,
+                session_key=None):
 
-    # example "s3.seagate.com|someaccesskey"
-    session_key = s3_site.get_netloc() + "|" + access_key
+    if session_key is None:
+        # example "s3.seagate.com|someaccesskey"
+        session_key = s3_site.get_netloc() + "|" + access_key
 
     session = app["sessions"].get(session_key, None)
     if session is None:
@@ -41,7 +45,8 @@ def get_session(app, s3_site, access_key, secret_key, max_connections):
             s3_site,
             access_key,
             secret_key,
-            max_connections)
+            max_connections,
+            app["config"].signed_payload)
 
         # Cache it
         app["sessions"][session_key] = session
@@ -52,6 +57,47 @@ def get_session(app, s3_site, access_key, secret_key, max_connections):
     return app["sessions"][session_key]
 
 
+def get_endpoint_semaphore(app, s3_site, max_in_flight):
+    """Returns semaphore limiting parts in flight to given endpoint.
+
+    Semaphore is shared by all jobs writing to same endpoint (netloc), so
+    concurrent multipart jobs together stay within max_in_flight parts.
+    """
+    netloc = s3_site.get_netloc()
+
+    semaphore = app["endpoint_semaphores"].get(netloc, None)
+    if semaphore is None:
+        _logger.debug("Creating parts in flight limit of {} for {}".
+                      format(max_in_flight, netloc))
+        semaphore = asyncio.Semaphore(max_in_flight)
+        app["endpoint_semaphores"][netloc] = semaphore
+
+    return semaphore
+
+
+def get_chunk_sizer(app, s3_site, config):
+    """Returns adaptive chunk sizer for given endpoint.
+
+    Sizer is shared by all jobs reading from same endpoint (netloc), so
+    throughput and RTT measured by each job tune sizes for the next.
+    """
+    netloc = s3_site.get_netloc()
+
+    chunk_sizer = app["chunk_sizers"].get(netloc, None)
+    if chunk_sizer is None:
+        _logger.debug("Creating adaptive chunk sizer for {}".format(netloc))
+        chunk_sizer = AdaptiveChunkSizer(
+            netloc,
+            config.min_transfer_chunk_size_bytes,
+            config.max_transfer_chunk_size_bytes,
+            config.min_part_size_bytes,
+            config.max_part_size_bytes,
+            config.transfer_chunk_size_bytes)
+        app["chunk_sizers"][netloc] = chunk_sizer
+
+    return chunk_sizer
+
+
 async def close_all_sessions(app):
     for session_key, session in app["sessions"].items():
         _logger.debug("Closing session for session_key {}".format(session_key))
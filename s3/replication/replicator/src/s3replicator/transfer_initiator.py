@@ -20,10 +20,19 @@
 import logging
 from s3replicationcommon.job import ReplicationJobType
 from s3replicationcommon.job import JobEvents
+from s3replicationcommon.s3_common import REPLICATION_SOURCE_ETAG_META
+from s3replicationcommon.s3_common import S3RequestState
 from s3replicationcommon.s3_head_object import S3AsyncHeadObject
+from s3replicationcommon.s3_update_replication_status import S3AsyncUpdatereplicationStatus
 from .multipart_object_replicator import MultipartObjectReplicator
+from .object_copier import ObjectCopier
+from .object_copier import is_same_endpoint
 from .object_replicator import ObjectReplicator
 from .object_tag_replicator import ObjectTagReplicator
+from .part_layout import PartLayoutDiscovery
+from .part_layout import get_etag_part_count
+from .session_manager import get_chunk_sizer
+from .session_manager import get_endpoint_semaphore
 from .session_manager import get_session
 
 _logger = logging.getLogger('s3replicator')
@@ -59,19 +68,119 @@ class TranferEventHandler:
                                   " to app['completed_jobs']".format(job_id))
                     self._app['completed_jobs'].add_job(job)
 
-                # Update the replication manager about job completion.
-                # XXX Support to pick out of multiple replication managers.
-                replication_manager = \
-                    list(self._app['replication-managers'].values())[0]
-
+                # Update the replication manager about job completion,
+                # updates are sent in batches.
+                # XXX Support multiple replication managers.
                 # In tests, replication manager acks are not required.
                 if job.get_remote_job_id() is not None:
-                    await replication_manager.send_update(
-                        job.get_remote_job_id(),
-                        "completed")
+                    self._app['ack_coalescer'].add(
+                        job.get_remote_job_id(), "completed")
+        elif event == JobEvents.FAILED:
+            _logger.debug("Processing job failed event for job id[{}]".
+                          format(job_id))
+            # Release failed job, so it is accepted when sent again.
+            job = self._app['all_jobs'].remove_job_by_job_id(job_id)
+            if job is not None:
+                job.mark_failed()
+                _logger.debug(
+                    "Removed failed job from app['all_jobs'] for job_id {}".
+                    format(job_id))
+                # Replication manager queues failed job again.
+                if job.get_remote_job_id() is not None:
+                    self._app['ack_coalescer'].add(
+                        job.get_remote_job_id(), "failed")
 
 
 class TransferInitiator:
+    async def fail(job, app):
+        """Releases job which could not be replicated and reports it failed
+        to replication manager.
+        """
+        await TranferEventHandler(app).notify(
+            JobEvents.FAILED, job.get_job_id())
+
+    def _record_transfer(chunk_sizer, replicator, object_size):
+        """Feed transfer throughput and outcome to chunk sizer."""
+        if chunk_sizer is None:
+            return
+        chunk_sizer.record_transfer(
+            object_size, replicator.get_execution_time(),
+            replicator.get_transfer_state() == S3RequestState.COMPLETED)
+
+    async def _is_target_identical(job, target_session, source_head):
+        """HEAD target object and compare it with source.
+
+        Target is identical when its size is same as source and its ETag,
+        or source ETag recorded in its metadata, is same as source ETag.
+
+        Returns
+        -------
+            bool: True when transfer can be skipped.
+        """
+        target_head = S3AsyncHeadObject(
+            target_session, job.get_job_id(),
+            job.get_target_bucket_name(), job.get_source_object_name(),
+            None)
+        await target_head.get(None)
+        if target_head.get_state() != S3RequestState.COMPLETED:
+            # Missing at target, or target not reachable.
+            return False
+
+        if target_head.get_content_length() != \
+                source_head.get_content_length():
+            return False
+        source_etag = source_head.get_etag().strip("\"")
+        target_etag = (target_head.get_etag() or "").strip("\"")
+        return source_etag == target_etag or source_etag == \
+            target_head.get_x_amz_meta(REPLICATION_SOURCE_ETAG_META)
+
+    async def _complete_without_transfer(job, app, source_session):
+        """Completes job whose object is at target without data transfer."""
+        source_replication_status = S3AsyncUpdatereplicationStatus(
+            source_session, job.get_job_id(),
+            job.get_source_owner_account_id(),
+            job.get_source_bucket_name(),
+            job.get_source_object_name())
+        await source_replication_status.update('COMPLETED')
+        await TranferEventHandler(app).notify(
+            JobEvents.COMPLETED, job.get_job_id())
+
+    async def _copy(job, app, source_session, target_session, source_etag,
+                    part_length, endpoint_semaphore, record_source_etag):
+        """Replicate object with server side copy, source and target are
+        on same S3 endpoint.
+
+        Returns
+        -------
+            bool: False when copy failed and object data must be
+            transferred instead.
+        """
+        app_config = app["config"]
+        object_copier = ObjectCopier(
+            job, source_session, target_session, source_etag, part_length,
+            app_config.parallel_read_threshold_bytes,
+            app_config.max_parts_in_flight_per_job,
+            endpoint_semaphore, record_source_etag)
+        job.set_replicator(object_copier)
+        job.mark_started()
+
+        transfer_state = await object_copier.start()
+        if transfer_state == S3RequestState.FAILED:
+            # e.g. target credentials not allowed to read source bucket, or
+            # copied data does not match source.
+            _logger.warning(
+                "Server side copy failed for job_id {}, transferring "
+                "object data instead".format(job.get_job_id()))
+            return False
+
+        if transfer_state == S3RequestState.ABORTED:
+            await TranferEventHandler(app).notify(
+                JobEvents.ABORTED, job.get_job_id())
+        else:
+            await TransferInitiator._complete_without_transfer(
+                job, app, source_session)
+        return True
+
     async def start(job, app):
         operation_type = job.get_operation_type()
         _logger.debug("Replication operation = {}".format(operation_type))
@@ -83,14 +192,22 @@ class TransferInitiator:
             job.get_source_s3_site(),
             job.get_source_access_key(),
             job.get_source_secret_key(),
-            app_config.max_connections_per_s3_session)
+            app_config.max_connections_per_s3_session,
+            job.get_source_session_key())
 
         target_session = get_session(
             app,
             job.get_target_s3_site(),
             job.get_target_access_key(),
             job.get_target_secret_key(),
-            app_config.max_connections_per_s3_session)
+            app_config.max_connections_per_s3_session,
+            job.get_target_session_key())
+
+        # Parts in flight to target endpoint are limited across all jobs.
+        endpoint_semaphore = get_endpoint_semaphore(
+            app,
+            job.get_target_s3_site(),
+            app_config.max_parts_in_flight_per_endpoint)
 
         # For Cortx, default value of version_id=None
         head_object = S3AsyncHeadObject(source_session, job.get_job_id(),
@@ -98,42 +215,87 @@ class TransferInitiator:
                                         None)
 
         await head_object.get(None)
+        if head_object.get_state() != S3RequestState.COMPLETED:
+            _logger.error(
+                "HEAD on source object failed for job_id {}".format(
+                    job.get_job_id()))
+            await TransferInitiator.fail(job, app)
+            return None
 
         source_etag = head_object.get_etag()
         _logger.info("Source ETag : {}".format(source_etag))
 
-        # List to store ETag of each parts of source object
-        part_length = []
+        # Object may already be at target, e.g. when job is sent again
+        # after replicator restart.
+        skip_identical_target = app_config.skip_identical_target and \
+            operation_type == ReplicationJobType.OBJECT_REPLICATION
+        if skip_identical_target and \
+                await TransferInitiator._is_target_identical(
+                    job, target_session, head_object):
+            _logger.info(
+                "Target object identical to source, skipping transfer for "
+                "job_id {}".format(job.get_job_id()))
+            await TransferInitiator._complete_without_transfer(
+                job, app, source_session)
+            return None
+
+        # Within one S3 endpoint, object is copied by S3 itself.
+        use_server_side_copy = app_config.server_side_copy and \
+            operation_type == ReplicationJobType.OBJECT_REPLICATION and \
+            is_same_endpoint(job.get_source_s3_site(),
+                             job.get_target_s3_site())
+
+        # Chunk and part size tuned for source endpoint, when enabled.
+        transfer_chunk_size = app_config.transfer_chunk_size_bytes
+        part_size = None
+        chunk_sizer = None
+        if app_config.adaptive_chunk_size:
+            chunk_sizer = get_chunk_sizer(
+                app, job.get_source_s3_site(), app_config)
+            chunk_sizer.record_rtt(head_object.get_execution_time())
+            transfer_chunk_size = chunk_sizer.get_chunk_size()
+            part_size = chunk_sizer.get_part_size()
 
         # "-" in source ETag indicates multipart object upload
         if "-" in source_etag:
-            # Get the total part count and object size
-            total_parts = source_etag.split("-")[1][0]
             object_size = head_object.get_content_length()
-            _logger.debug("Total Parts : {}".format(total_parts))
             _logger.debug("Content length : {}".format(object_size))
 
-            # calculate single part length
-            part_len = object_size / int(total_parts)
-
-            # Append the length of each part into the list
-            # Pass the list to multipart object replicator class
-            for part_no in range(1, int(total_parts) + 1):
-                _logger.debug("Part No : {}".format(part_no))
-                part_length.append(int(part_len))
+            # Discover exact length of each part once, and reuse it if job
+            # gets started again.
+            part_length = job.get_part_layout()
+            if part_length is None:
+                part_layout_discovery = PartLayoutDiscovery(
+                    source_session, job.get_job_id(),
+                    job.get_source_bucket_name(),
+                    job.get_source_object_name(),
+                    None, app_config.max_parts_in_flight_per_job)
+                part_length = await part_layout_discovery.discover(
+                    object_size, get_etag_part_count(source_etag))
+                if part_length is None:
+                    _logger.error(
+                        "Failed to discover part layout for job_id {}".format(
+                            job.get_job_id()))
+                    await TransferInitiator.fail(job, app)
+                    return None
+                job.set_part_layout(part_length)
 
-            # Future reference code, after getting updated head object and get object api
-            # Get the specific part information using head object by passing part number
-            # for part_no in range(1, int(total_parts)+1):
-            #     await head_object.get(part_no)
-            #     part_length.append(head_object.get_content_length())
+            if use_server_side_copy and await TransferInitiator._copy(
+                    job, app, source_session, target_session, source_etag,
+                    part_length, endpoint_semaphore, skip_identical_target):
+                return None
 
+            total_parts = len(part_length)
+            _logger.debug("Total Parts : {}".format(total_parts))
             _logger.info("Part content length list : {}".format(part_length))
 
             if operation_type == ReplicationJobType.OBJECT_REPLICATION:
                 multipart_obj_replicator = MultipartObjectReplicator(
-                    job, app["config"].transfer_chunk_size_bytes,
-                    source_session, target_session, total_parts, part_length)
+                    job, transfer_chunk_size,
+                    source_session, target_session, total_parts, part_length,
+                    app_config.max_parts_in_flight_per_job,
+                    endpoint_semaphore, source_etag,
+                    app["buffer_pool"], app["upload_checkpoints"])
                 multipart_obj_replicator.setup_observers(
                     "all_events", TranferEventHandler(app))
 
@@ -141,20 +303,30 @@ class TransferInitiator:
             job.mark_started()
 
             # Start the multipart replication.
-            semaphore = app['semaphore']
-            async with semaphore:
-                await multipart_obj_replicator.start()
+            await multipart_obj_replicator.start()
+            TransferInitiator._record_transfer(
+                chunk_sizer, multipart_obj_replicator, object_size)
 
         # If the head object returns ETag without part number
         # Then it could be a simple object or tag replication
         # based on the value of 'replication job type'.
         else:
+            if use_server_side_copy and await TransferInitiator._copy(
+                    job, app, source_session, target_session, source_etag,
+                    None, endpoint_semaphore, skip_identical_target):
+                return None
+
             if operation_type == ReplicationJobType.OBJECT_REPLICATION:
                 object_replicator = ObjectReplicator(
-                    job, app["config"].transfer_chunk_size_bytes,
+                    job, transfer_chunk_size,
                     app["config"].range_read_offset,
                     app["config"].range_read_length,
-                    source_session, target_session)
+                    source_session, target_session,
+                    app["config"].parallel_read_threshold_bytes,
+                    app["config"].parallel_read_count,
+                    endpoint_semaphore,
+                    app["buffer_pool"], part_size,
+                    source_etag if skip_identical_target else None)
                 object_replicator.setup_observers(
                     "all_events", TranferEventHandler(app))
 
@@ -162,9 +334,10 @@ class TransferInitiator:
                 job.mark_started()
 
                 # Start the simple object replication.
-                semaphore = app['semaphore']
-                async with semaphore:
-                    await object_replicator.start()
+                await object_replicator.start()
+                TransferInitiator._record_transfer(
+                    chunk_sizer, object_replicator,
+                    int(job.get_source_object_size()))
 
             elif operation_type == ReplicationJobType.OBJECT_TAGS_REPLICATION:
                 object_tag_replicator = ObjectTagReplicator(
@@ -176,10 +349,9 @@ class TransferInitiator:
                 job.mark_started()
 
                 # Start the tag replication.
-                semaphore = app['semaphore']
-                async with semaphore:
-                    await object_tag_replicator.start()
+                await object_tag_replicator.start()
             else:
                 _logger.error(
                     "Operation type [{}] not supported.".format(operation_type))
+                await TransferInitiator.fail(job, app)
                 return None
@@ -0,0 +1,239 @@
+#
+# Copyright (c) 2021 Seagate Technology LLC and/or its Affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+# upload_checkpoints.py
+#
+# Checkpoints of multipart uploads in progress, so replication of a large
+# object continues from uploaded parts after failure or restart.
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from s3replicationcommon.s3_abort_multipart_upload import S3AsyncAbortMultipartUpload
+
+_logger = logging.getLogger('s3replicator')
+
+# Checkpoint file per upload, one json object per line.
+# {"upload_id": <id>, "source_etag": <etag>, "part_length": [<length>],
+#  "endpoint": <target endpoint>, "access_key": <target access key>,
+#  "bucket": <target bucket>, "object": <object name>}
+# {"part": <part number>, "etag": <part ETag>}
+
+# Interval between checks for stale uploads.
+SWEEP_INTERVAL_SECS = 3600
+
+
+def get_checkpoint_key(session, bucket_name, object_name):
+    """Returns key of checkpoint for upload of object to target session."""
+    return "{}/{}/{}".format(session.endpoint, bucket_name, object_name)
+
+
+class UploadCheckpoints:
+    """Upload id and uploaded parts of multipart uploads in progress, as a
+    file per upload in directory.
+
+    Parts are appended as they complete, so file write per part is small
+    regardless of part count. Uploads without progress for expiry_secs are
+    aborted at target and their checkpoints removed. File IO runs in
+    executor threads.
+    """
+
+    def __init__(self, directory, expiry_secs):
+        """Initialise."""
+        self._directory = os.path.expanduser(directory)
+        os.makedirs(self._directory, exist_ok=True)
+        self._expiry_secs = expiry_secs
+        self._sweeper = None
+
+    def _path(self, key):
+        return os.path.join(
+            self._directory,
+            hashlib.sha256(key.encode()).hexdigest() + ".checkpoint")
+
+    @staticmethod
+    def _read(file_path):
+        """Returns checkpoint header with "parts" as part number to ETag,
+        None if there is no checkpoint.
+        """
+        try:
+            with open(file_path, 'r') as checkpoint_f:
+                lines = checkpoint_f.readlines()
+        except FileNotFoundError:
+            return None
+
+        try:
+            checkpoint = json.loads(lines[0])
+        except (IndexError, ValueError):
+            return None
+        checkpoint["parts"] = {}
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Torn write at crash, rest of file is not valid.
+                _logger.warn("Ignoring partial record in {}".format(
+                    file_path))
+                break
+            checkpoint["parts"][record["part"]] = record["etag"]
+        return checkpoint
+
+    @staticmethod
+    def _write(file_path, mode, record):
+        with open(file_path, mode) as checkpoint_f:
+            checkpoint_f.write(json.dumps(record) + "\n")
+            checkpoint_f.flush()
+            os.fsync(checkpoint_f.fileno())
+
+    @staticmethod
+    def _remove(file_path):
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+    async def _run(self, func, *args):
+        return await asyncio.get_event_loop().run_in_executor(
+            None, func, *args)
+
+    async def load(self, key):
+        """Returns checkpoint of upload, None if there is no checkpoint.
+
+        Returns
+        -------
+            dict: Upload header fields, and "parts" as part number to ETag
+            of uploaded parts.
+        """
+        try:
+            return await self._run(self._read, self._path(key))
+        except OSError as e:
+            _logger.error("Failed to read upload checkpoint: {}".format(e))
+            return None
+
+    async def start(self, key, session, bucket_name, object_name,
+                    upload_id, source_etag, part_length):
+        """Checkpoints new upload, replacing earlier checkpoint of key."""
+        header = {"upload_id": upload_id, "source_etag": source_etag,
+                  "part_length": part_length, "endpoint": session.endpoint,
+                  "access_key": session.access_key, "bucket": bucket_name,
+                  "object": object_name}
+        try:
+            await self._run(self._write, self._path(key), 'w', header)
+        except OSError as e:
+            _logger.error("Failed to write upload checkpoint: {}".format(e))
+
+    async def add_part(self, key, part_no, etag):
+        """Checkpoints uploaded part."""
+        try:
+            await self._run(self._write, self._path(key), 'a',
+                            {"part": part_no, "etag": etag})
+        except OSError as e:
+            # Part is uploaded again on resume.
+            _logger.error("Failed to write upload checkpoint: {}".format(e))
+
+    async def remove(self, key):
+        """Removes checkpoint of finished or abandoned upload."""
+        try:
+            await self._run(self._remove, self._path(key))
+        except OSError as e:
+            _logger.error("Failed to remove upload checkpoint: {}".format(
+                e))
+
+    def _find_expired(self):
+        """Returns (path, checkpoint, age in secs) of expired checkpoints."""
+        expired = []
+        now = time.time()
+        for file_name in os.listdir(self._directory):
+            file_path = os.path.join(self._directory, file_name)
+            age = now - os.path.getmtime(file_path)
+            if age < self._expiry_secs:
+                continue
+            checkpoint = self._read(file_path)
+            if checkpoint is not None:
+                expired.append((file_path, checkpoint, age))
+            else:
+                self._remove(file_path)
+        return expired
+
+    async def sweep(self, sessions):
+        """Aborts uploads without progress for expiry_secs.
+
+        Args
+        -----
+            sessions (dict): Open S3 sessions, upload is aborted with
+            session of its target endpoint and access key. Checkpoint is
+            kept till such a session exists, for up to twice expiry_secs.
+        """
+        try:
+            expired = await self._run(self._find_expired)
+        except OSError as e:
+            _logger.error("Failed to list upload checkpoints: {}".format(e))
+            return
+
+        for file_path, checkpoint, age in expired:
+            session = None
+            for candidate in sessions.values():
+                if candidate.endpoint == checkpoint["endpoint"] and \
+                        candidate.access_key == checkpoint["access_key"]:
+                    session = candidate
+                    break
+
+            if session is not None:
+                _logger.info(
+                    "Aborting stale upload {} of {}/{}".format(
+                        checkpoint["upload_id"], checkpoint["bucket"],
+                        checkpoint["object"]))
+                obj_abort = S3AsyncAbortMultipartUpload(
+                    session, checkpoint["upload_id"], checkpoint["bucket"],
+                    checkpoint["object"], checkpoint["upload_id"])
+                await obj_abort.abort()
+            elif age < 2 * self._expiry_secs:
+                continue
+            else:
+                _logger.warn(
+                    "Dropping checkpoint of stale upload {} of {}/{}, no "
+                    "session to abort it".format(
+                        checkpoint["upload_id"], checkpoint["bucket"],
+                        checkpoint["object"]))
+            try:
+                await self._run(self._remove, file_path)
+            except OSError as e:
+                _logger.error(
+                    "Failed to remove upload checkpoint: {}".format(e))
+
+    async def _run_sweeper(self, sessions):
+        while True:
+            await self.sweep(sessions)
+            await asyncio.sleep(min(SWEEP_INTERVAL_SECS, self._expiry_secs))
+
+    def start_sweeper(self, sessions):
+        """Starts periodic sweep of stale uploads."""
+        self._sweeper = asyncio.ensure_future(self._run_sweeper(sessions))
+
+    async def close(self):
+        """Stops sweep of stale uploads."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None